@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/4.1/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+from core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
+# serve the async views, see `core/async_views.py`
+os.environ.setdefault("DJANGO_ASYNC_VIEWS", "1")
+# each request runs its sync code in a new thread under ASGI, connections
+# kept per thread would never be reused
+os.environ.setdefault("DB_CONN_MAX_AGE", "0")
 
+# streaming responses (the exports) read in a thread, see `core/asgi.py`
 application = get_asgi_application()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,7 +47,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # first, to time everything below
+    "core.metrics.MetricsMiddleware",
+    "core.profiling.ProfilingMiddleware",
+    # compresses what the middleware below produce, see `core/compression.py`
+    "core.compression.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    # before anything touching the database, see `core/replicas.py`
+    "core.replicas.PrimaryPinningMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -88,9 +96,41 @@ DATABASES = {
         "HOST": os.environ.get(
             "MYSQL_HOST"
         ),  # Or an IP Address that your DB is hosted on
+        # Keep each thread's connection open across requests, checked
+        # before reuse, instead of connecting on every request: a worker
+        # holds one connection per thread. `app/asgi.py` turns it off, see
+        # https://docs.djangoproject.com/en/4.1/ref/databases/#persistent-connections
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 300)),
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# Read replicas, e.g. MYSQL_REPLICA_HOSTS="10.0.0.2,10.0.0.3": GET requests
+# read from them through `core.replicas.ReplicaRouter`.
+DATABASE_REPLICAS = []
+for number, host in enumerate(
+    [host.strip() for host in os.environ.get(
+        "MYSQL_REPLICA_HOSTS", ""
+    ).split(",") if host.strip()],
+    start=1,
+):
+    DATABASES[f"replica_{number}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        # tests run against the test database of `default`
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica_{number}")
+
+DATABASE_ROUTERS = ["core.replicas.ReplicaRouter"]
+
+# After a write a client reads from the primary for up to PIN seconds, see
+# `core/replicas.py`. Keep it above MAX_LAG + CHECK_INTERVAL: a replica in
+# rotation may have been checked CHECK_INTERVAL seconds ago, MAX_LAG behind.
+REPLICA_PIN_SECONDS = 15
+REPLICA_CHECK_INTERVAL = 5
+REPLICA_MAX_LAG = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -144,4 +184,110 @@ AUTH_USER_MODEL = "core.user"
 REST_FRAMEWORK = {
     # YOUR SETTINGS
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    # orjson, see `core/fast_json.py`
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.fast_json.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.fast_json.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    # token buckets of `core/throttling.py`, "<scope>.<ip|email|user>":
+    # "<burst>/<period>", a bucket refills completely over the period
+    "DEFAULT_THROTTLE_RATES": {
+        # logins and sign ups, a password hash each
+        "auth.ip": "60/min",
+        "auth.email": "10/min",
+        "auth.user": "30/min",
+        # job title writes
+        "writes.user": "600/min",
+    },
+    # 503 for an overloaded password hashing pool, see `core/exceptions.py`
+    "EXCEPTION_HANDLER": "core.exceptions.exception_handler",
 }
+
+# OpenAPI schema written by `python manage.py build_schema` and served at
+# `/api/schema/`, see `core/openapi.py`. Without it the schema is generated
+# per request only when SCHEMA_LIVE_FALLBACK (development).
+SCHEMA_DIR = os.environ.get("DJANGO_SCHEMA_DIR", str(BASE_DIR / "openapi"))
+SCHEMA_LIVE_FALLBACK = DEBUG
+
+# Smallest response body compressed by `core.compression`, in bytes
+COMPRESSION_MIN_SIZE = 1024
+
+# Where the throttle buckets live: "shared" by the worker processes of the
+# host through a memory mapped file, or "memory" of each process
+THROTTLE_STORE = os.environ.get("DJANGO_THROTTLE_STORE", "shared")
+THROTTLE_PATH = os.environ.get(
+    "DJANGO_THROTTLE_PATH",
+    os.path.join(
+        "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(),
+        "aggregator-throttle",
+    ),
+)
+# buckets kept, 24 bytes each
+THROTTLE_SLOTS = 65536
+
+# "memory" throttle buckets, refilled between tests
+TEST_RUNNER = "core.test_runner.TestRunner"
+
+
+# In-process token -> user cache used by
+# `user.authentication.CachedTokenAuthentication`.
+# Entries are evicted by signals on token / user changes, TTL (seconds) bounds
+# how long another worker process may keep serving a stale entry.
+TOKEN_CACHE_MAX_SIZE = 10000
+TOKEN_CACHE_TTL = 60
+
+# `core.hashing`: password hashes run in a pool of worker processes so a
+# login burst does not block the request threads. 0 workers hashes inline.
+# Every server worker process starts its own pool: N server workers run
+# N x PASSWORD_HASHING_WORKERS hashing processes, keep that around the
+# number of cores. Past MAX_PENDING queued hashes per process, requests get
+# a 503.
+PASSWORD_HASHING_WORKERS = int(
+    os.environ.get("PASSWORD_HASHING_WORKERS", 1)
+)
+PASSWORD_HASHING_MAX_PENDING = 64
+PASSWORD_HASHING_TIMEOUT = 10
+
+# Route the API to the async views (`job/async_views.py`,
+# `user/async_views.py`). `app/asgi.py` turns this on, WSGI servers keep the
+# sync views: under WSGI an async view would start an event loop per request.
+ASYNC_VIEWS = os.environ.get("DJANGO_ASYNC_VIEWS", "0") == "1"
+
+# seconds `/readyz/` reuses its database ping, see `core/health.py`
+HEALTH_CHECK_INTERVAL = 2
+
+# Request latency / SQL / serializer metrics served at `/metrics`, see
+# `core/metrics.py`. With several worker processes point METRICS_DIR at a
+# directory they share (emptied on start) so any of them reports for all.
+METRICS_ENABLED = os.environ.get("DJANGO_METRICS", "1") == "1"
+METRICS_DIR = os.environ.get("METRICS_DIR") or None
+METRICS_FLUSH_INTERVAL = 1
+
+# Sampled request profiling, see `core/profiling.py`. Requests sending
+# `X-Profile: <PROFILING_TOKEN>` are always profiled. Off by default, then
+# it costs nothing.
+PROFILING_ENABLED = os.environ.get("DJANGO_PROFILING", "0") == "1"
+PROFILING_SAMPLE_RATE = float(
+    os.environ.get("DJANGO_PROFILING_SAMPLE_RATE", 0.001)
+)
+PROFILING_TOKEN = os.environ.get("DJANGO_PROFILING_TOKEN") or None
+PROFILING_DIR = os.environ.get(
+    "DJANGO_PROFILING_DIR", os.path.join(tempfile.gettempdir(), "profiles")
+)
+PROFILING_MAX_PROFILES = 500
+# seconds between two stack samples
+PROFILING_INTERVAL = 0.005
+
+# Portal feeds read by `python manage.py ingest_portals`, e.g.
+# {
+#     "portal": "naukri.com",  # existing `Portal.name`
+#     "adapter": "core.ingestion.adapters.JSONFeedAdapter",
+#     "source": "https://feeds.example.com/naukri/jobs.json",
+#     "concurrency": 4,  # requests in flight towards this portal
+# }
+INGESTION_SOURCES = []
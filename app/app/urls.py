@@ -16,19 +16,20 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularSwaggerView,
-)
+from core import health, metrics, openapi
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("healthz/", health.liveness, name="liveness"),
+    path("readyz/", health.readiness, name="readiness"),
+    path("metrics", metrics.metrics_view, name="metrics"),
     # TODO (TOPIC - how to start using `drf-spectacular`) - Refer
     # https://drf-spectacular.readthedocs.io/en/latest/readme.html#take-it-for-a-spin
-    path("api/schema/", SpectacularAPIView.as_view(), name="api-schema"),
+    # served from the files of `manage.py build_schema`, see `core/openapi.py`
+    path("api/schema/", openapi.schema_view, name="api-schema"),
     path(
         "api/docs/",
-        SpectacularSwaggerView.as_view(url_name="api-schema"),
+        openapi.SwaggerView.as_view(url_name="api-schema"),
         name="api-docs",
     ),
     path("api/user/", include("user.urls")),
@@ -0,0 +1,124 @@
+"""
+Performance benchmarks
+
+Every benchmark is a plain script run from the `app/` directory, e.g.
+
+    python -m benchmarks.list_indexes --rows 1000000
+
+Benchmarks never touch the configured database. They create a throw away
+test database (same as `python manage.py test`) and destroy it at the end.
+"""
+
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+
+def setup_django():
+    """Configure django so the ORM can be used from a plain script"""
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
+
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def test_database(keepdb=False):
+    """Create the test database, point `default` at it and clean up after"""
+
+    from django.db import connection
+    from django.test.utils import (
+        setup_test_environment,
+        teardown_test_environment,
+    )
+
+    # allows the `testserver` host used by the DRF / django test clients
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, keepdb=keepdb
+    )
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(
+            old_name, verbosity=0, keepdb=keepdb
+        )
+        teardown_test_environment()
+
+
+def timeit(func, repeat=20):
+    """Call `func` `repeat` times, return (p50, p95, max) in milliseconds"""
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return statistics.median(samples), p95, samples[-1]
+
+
+def seed_job_titles(rows, users=100, portals=20, batch_size=10000, out=None):
+    """Bulk insert `rows` job titles (and their descriptions)
+
+    Primary keys are assigned here so the one-to-one `job_description`
+    can be filled without reading ids back (MySQL `bulk_create` does not
+    return them). Titles are spread round-robin over `users` users and
+    `portals` portals. Returns the list of users.
+    """
+
+    from datetime import timedelta
+
+    from django.contrib.auth import get_user_model
+    from django.db import transaction
+    from django.utils import timezone
+
+    from core.models import JobDescription, JobTitle, Portal
+
+    User = get_user_model()
+    # hashing is not what we measure, use an unusable password
+    User.objects.bulk_create(
+        [User(email=f"bench{i}@example.com", name=f"bench {i}")
+         for i in range(users)]
+    )
+    user_objs = list(User.objects.order_by("id"))
+    Portal.objects.bulk_create(
+        [Portal(user=user_objs[i % users], name=f"portal-{i}.com",
+                description="benchmark portal")
+         for i in range(portals)]
+    )
+    portal_objs = list(Portal.objects.order_by("id"))
+
+    now = timezone.now()
+    start = time.perf_counter()
+    for low in range(1, rows + 1, batch_size):
+        high = min(low + batch_size, rows + 1)
+        descriptions = []
+        titles = []
+        for pk in range(low, high):
+            user = user_objs[pk % users]
+            moment = now - timedelta(seconds=rows - pk)
+            descriptions.append(JobDescription(
+                id=pk, user=user, role=f"role {pk}",
+                description_text="should know git, CICD and linux",
+                pub_date=moment,
+            ))
+            titles.append(JobTitle(
+                id=pk, user=user, title=f"title {pk}", last_updated=moment,
+                job_description_id=pk, portal=portal_objs[pk % portals],
+            ))
+        with transaction.atomic():
+            JobDescription.objects.bulk_create(descriptions)
+            JobTitle.objects.bulk_create(titles)
+        if out is not None:
+            rate = (high - 1) / (time.perf_counter() - start)
+            out.write(f"\rseeded {high - 1}/{rows} rows ({rate:,.0f}/s)")
+            out.flush()
+    if out is not None:
+        out.write("\n")
+    return user_objs
@@ -0,0 +1,228 @@
+"""
+Load benchmark: sync views under WSGI against async views under ASGI, with
+a slow database.
+
+    python -m benchmarks.asgi_vs_wsgi --concurrency 200 --db-latency 20
+
+Every SQL statement sleeps `--db-latency` ms first (an execute wrapper on
+every connection), standing in for a remote or loaded MySQL. Requests go
+through the real `WSGIHandler` / `ASGIHandler`, middleware included, from
+`--concurrency` clients in a closed loop:
+
+- wsgi / sync views: a pool of `--threads` worker threads, like
+  `gunicorn --threads`
+- asgi / sync views: one event loop, Django runs each view in a thread
+- asgi / async views: one event loop, `job/async_views.py`
+
+Throughput and p50 / p95 / p99 latency are printed for each, per endpoint
+(`--paths`).
+"""
+
+import argparse
+import asyncio
+import importlib
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import seed_job_titles, setup_django, test_database
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return [
+        samples[min(len(samples) - 1, int(len(samples) * share))] * 1000
+        for share in (0.5, 0.95, 0.99)
+    ]
+
+
+def use_async_views(enabled):
+    from django.conf import settings
+    from django.urls import clear_url_caches
+
+    settings.ASYNC_VIEWS = enabled
+    for name in ("job.urls", "user.urls", "app.urls"):
+        importlib.reload(importlib.import_module(name))
+    clear_url_caches()
+
+
+def run_wsgi(path, token, requests, concurrency, threads):
+    """Return (elapsed seconds, latencies, statuses)"""
+
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test.client import RequestFactory
+
+    handler = WSGIHandler()
+    factory = RequestFactory()
+    path, _, query = path.partition("?")
+
+    def call():
+        environ = factory._base_environ(
+            PATH_INFO=path, QUERY_STRING=query, REQUEST_METHOD="GET",
+            HTTP_AUTHORIZATION=f"Token {token}",
+        )
+        statuses = []
+        response = handler(
+            environ, lambda status, headers: statuses.append(status)
+        )
+        b"".join(response)
+        response.close()
+        return int(statuses[0][:3])
+
+    latencies, statuses = [], []
+    remaining = iter(range(requests))
+    lock = threading.Lock()
+
+    with ThreadPoolExecutor(max_workers=threads) as server:
+        def client():
+            while True:
+                with lock:
+                    if next(remaining, None) is None:
+                        return
+                start = time.perf_counter()
+                status = server.submit(call).result()
+                latencies.append(time.perf_counter() - start)
+                statuses.append(status)
+
+        start = time.perf_counter()
+        clients = [
+            threading.Thread(target=client) for _ in range(concurrency)
+        ]
+        for thread in clients:
+            thread.start()
+        for thread in clients:
+            thread.join()
+    return time.perf_counter() - start, latencies, statuses
+
+
+def run_asgi(path, token, requests, concurrency):
+    """Return (elapsed seconds, latencies, statuses)"""
+
+    from django.core.handlers.asgi import ASGIHandler
+
+    handler = ASGIHandler()
+    path, _, query = path.partition("?")
+
+    async def call():
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [
+                (b"host", b"testserver"),
+                (b"authorization", f"Token {token}".encode()),
+            ],
+            "client": ("127.0.0.1", 0),
+            "server": ("testserver", 80),
+        }
+        messages = [{"type": "http.request", "body": b""}]
+        statuses = []
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            # the client never disconnects
+            await asyncio.Event().wait()
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                statuses.append(message["status"])
+
+        await handler(scope, receive, send)
+        return statuses[0]
+
+    latencies, statuses = [], []
+
+    async def main():
+        remaining = iter(range(requests))
+
+        async def client():
+            while next(remaining, None) is not None:
+                start = time.perf_counter()
+                statuses.append(await call())
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(main())
+    return elapsed, latencies, statuses
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument(
+        "--db-latency", type=float, default=20.0,
+        help="milliseconds added to every SQL statement",
+    )
+    parser.add_argument(
+        "--paths", nargs="+",
+        default=["/api/jobtitle/jobtitles/", "/api/user/me/"],
+    )
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.conf import settings
+    from django.db.backends.signals import connection_created
+    from rest_framework.authtoken.models import Token
+
+    # no per query logging
+    settings.DEBUG = False
+
+    def slow_database(execute, sql, params, many, context):
+        time.sleep(args.db_latency / 1000)
+        return execute(sql, params, many, context)
+
+    def add_latency(sender, connection, **kwargs):
+        connection.execute_wrappers.append(slow_database)
+
+    out = sys.stdout
+    with test_database() as connection:
+        users = seed_job_titles(1000, users=1, out=out)
+        token = Token.objects.create(user=users[0]).key
+        connection_created.connect(add_latency)
+        connection.execute_wrappers.append(slow_database)
+
+        runs = [
+            ("wsgi / sync views", False, lambda path: run_wsgi(
+                path, token, args.requests, args.concurrency, args.threads
+            )),
+            ("asgi / sync views", False, lambda path: run_asgi(
+                path, token, args.requests, args.concurrency
+            )),
+            ("asgi / async views", True, lambda path: run_asgi(
+                path, token, args.requests, args.concurrency
+            )),
+        ]
+        out.write(
+            f"{args.requests} requests, {args.concurrency} clients, "
+            f"{args.threads} WSGI threads, {args.db_latency:g}ms per query\n"
+        )
+        for path in args.paths:
+            out.write(f"\n-- GET {path}\n")
+            for label, async_views, run in runs:
+                use_async_views(async_views)
+                elapsed, latencies, statuses = run(path)
+                p50, p95, p99 = percentiles(latencies)
+                errors = sum(status != 200 for status in statuses)
+                out.write(
+                    f"{label:<19} {len(latencies) / elapsed:7.1f} req/s "
+                    f"p50={p50:.0f}ms p95={p95:.0f}ms p99={p99:.0f}ms "
+                    f"errors={errors}\n"
+                )
+        connection_created.disconnect(add_latency)
+        use_async_views(False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark `POST /api/jobtitle/jobtitles/bulk/` throughput.
+
+    python -m benchmarks.bulk_job_titles --batches 10 --batch-size 5000
+
+Posts `--batches` lists of `--batch-size` titles through the full DRF stack
+and prints titles/second, first as plain creates, then as upserts over the
+same job descriptions.
+"""
+
+import argparse
+import sys
+import time
+
+from benchmarks import setup_django, test_database
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batches", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    from core.models import JobDescription, Portal
+
+    out = sys.stdout
+    with test_database():
+        user = get_user_model().objects.create(email="bench@example.com")
+        portal = Portal.objects.create(
+            user=user, name="bench.com", description="benchmark portal"
+        )
+        total = args.batches * args.batch_size
+        JobDescription.objects.bulk_create(
+            [JobDescription(id=pk, user=user, role=f"role {pk}",
+                            description_text="benchmark")
+             for pk in range(1, total + 1)],
+            batch_size=5000,
+        )
+
+        client = APIClient()
+        client.force_authenticate(user)
+        url = reverse("jobtitle:jobtitle-bulk")
+        batches = [
+            [{"title": f"title {pk}", "portal": portal.id,
+              "job_description": pk}
+             for pk in range(low, low + args.batch_size)]
+            for low in range(1, total + 1, args.batch_size)
+        ]
+
+        for label, query in [("create", ""), ("upsert", "?upsert=true")]:
+            start = time.perf_counter()
+            for batch in batches:
+                res = client.post(url + query, batch, format="json")
+                assert res.status_code == 200, res.data
+            elapsed = time.perf_counter() - start
+            out.write(
+                f"{label}: {total} titles in {elapsed:.2f}s "
+                f"({total / elapsed:,.0f} titles/s)\n"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark the streaming export: peak memory must not grow with row count.
+
+    python -m benchmarks.export_memory --sizes 100000 1000000 10000000
+
+For each size a fresh test database is seeded, then `GET
+.../jobtitles/export/` is streamed through the full DRF stack (the response
+is consumed and discarded, like a client writing it to disk). Peak Python
+heap growth while streaming is measured with `tracemalloc`.
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+
+from benchmarks import seed_job_titles, setup_django, test_database
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10000, 100000, 1000000]
+    )
+    parser.add_argument(
+        "--output", choices=["ndjson", "csv"], default="ndjson"
+    )
+    parser.add_argument("--gzip", action="store_true")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    out = sys.stdout
+    params = {"output": args.output, "gzip": str(args.gzip).lower()}
+    for size in args.sizes:
+        with test_database():
+            user, = seed_job_titles(size, users=1)
+            client = APIClient()
+            client.force_authenticate(user)
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            res = client.get(reverse("jobtitle:jobtitle-export"), params)
+            written = 0
+            for chunk in res.streaming_content:
+                written += len(chunk)
+            res.close()
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            out.write(
+                f"{size:>10,} rows: {written / 2 ** 20:8.1f} MiB in "
+                f"{elapsed:6.1f}s ({size / elapsed:,.0f} rows/s), "
+                f"peak heap {peak / 2 ** 20:.2f} MiB\n"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark JSON rendering and response compression per page size.
+
+    python -m benchmarks.json_compression --sizes 50 500 5000
+
+For each page size (job titles with their description and portal, as
+`?expand=job_description,portal` returns them), prints the CPU time
+(p50) and bytes of rendering with DRF's `JSONRenderer` and with
+`core.fast_json.FastJSONRenderer`, then of compressing the rendered page
+with each coding `core.compression` can negotiate here.
+"""
+
+import argparse
+import sys
+
+from benchmarks import seed_job_titles, setup_django, test_database, timeit
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[50, 500, 5000]
+    )
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from rest_framework.renderers import JSONRenderer
+
+    from core.compression import CODINGS
+    from core.fast_json import FastJSONRenderer
+    from core.models import JobTitle
+    from job.serializers import JobTitleDetailSerializer
+
+    out = sys.stdout
+    with test_database():
+        seed_job_titles(max(args.sizes), users=1, out=out)
+        context = {"expand": ["job_description", "portal"]}
+
+        for size in args.sizes:
+            queryset = JobTitle.objects.select_related(
+                "job_description", "portal"
+            ).order_by("-id")[:size]
+            data = {
+                "next": None,
+                "previous": None,
+                "results": JobTitleDetailSerializer(
+                    queryset, many=True, context=context
+                ).data,
+            }
+
+            out.write(f"\n-- page of {size}\n")
+            rendered = {}
+            for label, renderer in [
+                ("JSONRenderer", JSONRenderer()),
+                ("FastJSONRenderer", FastJSONRenderer()),
+            ]:
+                rendered[label] = renderer.render(data, "application/json")
+                p50, _, _ = timeit(
+                    lambda: renderer.render(data, "application/json"),
+                    repeat=args.repeat,
+                )
+                out.write(
+                    f"{label:<18} {p50:8.2f}ms "
+                    f"{len(rendered[label]):>10,} bytes\n"
+                )
+            assert len(set(rendered.values())) == 1, "outputs differ"
+
+            body = rendered["FastJSONRenderer"]
+            for name, coding in CODINGS.items():
+                compressed = coding.compress(body)
+                p50, _, _ = timeit(
+                    lambda: coding.compress(body), repeat=args.repeat
+                )
+                out.write(
+                    f"{name:<18} {p50:8.2f}ms {len(compressed):>10,} bytes "
+                    f"({len(compressed) / len(body):.0%})\n"
+                )
+
+
+if __name__ == "__main__":
+    main()
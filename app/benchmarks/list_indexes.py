@@ -0,0 +1,99 @@
+"""
+Benchmark the per-user / per-portal listing queries with and without the
+composite indexes added in `core/migrations/0002_...`.
+
+    python -m benchmarks.list_indexes --rows 1000000 --users 100
+
+For each query the EXPLAIN plan and p50/p95/max latency are printed, first
+with the composite indexes dropped, then with them in place.
+"""
+
+import argparse
+import sys
+
+from benchmarks import seed_job_titles, setup_django, test_database, timeit
+
+
+def queries(user, portal):
+    """Return `(label, queryset)` pairs mirroring the API access paths"""
+
+    from core.models import JobDescription, JobTitle
+    from job.filters import filter_job_titles
+
+    titles = JobTitle.objects.filter(user=user)
+    middle = titles.order_by("-id").values_list("id", flat=True)[
+        titles.count() // 2
+    ]
+    return [
+        ("jobtitle list, first page",
+         titles.order_by("-id")[:50]),
+        ("jobtitle list, deep cursor page",
+         titles.filter(id__lt=middle).order_by("-id")[:50]),
+        ("jobtitle list filtered by portal, deep cursor page",
+         filter_job_titles(titles, {"portal": str(portal.id)})
+         .filter(id__lt=middle).order_by("-id")[:50]),
+        ("jobtitle list filtered by title prefix",
+         filter_job_titles(titles, {"title_prefix": "title 1"})
+         .order_by("-id")[:50]),
+        ("jobtitle per portal by last_updated",
+         JobTitle.objects.filter(portal=portal)
+         .order_by("-last_updated")[:50]),
+        ("jobdescription per user by pub_date",
+         JobDescription.objects.filter(user=user).order_by("-pub_date")[:50]),
+    ]
+
+
+def composite_indexes():
+    """Return `(model, index)` for every composite index on core models"""
+
+    from django.apps import apps
+
+    return [
+        (model, index)
+        for model in apps.get_app_config("core").get_models()
+        for index in model._meta.indexes
+    ]
+
+
+def run(label, user, portal, repeat, out):
+    out.write(f"\n=== {label} ===\n")
+    for name, queryset in queries(user, portal):
+        p50, p95, worst = timeit(lambda: list(queryset.all()), repeat=repeat)
+        out.write(f"\n-- {name}\n")
+        out.write(f"p50={p50:.2f}ms p95={p95:.2f}ms max={worst:.2f}ms\n")
+        out.write(queryset.explain() + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--portals", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from core.models import Portal
+
+    out = sys.stdout
+    with test_database() as connection:
+        users = seed_job_titles(
+            args.rows, users=args.users, portals=args.portals, out=out
+        )
+        user = users[0]
+        portal = Portal.objects.order_by("id").first()
+
+        indexes = composite_indexes()
+        with connection.schema_editor() as editor:
+            for model, index in indexes:
+                editor.remove_index(model, index)
+        run("without composite indexes", user, portal, args.repeat, out)
+
+        with connection.schema_editor() as editor:
+            for model, index in indexes:
+                editor.add_index(model, index)
+        run("with composite indexes", user, portal, args.repeat, out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark list serialization: `JobTitleSerializer(many=True)` against the
+`values_list` plan of `job.fast_serializers`.
+
+    python -m benchmarks.list_serialization --sizes 1000 10000 100000
+
+For each size the query + serialization time (p50 / p95 / max) and rows per
+second are printed for both paths, and their outputs are checked to be
+equal. Then the same for `JobTitleDetailSerializer` with every field against
+`?fields=id,title` (`core.fieldsets`), with the JSON size of each.
+"""
+
+import argparse
+import json
+import sys
+
+from benchmarks import seed_job_titles, setup_django, test_database, timeit
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 10000, 100000]
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from core.models import JobTitle
+    from job.fast_serializers import compile_plan
+    from job.serializers import JobTitleDetailSerializer, JobTitleSerializer
+
+    out = sys.stdout
+    with test_database():
+        seed_job_titles(max(args.sizes), users=1, out=out)
+        plan = compile_plan(JobTitleSerializer)
+
+        for size in args.sizes:
+            queryset = JobTitle.objects.order_by("-id")[:size]
+            paths = [
+                ("serializer",
+                 lambda: JobTitleSerializer(queryset.all(), many=True).data),
+                ("values plan",
+                 lambda: plan.serialize(plan.values(queryset.all()))),
+            ]
+            assert paths[0][1]() == paths[1][1](), "outputs differ"
+
+            out.write(f"\n-- {size} rows\n")
+            for label, func in paths:
+                p50, p95, worst = timeit(func, repeat=args.repeat)
+                out.write(
+                    f"{label:<12} p50={p50:.1f}ms p95={p95:.1f}ms "
+                    f"max={worst:.1f}ms ({size / p50 * 1000:,.0f} rows/s)\n"
+                )
+
+            sparse = ("id", "title")
+            sparse_plan = compile_plan(JobTitleDetailSerializer, sparse)
+            paths = [
+                ("detail, all fields",
+                 lambda: JobTitleDetailSerializer(
+                     queryset.all(), many=True
+                 ).data),
+                ("detail, id,title",
+                 lambda: JobTitleDetailSerializer(
+                     queryset.only(*sparse), many=True,
+                     context={"fields": sparse},
+                 ).data),
+                ("detail plan, id,title",
+                 lambda: sparse_plan.serialize(
+                     sparse_plan.values(queryset.all())
+                 )),
+            ]
+            for label, func in paths:
+                p50, p95, worst = timeit(func, repeat=args.repeat)
+                size_kb = len(json.dumps(func(), default=str)) / 1024
+                out.write(
+                    f"{label:<22} p50={p50:.1f}ms p95={p95:.1f}ms "
+                    f"max={worst:.1f}ms, {size_kb:,.0f}KiB of JSON\n"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark logins/second with password hashing inline and in the pool.
+
+    python -m benchmarks.login_throughput --logins 200 --threads 8
+
+`--threads` clients post to `POST /api/user/token/` concurrently through
+the full DRF stack, once with hashes run in the request threads (the old
+behaviour) and once through a `core.hashing` pool of `--workers`
+processes. A bystander thread meanwhile requests a cheap endpoint; its p95
+latency shows how much a login burst stalls everybody else.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from benchmarks import setup_django, test_database
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from django.urls import reverse
+    from rest_framework.authtoken.models import Token
+    from rest_framework.test import APIClient
+
+    from core.hashing import HashingService
+
+    out = sys.stdout
+    with test_database():
+        users = [
+            get_user_model().objects.create_user(
+                f"bench{number}@example.com", "password@321"
+            )
+            for number in range(args.users)
+        ]
+        # logins only read the token, no write contention in the benchmark
+        for user in users:
+            Token.objects.create(user=user)
+        token_url = reverse("user:token")
+        me_url = reverse("user:me")
+
+        def login(number):
+            res = APIClient().post(token_url, {
+                "email": f"bench{number % args.users}@example.com",
+                "password": "password@321",
+            })
+            assert res.status_code == 200, res.data
+
+        def bystander(stop, samples):
+            client = APIClient()
+            client.force_authenticate(users[0])
+            while not stop.is_set():
+                start = time.perf_counter()
+                client.get(me_url)
+                samples.append((time.perf_counter() - start) * 1000)
+
+        modes = [
+            ("inline", HashingService(workers=0)),
+            (f"pool({args.workers})", HashingService(workers=args.workers)),
+        ]
+        for label, service in modes:
+            # start the workers outside of the measurement
+            service.make_passwords(["warm up"] * max(1, args.workers))
+            stop = threading.Event()
+            samples = []
+            watcher = threading.Thread(target=bystander, args=(stop, samples))
+            with patch("core.models.hashing_service", service):
+                watcher.start()
+                start = time.perf_counter()
+                with ThreadPoolExecutor(args.threads) as executor:
+                    list(executor.map(login, range(args.logins)))
+                elapsed = time.perf_counter() - start
+                stop.set()
+                watcher.join()
+            service.shutdown()
+
+            samples.sort()
+            p95 = samples[int(len(samples) * 0.95)] if samples else 0
+            out.write(
+                f"{label:<10} {args.logins / elapsed:8.1f} logins/s, "
+                f"bystander p50={statistics.median(samples or [0]):.1f}ms "
+                f"p95={p95:.1f}ms\n"
+            )
+
+
+if __name__ == "__main__":
+    main()
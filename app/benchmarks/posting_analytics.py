@@ -0,0 +1,74 @@
+"""
+Benchmark posting analytics: GROUP BY over the job title tables against the
+daily rollups of `core/rollups.py`.
+
+    python -m benchmarks.posting_analytics --sizes 10000 100000 1000000
+
+For each size a fresh database is seeded, the rollups rebuilt, and a 30
+day per portal series of one user computed both ways (p50 / p95 / max).
+The rollup time should stay flat as the tables grow.
+"""
+
+import argparse
+import sys
+
+from benchmarks import seed_job_titles, setup_django, test_database, timeit
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10000, 100000, 1000000]
+    )
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from datetime import timedelta
+
+    from django.db.models import Count
+    from django.db.models.functions import TruncDate
+    from django.utils import timezone
+
+    from core.models import JobTitle
+    from core.rollups import rebuild
+    from job.analytics import posting_series
+
+    out = sys.stdout
+    for size in args.sizes:
+        with test_database():
+            users = seed_job_titles(size, users=args.users, out=out)
+            rebuild()
+            user = users[0]
+            end = timezone.localdate()
+            start = end - timedelta(days=29)
+
+            def group_by():
+                return list(
+                    JobTitle.objects.filter(
+                        user=user,
+                        job_description__pub_date__date__range=(start, end),
+                    )
+                    .annotate(day=TruncDate("job_description__pub_date"))
+                    .values("portal_id", "day")
+                    .annotate(count=Count("id"))
+                    .order_by()
+                )
+
+            def rollups():
+                return posting_series(
+                    user, start, end, bucket="day", group_by="portal"
+                )
+
+            out.write(f"\n-- {size} rows\n")
+            for label, func in (("group by", group_by), ("rollups", rollups)):
+                p50, p95, worst = timeit(func, repeat=args.repeat)
+                out.write(
+                    f"{label:<9} p50={p50:.1f}ms p95={p95:.1f}ms "
+                    f"max={worst:.1f}ms\n"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+"""
+Replay a request log (or a synthetic mix) against the API, compare with a
+stored baseline.
+
+    python -m benchmarks.replay --requests 2000 --concurrency 16
+    python -m benchmarks.replay --log requests.jsonl --save-baseline base.json
+    python -m benchmarks.replay --baseline base.json
+    python -m benchmarks.replay --url http://127.0.0.1:8000 \\
+        --email me@example.com --password secret
+
+A log has one JSON request per line, `auth` (default true) sends the token
+of the benchmark user:
+
+    {"method": "GET", "path": "/api/jobtitle/jobtitles/?expand=portal"}
+    {"method": "POST", "path": "/api/user/token/", "auth": false,
+     "body": {"email": "me@example.com", "password": "secret"}}
+
+Without `--log`, `--mix` weighs the token, `/api/user/me/` and job title
+list endpoints, e.g. `--mix token=1,me=4,list=5`.
+
+Requests run in process through `WSGIHandler`, middleware included,
+against a seeded throw away database; `--url` targets a running server
+and its data instead. `--concurrency` clients send requests in a closed
+loop. Reported per view: p50 / p95 / p99 latency and SQL queries per
+request, read from the server's `/metrics` (`core/metrics.py`), plus the
+overall throughput.
+
+`--baseline` flags latencies or throughput worse than the baseline by
+more than `--tolerance`, and any extra query per request; the exit status
+is 1 when something regressed.
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from benchmarks import seed_job_titles, setup_django, test_database
+
+PASSWORD = "password@321"
+ENDPOINTS = {
+    "token": lambda email: {
+        "method": "POST", "path": "/api/user/token/", "auth": False,
+        "body": {"email": email, "password": PASSWORD},
+    },
+    "me": lambda email: {"method": "GET", "path": "/api/user/me/"},
+    "list": lambda email: {
+        "method": "GET", "path": "/api/jobtitle/jobtitles/",
+    },
+}
+SAMPLE = re.compile(r'^(\w+)\{(.*)\} (\S+)$')
+VIEW_LABEL = re.compile(r'view="((?:[^"\\]|\\.)*)"')
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return [
+        samples[min(len(samples) - 1, int(len(samples) * share))] * 1000
+        for share in (0.5, 0.95, 0.99)
+    ]
+
+
+class InProcess:
+    """Send requests straight to a `WSGIHandler`"""
+
+    def __init__(self):
+        from django.core.handlers.wsgi import WSGIHandler
+        from django.test.client import RequestFactory
+
+        self.handler = WSGIHandler()
+        self.factory = RequestFactory()
+
+    def request(self, method, path, body=None, headers=None):
+        """Return (status, body bytes)"""
+
+        environ = self.factory.generic(
+            method, path,
+            data=json.dumps(body) if body is not None else "",
+            content_type="application/json",
+            **{
+                "HTTP_" + name.upper().replace("-", "_"): value
+                for name, value in (headers or {}).items()
+            },
+        ).environ
+        statuses = []
+        response = self.handler(
+            environ, lambda status, headers: statuses.append(status)
+        )
+        try:
+            content = b"".join(response)
+        finally:
+            response.close()
+        return int(statuses[0][:3]), content
+
+
+class Remote:
+    """Send requests to a running server, one connection per thread"""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.connection_class = (
+            http.client.HTTPSConnection if parts.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        self.netloc = parts.netloc
+        self.local = threading.local()
+
+    def request(self, method, path, body=None, headers=None):
+        if not hasattr(self.local, "connection"):
+            self.local.connection = self.connection_class(self.netloc)
+        headers = dict(headers or {})
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers["Content-Type"] = "application/json"
+        connection = self.local.connection
+        try:
+            connection.request(method, path, body=payload, headers=headers)
+            response = connection.getresponse()
+            return response.status, response.read()
+        except (http.client.HTTPException, OSError):
+            del self.local.connection
+            raise
+
+
+def view_totals(transport):
+    """Return {view: (requests, queries)} from the `/metrics` counters"""
+
+    status, content = transport.request("GET", "/metrics")
+    if status != 200:
+        return {}
+    totals = defaultdict(lambda: [0, 0])
+    for line in content.decode().splitlines():
+        match = SAMPLE.match(line)
+        if match is None:
+            continue
+        name, labels, value = match.groups()
+        view = VIEW_LABEL.search(labels)
+        if view is None:
+            continue
+        if name == "http_request_duration_seconds_count":
+            totals[view.group(1)][0] += float(value)
+        elif name == "db_queries_total":
+            totals[view.group(1)][1] += float(value)
+    return totals
+
+
+def view_name(path):
+    from django.urls import Resolver404, resolve
+
+    try:
+        return resolve(urlsplit(path).path).view_name
+    except Resolver404:
+        return path
+
+
+def load_log(path):
+    with open(path) as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def synthetic(mix, email, count):
+    entries, weights = [], []
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        entries.append(ENDPOINTS[name.strip()](email))
+        weights.append(float(weight or 1))
+    return random.Random(0).choices(entries, weights=weights, k=count)
+
+
+def run(transport, entries, token, concurrency):
+    """Return (elapsed seconds, {view: latencies}, errors)"""
+
+    latencies = defaultdict(list)
+    errors = []
+    remaining = iter(entries)
+    lock = threading.Lock()
+
+    def client():
+        while True:
+            with lock:
+                entry = next(remaining, None)
+            if entry is None:
+                return
+            headers = {}
+            if entry.get("auth", True):
+                headers["Authorization"] = f"Token {token}"
+            start = time.perf_counter()
+            try:
+                status, _ = transport.request(
+                    entry.get("method", "GET"), entry["path"],
+                    body=entry.get("body"), headers=headers,
+                )
+            except (http.client.HTTPException, OSError) as exc:
+                status = repr(exc)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies[view_name(entry["path"])].append(elapsed)
+                if not isinstance(status, int) or status >= 400:
+                    errors.append((entry["path"], status))
+
+    start = time.perf_counter()
+    clients = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    return time.perf_counter() - start, latencies, errors
+
+
+def report(elapsed, latencies, before, after, out):
+    """Write the results, return them as a baseline dict"""
+
+    total = sum(map(len, latencies.values()))
+    results = {"throughput": total / elapsed, "views": {}}
+    out.write(
+        f"{total} requests in {elapsed:.1f}s, "
+        f"{results['throughput']:.1f} req/s\n\n"
+        f"{'view':<32} {'requests':>8} {'p50':>8} {'p95':>8} {'p99':>8} "
+        f"{'queries':>8}\n"
+    )
+    for view, samples in sorted(latencies.items()):
+        p50, p95, p99 = percentiles(samples)
+        requests = after.get(view, (0, 0))[0] - before.get(view, (0, 0))[0]
+        queries = None
+        if requests:
+            queries = (
+                after[view][1] - before.get(view, (0, 0))[1]
+            ) / requests
+        results["views"][view] = {
+            "p50": p50, "p95": p95, "p99": p99, "queries": queries,
+        }
+        out.write(
+            f"{view:<32} {len(samples):>8} {p50:>6.1f}ms {p95:>6.1f}ms "
+            f"{p99:>6.1f}ms "
+            + (f"{queries:>8.2f}" if queries is not None else f"{'-':>8}")
+            + "\n"
+        )
+    return results
+
+
+def compare(results, baseline, tolerance, out):
+    """Write regressions against `baseline`, return how many were found"""
+
+    regressions = []
+    if results["throughput"] < baseline["throughput"] * (1 - tolerance):
+        regressions.append(
+            f"throughput {results['throughput']:.1f} req/s < "
+            f"{baseline['throughput']:.1f} req/s"
+        )
+    for view, expected in baseline["views"].items():
+        measured = results["views"].get(view)
+        if measured is None:
+            continue
+        for key in ("p50", "p95", "p99"):
+            if measured[key] > expected[key] * (1 + tolerance):
+                regressions.append(
+                    f"{view} {key} {measured[key]:.1f}ms > "
+                    f"{expected[key]:.1f}ms"
+                )
+        if (
+            measured["queries"] is not None
+            and expected["queries"] is not None
+            and measured["queries"] > expected["queries"] + 0.01
+        ):
+            regressions.append(
+                f"{view} {measured['queries']:.2f} queries/request > "
+                f"{expected['queries']:.2f}"
+            )
+
+    out.write(f"\n-- against the baseline (tolerance {tolerance:.0%})\n")
+    for line in regressions:
+        out.write(f"REGRESSION {line}\n")
+    if not regressions:
+        out.write("no regression\n")
+    return len(regressions)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--log", help="JSON lines request log to replay")
+    parser.add_argument("--mix", default="token=1,me=4,list=5")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--url", help="running server, e.g. http://:8000")
+    parser.add_argument("--email", default="bench0@example.com")
+    parser.add_argument("--password", default=PASSWORD)
+    parser.add_argument("--baseline", help="JSON file to compare with")
+    parser.add_argument("--save-baseline", help="JSON file to write")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    setup_django()
+    out = sys.stdout
+
+    def benchmark(transport, token):
+        if args.log:
+            entries = load_log(args.log)
+            entries = list(itertools.islice(
+                itertools.cycle(entries), max(args.requests, len(entries))
+            ))
+        else:
+            entries = synthetic(args.mix, args.email, args.requests)
+        run(transport, entries[:args.warmup], token, args.concurrency)
+
+        before = view_totals(transport)
+        elapsed, latencies, errors = run(
+            transport, entries, token, args.concurrency
+        )
+        after = view_totals(transport)
+        if errors:
+            out.write(f"{len(errors)} failed requests, e.g. {errors[0]}\n")
+        return report(elapsed, latencies, before, after, out)
+
+    if args.url:
+        transport = Remote(args.url)
+        status, content = transport.request(
+            "POST", "/api/user/token/",
+            body={"email": args.email, "password": args.password},
+        )
+        if status != 200:
+            parser.error(f"login failed ({status}): {content[:200]!r}")
+        results = benchmark(transport, json.loads(content)["token"])
+    else:
+        from django.conf import settings
+        from rest_framework.authtoken.models import Token
+
+        # no per query logging
+        settings.DEBUG = False
+        with test_database():
+            user = seed_job_titles(args.rows, users=10, out=out)[0]
+            user.set_password(PASSWORD)
+            user.save()
+            token = Token.objects.create(user=user).key
+            args.email = user.email
+            results = benchmark(InProcess(), token)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if compare(results, baseline, args.tolerance, out):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
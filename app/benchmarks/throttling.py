@@ -0,0 +1,75 @@
+"""
+Benchmark the token bucket stores of `core/throttling.py`.
+
+    python -m benchmarks.throttling --keys 10000 --processes 4
+
+Times `consume` per call for the per process dict and for the memory
+mapped file, the latter from `--processes` processes hitting the same
+file at once (one key per request drawn from `--keys`).
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks import setup_django
+
+
+def _run(store, keys, calls):
+    draws = [f"auth.ip:{random.randrange(keys)}" for _ in range(calls)]
+    start = time.perf_counter()
+    for key in draws:
+        store.consume(key, 60, 1, 1)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def _worker(path, keys, calls, results):
+    from core.throttling import SharedBucketStore
+
+    results.put(_run(SharedBucketStore(path), keys, calls))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keys", type=int, default=10000)
+    parser.add_argument("--calls", type=int, default=100000)
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from core.throttling import MemoryBucketStore, SharedBucketStore
+
+    out = sys.stdout
+    micros = _run(MemoryBucketStore(), args.keys, args.calls)
+    out.write(f"memory, 1 process: {micros:.2f}us per consume\n")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "buckets")
+        micros = _run(SharedBucketStore(path), args.keys, args.calls)
+        out.write(f"shared, 1 process: {micros:.2f}us per consume\n")
+
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        workers = [
+            context.Process(
+                target=_worker, args=(path, args.keys, args.calls, results)
+            )
+            for _ in range(args.processes)
+        ]
+        for worker in workers:
+            worker.start()
+        micros = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        out.write(
+            f"shared, {args.processes} processes: "
+            f"{max(micros):.2f}us per consume (slowest process)\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
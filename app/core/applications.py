@@ -0,0 +1,70 @@
+"""
+Job applications and the per job title applicant counters
+
+`JobTitle.applicant_count` is denormalized so "top jobs by applicants" is an
+index range scan instead of a COUNT per title:
+
+- `apply` bumps the counter and inserts the application in one transaction,
+  two statements and no SELECT; the UPDATE also tells whether the job title
+  exists.
+- every deleted application (`withdraw`, or a cascade from its user)
+  decrements the counter through the `post_delete` signal in
+  `core/signals.py`.
+
+Any user applies for any job title: the counter is left out of
+`last_updated`, which orders and filters the owner's list, and validates
+the detail ETag on its own (see `job/conditional.py`).
+
+Counter updates are `F()` expressions, concurrent applications never lose
+an increment.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from core.models import Application, JobTitle
+
+
+class AlreadyApplied(Exception):
+    """The user has applied for this job title before"""
+
+
+def apply(user, job_title_id, cover_letter=""):
+    """Record `user`'s application for a job title, return it
+
+    Raises:
+        JobTitle.DoesNotExist: no such job title
+        AlreadyApplied: `user` applied for it before
+    """
+
+    try:
+        with transaction.atomic():
+            updated = JobTitle.objects.filter(pk=job_title_id).update(
+                applicant_count=F("applicant_count") + 1
+            )
+            if not updated:
+                raise JobTitle.DoesNotExist()
+            return Application.objects.create(
+                user=user,
+                job_title_id=job_title_id,
+                cover_letter=cover_letter,
+            )
+    except IntegrityError:
+        raise AlreadyApplied()
+
+
+def withdraw(user, job_title_id):
+    """Delete `user`'s application, return whether there was one"""
+
+    deleted, _ = Application.objects.filter(
+        user=user, job_title_id=job_title_id
+    ).delete()
+    return bool(deleted)
+
+
+def applicant_removed(job_title_id):
+    """Decrement the counter of a job title that lost an application"""
+
+    JobTitle.objects.filter(
+        pk=job_title_id, applicant_count__gt=0
+    ).update(applicant_count=F("applicant_count") - 1)
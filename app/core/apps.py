@@ -1,6 +1,20 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        # register signal handlers
+        from core import signals  # noqa
+
+        if settings.METRICS_ENABLED:
+            from core import metrics
+
+            metrics.install()
+        if settings.PROFILING_ENABLED:
+            from core import profiling
+
+            profiling.install()
@@ -0,0 +1,67 @@
+"""
+ASGI handler streaming responses from a thread
+
+Django 4.1's `ASGIHandler` iterates a streaming response on the event loop,
+where the queries of an export (`job/export.py`) raise
+`SynchronousOnlyOperation`. `ASGIHandler` here reads each chunk in the
+request's thread instead, one at a time while it is sent, so the body is
+never held in memory as a whole.
+"""
+
+import django
+from asgiref.sync import sync_to_async
+from django.core.handlers import asgi
+
+_END = object()
+
+
+def response_headers(response):
+    """The ASGI headers of `response`, as `ASGIHandler.send_response`"""
+
+    headers = []
+    for header, value in response.items():
+        if isinstance(header, str):
+            header = header.encode("ascii")
+        if isinstance(value, str):
+            value = value.encode("latin1")
+        headers.append((bytes(header), bytes(value)))
+    for cookie in response.cookies.values():
+        headers.append(
+            (b"Set-Cookie", cookie.output(header="").encode("ascii").strip())
+        )
+    return headers
+
+
+class ASGIHandler(asgi.ASGIHandler):
+    """`ASGIHandler` reading streaming responses in a thread"""
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            await super().send_response(response, send)
+            return
+        await send({
+            "type": "http.response.start",
+            "status": response.status_code,
+            "headers": response_headers(response),
+        })
+        parts = iter(response)
+        next_part = sync_to_async(next, thread_sensitive=True)
+        while True:
+            part = await next_part(parts, _END)
+            if part is _END:
+                break
+            for chunk, _ in self.chunk_bytes(part):
+                await send({
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": True,
+                })
+        await send({"type": "http.response.body"})
+        await sync_to_async(response.close, thread_sensitive=True)()
+
+
+def get_asgi_application():
+    """`django.core.asgi.get_asgi_application` with the handler above"""
+
+    django.setup(set_prefix=False)
+    return ASGIHandler()
@@ -0,0 +1,177 @@
+"""
+Async dispatch for DRF views served under ASGI
+
+DRF 3.14 views are synchronous: under ASGI, Django runs every request's
+view in a thread and the event loop waits for it, authentication and
+permission checks included. `AsyncDispatchMixin` awaits them instead:
+
+- authenticators with an `aauthenticate` method (e.g.
+  `CachedTokenAuthentication`) and permissions with `ahas_permission` are
+  awaited, DB free permissions (`SYNC_SAFE_PERMISSIONS`) and throttles
+  (`SYNC_SAFE_THROTTLES`) run inline, any other class runs through
+  `sync_to_async`
+- `async def` handlers are awaited; handlers that have not been ported
+  (writes going through serializer validation and signals) run through
+  `sync_to_async`, as the whole view did before
+
+Views stay compatible with their sync parent: an async view class is a
+subclass of the sync one that overrides the hot handlers with `async def`
+versions using the async ORM (`aget`, `aaggregate`, `async for`, ...).
+
+NOTE :: Django 4.1 has no async database driver, its async ORM methods run
+the query in the request's thread-sensitive executor. The event loop stays
+free while queries run; the query itself still holds a thread.
+"""
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from rest_framework import exceptions
+from rest_framework.permissions import (
+    AllowAny,
+    IsAuthenticated,
+    IsAuthenticatedOrReadOnly,
+)
+
+from core.throttling import BucketThrottle
+
+# `has_permission` only looks at the already authenticated request
+SYNC_SAFE_PERMISSIONS = (AllowAny, IsAuthenticated, IsAuthenticatedOrReadOnly)
+# microseconds of memory mapped bookkeeping, no I/O
+SYNC_SAFE_THROTTLES = (BucketThrottle,)
+
+
+async def _call(func, *args, **kwargs):
+    """Await `func(...)` in a thread unless it is a coroutine function"""
+
+    if asyncio.iscoroutinefunction(func):
+        return await func(*args, **kwargs)
+    return await sync_to_async(func)(*args, **kwargs)
+
+
+class AsyncDispatchMixin:
+    """Dispatch a DRF `APIView` / `ViewSet` on the event loop"""
+
+    # every handler is awaited by `dispatch`, sync ones in a thread
+    view_is_async = True
+
+    @classmethod
+    def as_view(cls, *args, **initkwargs):
+        view = super().as_view(*args, **initkwargs)
+        # DRF wraps the view in `csrf_exempt`, which (Django 4.1) hides
+        # that it returns a coroutine
+        view._is_coroutine = asyncio.coroutines._is_coroutine
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        """`APIView.dispatch` awaiting checks and handler"""
+
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(request, *args, **kwargs)
+            handler = self.http_method_not_allowed
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            response = await _call(handler, request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(
+            request, response, *args, **kwargs
+        )
+        return self.response
+
+    async def ainitial(self, request, *args, **kwargs):
+        """`APIView.initial` awaiting authentication and permissions"""
+
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+        neg = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = neg
+        version, scheme = self.determine_version(request, *args, **kwargs)
+        request.version, request.versioning_scheme = version, scheme
+
+        await self.aperform_authentication(request)
+        await self.acheck_permissions(request)
+        throttles = self.get_throttles()
+        if all(isinstance(throttle, SYNC_SAFE_THROTTLES)
+               for throttle in throttles):
+            self.check_throttles(request)
+        else:
+            await sync_to_async(self.check_throttles)(request)
+
+    async def aperform_authentication(self, request):
+        """Resolve `request.user` / `request.auth`, as `Request._authenticate`
+
+        Sets them eagerly, so `request.user` never queries from async code.
+        """
+
+        for authenticator in request.authenticators:
+            method = getattr(
+                authenticator, "aauthenticate", authenticator.authenticate
+            )
+            try:
+                user_auth = await _call(method, request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+            if user_auth is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth
+                return
+        request._not_authenticated()
+
+    async def acheck_permissions(self, request):
+        for permission in self.get_permissions():
+            if not await self._allowed(permission, "has_permission", request):
+                self.permission_denied(
+                    request,
+                    message=getattr(permission, "message", None),
+                    code=getattr(permission, "code", None),
+                )
+
+    async def acheck_object_permissions(self, request, obj):
+        for permission in self.get_permissions():
+            if not await self._allowed(
+                permission, "has_object_permission", request, obj
+            ):
+                self.permission_denied(
+                    request,
+                    message=getattr(permission, "message", None),
+                    code=getattr(permission, "code", None),
+                )
+
+    async def _allowed(self, permission, name, request, *args):
+        method = getattr(permission, f"a{name}", None)
+        if method is not None:
+            return await method(request, self, *args)
+        method = getattr(permission, name)
+        if isinstance(permission, SYNC_SAFE_PERMISSIONS):
+            return method(request, self, *args)
+        return await sync_to_async(method)(request, self, *args)
+
+    async def aget_object(self):
+        """`GenericAPIView.get_object` with the async ORM"""
+
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        except (queryset.model.DoesNotExist, TypeError, ValueError,
+                ValidationError):
+            raise Http404
+        await self.acheck_object_permissions(self.request, obj)
+        return obj
+
+    async def options(self, request, *args, **kwargs):
+        return await sync_to_async(super().options)(request, *args, **kwargs)
@@ -0,0 +1,201 @@
+"""
+Response compression negotiated from `Accept-Encoding`
+
+`CompressionMiddleware` encodes a response with the coding the client
+prefers (`q` values), the server's order breaking ties: zstd, br, gzip.
+zstd and br need the `zstandard` and `brotli` packages, and are only
+offered when they are installed; gzip is the stdlib `zlib`.
+
+Left as they are:
+
+- bodies under `COMPRESSION_MIN_SIZE` bytes, which fit in a packet anyway,
+  and bodies the coding would not make smaller
+- types that do not compress (images, the gzip exports) or are already
+  encoded; only text, JSON, YAML and CSV types are compressed
+- HTML: the pages embed CSRF tokens, which compression leaks to an
+  attacker able to inject text into a page (BREACH). API bodies, the large
+  responses here, carry no secrets.
+- `Cache-Control: no-transform`
+
+Streaming responses (the exports) are compressed chunk by chunk, each
+chunk flushed, so rows reach the client as they are read. Compressed
+responses carry `Vary: Accept-Encoding`, and a strong ETag becomes weak as
+in Django's `GZipMiddleware`: the bytes differ per coding.
+"""
+
+import re
+import zlib
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+class Gzip:
+    name = "gzip"
+    level = 6
+
+    def _compressor(self):
+        return zlib.compressobj(
+            self.level, zlib.DEFLATED, zlib.MAX_WBITS | 16
+        )
+
+    def compress(self, data):
+        compressor = self._compressor()
+        return compressor.compress(data) + compressor.flush()
+
+    def stream(self, chunks):
+        compressor = self._compressor()
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
+
+
+class Brotli:
+    name = "br"
+    # the high qualities are for static files, far too slow per request
+    quality = 5
+
+    def compress(self, data):
+        return brotli.compress(data, quality=self.quality)
+
+    def stream(self, chunks):
+        compressor = brotli.Compressor(quality=self.quality)
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+
+
+class Zstd:
+    name = "zstd"
+    level = 3
+
+    def compress(self, data):
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def stream(self, chunks):
+        compressor = zstandard.ZstdCompressor(level=self.level).compressobj()
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            data += compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+            if data:
+                yield data
+        yield compressor.flush()
+
+
+# server preference, best first
+CODINGS = {
+    coding.name: coding
+    for coding, module in [(Zstd(), zstandard), (Brotli(), brotli)]
+    if module is not None
+}
+CODINGS["gzip"] = Gzip()
+
+COMPRESSIBLE = {
+    "application/json",
+    "application/javascript",
+    "application/x-ndjson",
+    "application/xml",
+    "application/yaml",
+    "application/vnd.oai.openapi",
+    "image/svg+xml",
+}
+
+_coding_re = re.compile(r"^\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?\s*$")
+
+
+@lru_cache(maxsize=256)
+def negotiate(accept_encoding, available=tuple(CODINGS)):
+    """Return the coding of `available` to use, None for none
+
+    Args:
+        accept_encoding: the `Accept-Encoding` header
+        available: coding names, in server preference
+    """
+
+    weights = {}
+    for item in accept_encoding.lower().split(","):
+        match = _coding_re.match(item)
+        if match is None:
+            continue
+        try:
+            weights[match[1]] = float(match[2] or 1)
+        except ValueError:
+            continue
+    default = weights.get("*", 0)
+    best, best_weight = None, 0
+    for name in available:
+        weight = weights.get(name, default)
+        if weight > best_weight:
+            best, best_weight = name, weight
+    return best
+
+
+def compressible(content_type):
+    """Whether a body of `content_type` is worth compressing"""
+
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type == "text/html":
+        # see BREACH in the module doc
+        return False
+    return (
+        media_type.startswith("text/")
+        or media_type in COMPRESSIBLE
+        or media_type.endswith(("+json", "+xml"))
+    )
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Compress responses as negotiated, see the module doc"""
+
+    def process_response(self, request, response):
+        if (
+            response.has_header("Content-Encoding")
+            or not compressible(response.get("Content-Type", ""))
+            or "no-transform" in response.get("Cache-Control", "")
+        ):
+            return response
+        if not response.streaming and (
+            len(response.content) < settings.COMPRESSION_MIN_SIZE
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        name = negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if name is None:
+            return response
+        coding = CODINGS[name]
+
+        if response.streaming:
+            response.streaming_content = coding.stream(
+                response.streaming_content
+            )
+            # the size is unknown until the end
+            response.headers.pop("Content-Length", None)
+        else:
+            compressed = coding.compress(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response["Content-Length"] = str(len(compressed))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = name
+        return response
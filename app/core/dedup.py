@@ -0,0 +1,245 @@
+"""
+Near-duplicate detection of job titles with MinHash and LSH
+
+1. The title, role and description text of a job title are split into
+   overlapping word shingles, each hashed to 32 bits.
+2. `NUM_PERM` universal hash functions `(a * x + b) mod PRIME` are applied
+   to every shingle hash; the minimum per function is the MinHash signature.
+   The share of equal positions in two signatures estimates the Jaccard
+   similarity of their shingle sets.
+3. The signature is cut into `BANDS` bands of `ROWS` values. Titles with an
+   equal band land in the same bucket and become candidates, so finding the
+   duplicates of a new title reads a few index ranges instead of every
+   signature of the user.
+4. Candidates with an estimated similarity of at least `THRESHOLD` join the
+   same cluster, identified by its oldest job title's id.
+
+Signatures of a whole batch are computed at once with NumPy.
+"""
+
+import hashlib
+import re
+import zlib
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Min
+
+from core.models import JobTitle, JobTitleLSHBucket, JobTitleSignature
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+THRESHOLD = 0.8
+
+# bucket ids per candidate lookup query
+LOOKUP_BATCH_SIZE = 500
+
+# largest prime below 2**32: `a * x + b` with a, b, x < 2**32 fits in uint64
+PRIME = np.uint64(4294967291)
+
+# fixed seed, signatures must be stable across processes and deploys
+_rng = np.random.default_rng(20230201)
+_A = _rng.integers(1, int(PRIME), size=NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, int(PRIME), size=NUM_PERM, dtype=np.uint64)
+
+WORD_RE = re.compile(r"[^\W_]+")
+
+
+def shingles(text):
+    """Return the set of 32 bit hashes of `text`'s word shingles"""
+
+    words = WORD_RE.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        grams = [" ".join(words)] if words else [""]
+    else:
+        grams = [
+            " ".join(words[i:i + SHINGLE_SIZE])
+            for i in range(len(words) - SHINGLE_SIZE + 1)
+        ]
+    return {zlib.crc32(gram.encode("utf-8")) for gram in grams}
+
+
+def minhash_batch(texts):
+    """Return a `(len(texts), NUM_PERM)` uint32 array of signatures
+
+    All shingle hashes of the batch are concatenated and hashed in one
+    vectorized pass, `np.minimum.reduceat` then takes the per text minimum.
+    """
+
+    hashed = [np.fromiter(shingles(text), dtype=np.uint64) for text in texts]
+    if not hashed:
+        return np.empty((0, NUM_PERM), dtype=np.uint32)
+    lengths = np.array([len(h) for h in hashed])
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    values = np.concatenate(hashed)
+
+    # (NUM_PERM, total shingles)
+    permuted = (_A[:, None] * values[None, :] + _B[:, None]) % PRIME
+    signatures = np.minimum.reduceat(permuted, offsets, axis=1)
+    return signatures.T.astype(np.uint32)
+
+
+def band_buckets(signature):
+    """Return the `BANDS` bucket ids (signed 64 bit) of one signature"""
+
+    buckets = []
+    for band in range(BANDS):
+        chunk = signature[band * ROWS:(band + 1) * ROWS].tobytes()
+        digest = hashlib.blake2b(chunk, digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, "little", signed=True))
+    return buckets
+
+
+def similarity(first, second):
+    """Estimated Jaccard similarity of two signatures"""
+
+    return float(np.count_nonzero(first == second)) / NUM_PERM
+
+
+def to_bytes(signature):
+    return signature.astype("<u4").tobytes()
+
+
+def from_bytes(data):
+    return np.frombuffer(bytes(data), dtype="<u4")
+
+
+def index_signatures(job_titles):
+    """Compute signatures and assign clusters for the `job_titles` queryset
+
+    Titles are processed oldest first, so within a batch later titles join
+    the clusters of earlier ones exactly as if they had been saved one by
+    one. Called on save through signals and after `bulk_create`.
+    """
+
+    rows = list(
+        job_titles.order_by("id").values_list(
+            "id", "user_id", "title",
+            "job_description__role",
+            "job_description__description_text",
+        )
+    )
+    if not rows:
+        return
+    signatures = minhash_batch(
+        [f"{title} {role} {text}" for _, _, title, role, text in rows]
+    )
+    buckets = [band_buckets(signature) for signature in signatures]
+    ids = [row[0] for row in rows]
+
+    with transaction.atomic():
+        JobTitleSignature.objects.filter(job_title_id__in=ids).delete()
+        JobTitleLSHBucket.objects.filter(job_title_id__in=ids).delete()
+
+        # (user, band, bucket) -> job title ids, already stored ones first
+        known = {}
+        user_buckets = {}
+        for (_, user_id, *_), title_buckets in zip(rows, buckets):
+            user_buckets.setdefault(user_id, set()).update(title_buckets)
+        for user_id, wanted in user_buckets.items():
+            wanted = sorted(wanted)
+            # bounded IN lists, a backfill batch has BANDS buckets per title
+            for start in range(0, len(wanted), LOOKUP_BATCH_SIZE):
+                for job_title_id, band, bucket in (
+                    JobTitleLSHBucket.objects.filter(
+                        user_id=user_id,
+                        bucket__in=wanted[start:start + LOOKUP_BATCH_SIZE],
+                    ).values_list("job_title_id", "band", "bucket")
+                ):
+                    known.setdefault((user_id, band, bucket), []).append(
+                        job_title_id
+                    )
+
+        # job title id -> (signature, cluster id)
+        candidates = {}
+        stored = sorted({pk for pks in known.values() for pk in pks})
+        for start in range(0, len(stored), LOOKUP_BATCH_SIZE):
+            for pk, minhash, cluster_id in JobTitleSignature.objects.filter(
+                job_title_id__in=stored[start:start + LOOKUP_BATCH_SIZE]
+            ).values_list("job_title_id", "minhash", "cluster_id"):
+                candidates[pk] = (from_bytes(minhash), cluster_id)
+
+        new_signatures = []
+        new_buckets = []
+        # cluster id -> smaller cluster id it was merged into
+        merges = {}
+
+        def resolve(cluster_id):
+            while cluster_id in merges:
+                cluster_id = merges[cluster_id]
+            return cluster_id
+
+        for (pk, user_id, *_), signature, title_buckets in zip(
+            rows, signatures, buckets
+        ):
+            clusters = set()
+            for band, bucket in enumerate(title_buckets):
+                for other in known.get((user_id, band, bucket), ()):
+                    other_signature, other_cluster = candidates[other]
+                    if similarity(signature, other_signature) >= THRESHOLD:
+                        clusters.add(resolve(other_cluster))
+            cluster_id = min(clusters | {pk})
+            for merged in clusters - {cluster_id}:
+                merges[merged] = cluster_id
+
+            candidates[pk] = (signature, cluster_id)
+            new_signatures.append(JobTitleSignature(
+                job_title_id=pk,
+                user_id=user_id,
+                minhash=to_bytes(signature),
+                cluster_id=cluster_id,
+            ))
+            for band, bucket in enumerate(title_buckets):
+                known.setdefault((user_id, band, bucket), []).append(pk)
+                new_buckets.append(JobTitleLSHBucket(
+                    job_title_id=pk, user_id=user_id, band=band, bucket=bucket
+                ))
+
+        JobTitleSignature.objects.bulk_create(new_signatures, batch_size=1000)
+        JobTitleLSHBucket.objects.bulk_create(new_buckets, batch_size=1000)
+        for merged, cluster_id in merges.items():
+            JobTitleSignature.objects.filter(cluster_id=merged).update(
+                cluster_id=cluster_id
+            )
+
+
+def reroot_cluster(signature):
+    """Move the cluster of a deleted root `signature` to its oldest member
+
+    A cluster is identified by its oldest member's id, so the survivors of
+    a deleted oldest member would otherwise be collapsed into nothing.
+    """
+
+    if signature.cluster_id != signature.job_title_id:
+        return
+    members = JobTitleSignature.objects.filter(
+        user_id=signature.user_id, cluster_id=signature.cluster_id
+    )
+    root = members.aggregate(root=Min("job_title_id"))["root"]
+    if root is not None:
+        members.update(cluster_id=root)
+
+
+def backfill(batch_size=5000, out=None):
+    """Compute signatures of every job title, oldest first
+
+    Returns the number of processed job titles.
+    """
+
+    last_id = 0
+    total = 0
+    while True:
+        ids = list(
+            JobTitle.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return total
+        index_signatures(JobTitle.objects.filter(id__in=ids))
+        total += len(ids)
+        last_id = ids[-1]
+        if out is not None:
+            out.write(f"processed {total} job titles")
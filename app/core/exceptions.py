@@ -0,0 +1,30 @@
+"""
+API responses of the domain exceptions raised below the views
+
+The model layer raises plain exceptions, as management commands and the
+admin call it too; `exception_handler`, the `EXCEPTION_HANDLER` of
+`REST_FRAMEWORK`, turns them into their DRF counterpart.
+"""
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.views import exception_handler as drf_exception_handler
+
+from core.hashing import HashingOverloaded
+
+
+class ServiceBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Server busy, retry shortly."
+    default_code = "service_busy"
+
+
+def exception_handler(exc, context):
+    """DRF's exception handler, knowing the domain exceptions"""
+
+    if isinstance(exc, HashingOverloaded):
+        busy = ServiceBusy()
+        # sent as `Retry-After`
+        busy.wait = exc.retry_after
+        exc = busy
+    return drf_exception_handler(exc, context)
@@ -0,0 +1,100 @@
+"""
+JSON rendering and parsing with orjson
+
+`FastJSONRenderer` / `FastJSONParser`, the defaults of `REST_FRAMEWORK`,
+produce and accept the same JSON as DRF's `JSONRenderer` / `JSONParser`:
+compact UTF-8, U+2028 / U+2029 escaped, non JSON types (lazy strings,
+decimals, querysets, ...) encoded by DRF's `JSONEncoder`. orjson does it in
+a fraction of the CPU time of the stdlib `json`.
+
+They fall back to their DRF parent, the stdlib, when orjson is not
+installed, and for what orjson does not do: indents other than 2 (the
+browsable API), ASCII only output (`UNICODE_JSON = False`), integers
+beyond 64 bits, request bodies not in UTF-8.
+"""
+
+import json
+
+from django.conf import settings
+from rest_framework import parsers, renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.json import strict_constant
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# dict keys converted as `json` does, numpy values natively (DRF's
+# encoder calls their `tolist()`), dates and times by DRF's encoder (UTC as
+# `Z` rather than `+00:00`, times to the millisecond)
+OPTIONS = 0 if orjson is None else (
+    orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_SERIALIZE_NUMPY
+    | orjson.OPT_PASSTHROUGH_DATETIME
+)
+_default = JSONEncoder().default
+
+
+def dumps(obj):
+    """Return `obj` as compact UTF-8 JSON bytes"""
+
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=_default, option=OPTIONS)
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(
+        obj,
+        cls=JSONEncoder,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        allow_nan=not api_settings.STRICT_JSON,
+    ).encode("utf-8")
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """`JSONRenderer` encoding with orjson"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if orjson is None or indent not in (None, 2) or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        option = OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            ret = orjson.dumps(data, default=_default, option=option)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # as the parent: valid JSON, but not valid JavaScript
+        if b"\xe2\x80" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+        return ret
+
+
+class FastJSONParser(parsers.JSONParser):
+    """`JSONParser` decoding with orjson"""
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get(
+            "encoding", settings.DEFAULT_CHARSET
+        )
+        if orjson is None or encoding.lower() not in ("utf-8", "utf8"):
+            return super().parse(stream, media_type, parser_context)
+        content = stream.read()
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError as exc:
+            # e.g. an integer beyond 64 bits, the stdlib decides
+            parse_constant = strict_constant if self.strict else None
+            try:
+                return json.loads(content, parse_constant=parse_constant)
+            except ValueError:
+                raise ParseError(f"JSON parse error - {exc}")
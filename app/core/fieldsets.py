@@ -0,0 +1,158 @@
+"""
+Sparse fieldsets, `?fields=id,title`
+
+A read request naming fields gets only those in its response objects:
+
+- `SparseFieldsViewMixin` validates the names against the readable fields
+  of the view's serializer (400 on an unknown one), passes them to the
+  serializer in its `fields` context entry and narrows the queryset with
+  `.only()`, so unrequested columns are never selected
+- `SparseFieldsMixin` serializers keep only the fields of that entry
+
+Fast lists (`job.fast_serializers`) compile their values plan for the
+chosen fields instead, with the same effect on the SELECT. The OpenAPI
+parameter, `fields_parameter`, lists the same names as choices.
+"""
+
+from django.core.exceptions import FieldDoesNotExist
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAMETER = "fields"
+
+
+def readable_fields(serializer):
+    """Return {name: field} of the fields `serializer` outputs"""
+
+    return {
+        name: field for name, field in serializer.fields.items()
+        if not field.write_only
+    }
+
+
+def fields_parameter(serializer_class):
+    """Return the `?fields=` parameter of views on `serializer_class`
+
+    Its choices are the readable fields, plus the `expandable_fields` of
+    `job.serializers.ExpandableFieldsMixin` serializers.
+    """
+
+    names = list(readable_fields(serializer_class()))
+    description = (
+        "Comma separated fields of the response objects, all if omitted. "
+        "Other fields are neither returned nor read from the database."
+    )
+    expandable = [
+        name for name in getattr(serializer_class, "expandable_fields", {})
+        if name not in names
+    ]
+    if expandable:
+        names += expandable
+        description += (
+            f" {', '.join(f'`{name}`' for name in expandable)}: along "
+            f"with `?expand=` only."
+        )
+    return OpenApiParameter(
+        FIELDS_PARAMETER,
+        {"type": "array", "items": {"type": "string", "enum": names}},
+        style="form",
+        explode=False,
+        description=description,
+    )
+
+
+class SparseFieldsMixin:
+    """Serializer keeping only the fields of its `fields` context entry"""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        names = self.context.get("fields")
+        if names is None:
+            return fields
+        return {
+            name: field for name, field in fields.items() if name in names
+        }
+
+
+class SparseFieldsViewMixin:
+    """`?fields=` on the read requests of a generic view"""
+
+    # viewset actions accepting `?fields=`, None for every GET / HEAD
+    sparse_actions = None
+    # columns the view reads whatever the fields, e.g. its validators
+    sparse_always_load = ()
+
+    def get_sparse_fields(self):
+        """Return the requested field names in serializer order, or None
+
+        Raises:
+            ValidationError: an unknown field was requested
+        """
+
+        if not hasattr(self, "_sparse_fields"):
+            # the serializer below gets every field meanwhile
+            self._sparse_fields = None
+            self._sparse_columns = None
+            names = self._requested_fields()
+            if names:
+                fields = readable_fields(self.get_serializer())
+                unknown = [name for name in names if name not in fields]
+                if unknown:
+                    raise ValidationError({
+                        FIELDS_PARAMETER: [
+                            f"Unknown field: {', '.join(unknown)}. Choose "
+                            f"from {', '.join(fields)}."
+                        ]
+                    })
+                self._sparse_fields = tuple(
+                    name for name in fields if name in names
+                )
+                self._sparse_columns = self._columns(
+                    [fields[name] for name in self._sparse_fields]
+                )
+        return self._sparse_fields
+
+    def _requested_fields(self):
+        if self.request.method not in ("GET", "HEAD"):
+            return []
+        if self.sparse_actions is not None and (
+            getattr(self, "action", None) not in self.sparse_actions
+        ):
+            return []
+        names = self.request.query_params.get(FIELDS_PARAMETER, "")
+        return list(dict.fromkeys(
+            name.strip() for name in names.split(",") if name.strip()
+        ))
+
+    def _columns(self, fields):
+        """Return the model fields to load for `fields`, None for all"""
+
+        queryset = getattr(self, "queryset", None)
+        if queryset is None:
+            return None
+        model = queryset.model
+        columns = list(self.sparse_always_load)
+        for field in fields:
+            # e.g. a method field or `source="*"`, reading anything
+            if not field.source_attrs:
+                return None
+            try:
+                column = model._meta.get_field(field.source_attrs[0])
+            except FieldDoesNotExist:
+                return None
+            if not column.concrete or column.many_to_many:
+                return None
+            columns.append(column.name)
+        return columns
+
+    def narrow_queryset(self, queryset):
+        """Load only the columns of the requested fields of `queryset`"""
+
+        if self.get_sparse_fields() is None or self._sparse_columns is None:
+            return queryset
+        return queryset.only(*self._sparse_columns)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fields"] = self.get_sparse_fields()
+        return context
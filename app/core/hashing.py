@@ -0,0 +1,155 @@
+"""
+Password hashing in a process pool
+
+PBKDF2 at Django's default iteration count is tens of milliseconds of pure
+CPU per call and holds the GIL, so a burst of logins or sign ups stalls
+every other request served by the same worker. `User.set_password` and
+`User.check_password` hand the work to `hashing_service` instead: hashes
+run in worker processes on other cores while the request thread waits.
+Each server process starts its own pool, of `PASSWORD_HASHING_WORKERS`
+processes (1 by default): size it so that, times the server processes, it
+stays around the number of cores.
+
+At most `max_pending` hashes are queued or running per process; beyond
+that requests fail fast with `HashingOverloaded` instead of piling up
+behind a queue they would time out in anyway; the API answers it with 503
++ `Retry-After`, see `core/exceptions.py`.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class HashingOverloaded(Exception):
+    """Too many password hashes queued, the client should retry"""
+
+    # seconds before retrying
+    retry_after = 1
+
+
+def _setup_worker():
+    # `spawn`ed workers start from a fresh interpreter
+    import django
+
+    django.setup()
+
+
+def _make_password(password):
+    return hashers.make_password(password)
+
+
+def _check_password(password, encoded):
+    return hashers.check_password(password, encoded)
+
+
+def must_update(encoded):
+    """True if `encoded` was made with another hasher or weaker settings"""
+
+    try:
+        hasher = hashers.identify_hasher(encoded)
+    except ValueError:
+        return False
+    preferred = hashers.get_hasher("default")
+    return (
+        hasher.algorithm != preferred.algorithm
+        or preferred.must_update(encoded)
+    )
+
+
+class HashingService:
+    """Runs password hashers in a lazily started process pool
+
+    Args:
+        workers: pool size, 0 hashes in the calling thread
+        max_pending: hashes queued or running before `HashingOverloaded`
+        timeout: seconds to wait for one hash
+    """
+
+    def __init__(self, workers, max_pending=64, timeout=10):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                # forking a threaded server process is unsafe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_setup_worker,
+                )
+            return self._pool
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    def _run(self, func, *args):
+        if self.workers <= 0:
+            return func(*args)
+        if not self._slots.acquire(blocking=False):
+            raise HashingOverloaded()
+        try:
+            future = self.get_pool().submit(func, *args)
+        except BrokenProcessPool:
+            self._slots.release()
+            # a worker died; start a new pool next time, hash here now
+            self.shutdown()
+            return func(*args)
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise HashingOverloaded()
+
+    def make_password(self, password):
+        """`django.contrib.auth.hashers.make_password` in the pool"""
+
+        if password is None:
+            # unusable password, nothing to hash
+            return hashers.make_password(None)
+        return self._run(_make_password, password)
+
+    def check_password(self, password, encoded, setter=None):
+        """`django.contrib.auth.hashers.check_password` in the pool
+
+        `setter(password)` is called to upgrade a valid hash made with an
+        outdated hasher, as Django does.
+        """
+
+        if password is None or not hashers.is_password_usable(encoded):
+            return False
+        valid = self._run(_check_password, password, encoded)
+        if valid and setter is not None and must_update(encoded):
+            setter(password)
+        return valid
+
+    def make_passwords(self, passwords, chunksize=16):
+        """Hash many passwords across all workers, in order
+
+        For bulk jobs: not bounded by `max_pending`.
+        """
+
+        if self.workers <= 0:
+            return [_make_password(password) for password in passwords]
+        return list(
+            self.get_pool().map(_make_password, passwords, chunksize=chunksize)
+        )
+
+
+hashing_service = HashingService(
+    workers=getattr(settings, "PASSWORD_HASHING_WORKERS", 0),
+    max_pending=getattr(settings, "PASSWORD_HASHING_MAX_PENDING", 64),
+    timeout=getattr(settings, "PASSWORD_HASHING_TIMEOUT", 10),
+)
@@ -0,0 +1,93 @@
+"""
+Liveness and readiness probes for orchestrators
+
+- `/healthz/`: the process serves requests, never touches the database
+- `/readyz/`: the primary database answers too. The ping result is kept
+  `HEALTH_CHECK_INTERVAL` seconds per process, so probes arriving faster
+  (several orchestrators, load balancers) cost no query. While one thread
+  pings, the others answer with the previous result instead of queueing
+  behind it.
+
+Both are plain Django views: no authentication, throttling or content
+negotiation.
+"""
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.http import JsonResponse
+from django.views.decorators.cache import never_cache
+
+logger = logging.getLogger(__name__)
+
+
+class DatabasePing:
+    """`SELECT 1` on a database, at most once per `HEALTH_CHECK_INTERVAL`
+
+    Args:
+        alias: database to ping
+        clock: monotonic clock, in seconds
+    """
+
+    def __init__(self, alias=DEFAULT_DB_ALIAS, clock=time.monotonic):
+        self.alias = alias
+        self.clock = clock
+        self._ok = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def is_ok(self):
+        """True if the database answered the latest ping"""
+
+        if self._fresh():
+            return self._ok
+        # the first ping has everyone wait for it
+        if not self._lock.acquire(blocking=self._ok is None):
+            return self._ok
+        try:
+            if not self._fresh():
+                self._ok = self.ping()
+                self._checked_at = self.clock()
+            return self._ok
+        finally:
+            self._lock.release()
+
+    def ping(self):
+        try:
+            with connections[self.alias].cursor() as cursor:
+                cursor.execute("SELECT 1")
+        except DatabaseError:
+            logger.exception("database %r unavailable", self.alias)
+            return False
+        return True
+
+    def reset(self):
+        self._ok = self._checked_at = None
+
+    def _fresh(self):
+        return (
+            self._checked_at is not None
+            and self.clock() - self._checked_at
+            < settings.HEALTH_CHECK_INTERVAL
+        )
+
+
+database_ping = DatabasePing()
+
+
+@never_cache
+def liveness(request):
+    return JsonResponse({"status": "ok"})
+
+
+@never_cache
+def readiness(request):
+    if database_ping.is_ok():
+        return JsonResponse({"status": "ok"})
+    return JsonResponse(
+        {"status": "unavailable", "detail": "Database unavailable."},
+        status=503,
+    )
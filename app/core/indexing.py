@@ -0,0 +1,17 @@
+"""
+Derived per job title data: search documents and duplicate signatures
+
+Both are rebuilt from the job title, its portal and its description. Saves
+reach `refresh_job_titles` through signals; `bulk_create` sends no signals,
+so bulk writers call it themselves.
+"""
+
+from core.dedup import index_signatures
+from core.search import index_job_titles
+
+
+def refresh_job_titles(job_titles):
+    """Rebuild the derived rows of the `job_titles` queryset"""
+
+    index_job_titles(job_titles)
+    index_signatures(job_titles)
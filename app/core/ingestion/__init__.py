@@ -0,0 +1,12 @@
+"""
+Asyncio ingestion of job listings from external portals
+
+- `adapters`: one `PortalAdapter` per portal turns its feed into listings
+- `http`: keep-alive HTTP/1.1 client shared by all adapters
+- `listings`: ORM free validation of raw listings and JSONL lines
+- `engine`: runs the adapters and feeds a bounded queue into the batched
+  `JobDescription` / `JobTitle` writer
+
+Run it with `python manage.py ingest_portals`; `python manage.py
+import_jsonl` loads files through the same validation and writer.
+"""
@@ -0,0 +1,306 @@
+"""
+Ingestion engine
+
+Adapters run concurrently on one event loop and put listings on a bounded
+`asyncio.Queue`. A single writer task drains the queue in batches and stores
+them with `bulk_create` (in a thread, through `sync_to_async`). When the
+writer falls behind the queue fills up and `queue.put` blocks the adapters,
+so memory stays bounded however fast the portals answer.
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+
+from asgiref.sync import sync_to_async
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core import rollups
+from core.ingestion.http import HTTPClient
+from core.ingestion.listings import clean_listing
+from core.models import JobDescription, JobTitle, Portal
+from core.indexing import refresh_job_titles
+
+logger = logging.getLogger(__name__)
+
+# marks the end of the queue
+_DONE = object()
+
+
+class IngestionError(Exception):
+    """Raised when an ingestion run cannot start"""
+
+
+@dataclass
+class PortalStats:
+    fetched: int = 0
+    written: int = 0
+    rejected: int = 0
+    error: str = None
+
+
+@dataclass
+class IngestionStats:
+    portals: dict = field(default_factory=lambda: defaultdict(PortalStats))
+    batches: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def written(self):
+        return sum(stats.written for stats in self.portals.values())
+
+
+def listing_to_rows(portal, listing, now):
+    """Return unsaved `(JobDescription, JobTitle)` for one listing
+
+    Raises:
+        ValueError: listing has no title or an unparsable `pub_date`
+    """
+
+    return cleaned_to_rows(portal, clean_listing(listing), now)
+
+
+def cleaned_to_rows(portal, cleaned, now):
+    """Return unsaved `(JobDescription, JobTitle)` for a cleaned listing"""
+
+    description = JobDescription(
+        user_id=portal.user_id,
+        role=cleaned["role"],
+        description_text=cleaned["description_text"],
+        pub_date=cleaned["pub_date"] or now,
+    )
+    job_title = JobTitle(
+        user_id=portal.user_id,
+        title=cleaned["title"],
+        portal=portal,
+        last_updated=now,
+    )
+    return description, job_title
+
+
+class BatchWriter:
+    """Stores batches of `(portal name, listing)` pairs
+
+    New job titles belong to the owner of their portal.
+    """
+
+    def __init__(self, portals, stats):
+        self.portals = portals
+        self.stats = stats
+
+    def write(self, batch):
+        now = timezone.now()
+        rows = []
+        for portal_name, listing in batch:
+            try:
+                rows.append(listing_to_rows(
+                    self.portals[portal_name], listing, now
+                ))
+            except ValueError:
+                self.stats.portals[portal_name].rejected += 1
+
+        for title in self.write_rows(rows):
+            self.stats.portals[title.portal.name].written += 1
+        self.stats.batches += 1
+
+    def write_rows(self, rows):
+        """Store unsaved `(JobDescription, JobTitle)` pairs in one transaction
+
+        Returns the saved job titles.
+        """
+
+        descriptions = [description for description, _ in rows]
+        titles = [title for _, title in rows]
+        with transaction.atomic():
+            self._create_descriptions(descriptions)
+            for description, title in zip(descriptions, titles):
+                title.job_description_id = description.pk
+            JobTitle.objects.bulk_create(titles)
+            # `bulk_create` sends no `post_save`
+            rollups.apply_changes(
+                job_titles=Counter(
+                    (title.user_id, title.portal_id,
+                     rollups.posting_day(description.pub_date))
+                    for description, title in rows
+                ),
+                job_descriptions=Counter(
+                    (description.user_id,
+                     rollups.posting_day(description.pub_date))
+                    for description in descriptions
+                ),
+            )
+            refresh_job_titles(JobTitle.objects.filter(job_description_id__in=[
+                description.pk for description in descriptions
+            ]))
+        return titles
+
+    @staticmethod
+    def _create_descriptions(descriptions):
+        """`bulk_create` the descriptions and make sure they have pks"""
+
+        if connection.features.can_return_rows_from_bulk_insert:
+            JobDescription.objects.bulk_create(descriptions)
+            return
+        if not descriptions:
+            return
+
+        # MySQL does not return ids from a multi-row INSERT. LAST_INSERT_ID()
+        # is the id of the first row of this connection's last INSERT, and
+        # InnoDB allocates the ids of a multi-row VALUES insert at once,
+        # consecutively. The rows are read back by primary key to make sure;
+        # if another writer's rows are in the range, the batch is inserted
+        # again one row at a time.
+        keys = [_description_key(description) for description in descriptions]
+        try:
+            with transaction.atomic():
+                # one INSERT statement
+                JobDescription.objects.bulk_create(
+                    descriptions, batch_size=len(descriptions)
+                )
+                first = BatchWriter._first_inserted_id(len(descriptions))
+                ids = range(first, first + len(descriptions))
+                stored = JobDescription.objects.filter(
+                    id__in=ids
+                ).order_by("id").values_list(
+                    "user_id", "role", "description_text", "pub_date"
+                )
+                if list(stored) != keys:
+                    raise _IdsNotConsecutive
+        except _IdsNotConsecutive:
+            for description in descriptions:
+                # raw: `write_rows` updates the rollups and the search
+                # index for the whole batch
+                description.save_base(raw=True, force_insert=True)
+            return
+        for description, pk in zip(descriptions, ids):
+            description.pk = pk
+
+    @staticmethod
+    def _first_inserted_id(count):
+        """Return the id of the first of the `count` rows last INSERTed"""
+
+        with connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                # the id of the last row
+                cursor.execute("SELECT last_insert_rowid()")
+                return cursor.fetchone()[0] - count + 1
+            cursor.execute("SELECT LAST_INSERT_ID()")
+            return cursor.fetchone()[0]
+
+
+class _IdsNotConsecutive(Exception):
+    """Rolls back a batch whose ids cannot be told"""
+
+
+def _description_key(description):
+    return (
+        description.user_id,
+        description.role,
+        description.description_text,
+        description.pub_date,
+    )
+
+
+class IngestionEngine:
+    """Run `adapters` concurrently into the batched writer
+
+    Args:
+        adapters: `PortalAdapter` instances
+        batch_size: listings per database write
+        queue_size: listings buffered between adapters and writer
+        flush_interval: seconds before a partial batch is written anyway
+        client: `HTTPClient`, one is created when omitted
+    """
+
+    def __init__(self, adapters, batch_size=500, queue_size=2000,
+                 flush_interval=1.0, client=None):
+        self.adapters = adapters
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.flush_interval = flush_interval
+        self.client = client or HTTPClient()
+        self.stats = IngestionStats()
+
+    def _load_portals(self):
+        names = {adapter.portal for adapter in self.adapters}
+        portals = {
+            portal.name: portal
+            for portal in Portal.objects.filter(name__in=names)
+        }
+        missing = names - set(portals)
+        if missing:
+            raise IngestionError(
+                f"Unknown portal(s): {', '.join(sorted(missing))}"
+            )
+        return portals
+
+    async def run(self):
+        """Ingest every adapter's feed, return `IngestionStats`"""
+
+        start = time.perf_counter()
+        portals = await sync_to_async(self._load_portals)()
+        writer = BatchWriter(portals, self.stats)
+        queue = asyncio.Queue(maxsize=self.queue_size)
+
+        writer_task = asyncio.create_task(self._write_loop(queue, writer))
+        producers = asyncio.gather(
+            *(self._produce(adapter, queue) for adapter in self.adapters)
+        )
+        try:
+            done, _ = await asyncio.wait(
+                {writer_task, producers},
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if writer_task in done:
+                # the writer failed, nobody is draining the queue anymore
+                producers.cancel()
+                writer_task.result()
+            await queue.put(_DONE)
+            await writer_task
+        finally:
+            self.client.close()
+
+        self.stats.elapsed = time.perf_counter() - start
+        return self.stats
+
+    async def _produce(self, adapter, queue):
+        stats = self.stats.portals[adapter.portal]
+        try:
+            async for listing in adapter.listings(self.client):
+                stats.fetched += 1
+                await queue.put((adapter.portal, listing))
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            # one broken portal must not stop the others
+            logger.exception("ingestion from %s failed", adapter.portal)
+            stats.error = str(exc) or type(exc).__name__
+
+    async def _write_loop(self, queue, writer):
+        write = sync_to_async(writer.write)
+        batch = []
+        while True:
+            try:
+                if batch:
+                    item = await asyncio.wait_for(
+                        queue.get(), self.flush_interval
+                    )
+                else:
+                    item = await queue.get()
+            except asyncio.TimeoutError:
+                await write(batch)
+                batch = []
+                continue
+
+            if item is _DONE:
+                break
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                await write(batch)
+                batch = []
+
+        if batch:
+            await write(batch)
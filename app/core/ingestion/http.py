@@ -0,0 +1,193 @@
+"""
+Minimal asyncio HTTP/1.1 client with keep-alive connection pools
+
+Portal feeds are plain JSON over HTTP(S), so instead of pulling in a third
+party client we speak just enough HTTP/1.1 over `asyncio` streams:
+GET requests, `Content-Length` / chunked / read-until-close bodies and
+connection reuse. One pool per (scheme, host, port) holds at most `size`
+connections, which also bounds the concurrency towards that host.
+"""
+
+import asyncio
+import ssl as ssl_module
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+
+class HTTPError(Exception):
+    """Raised for malformed responses or non 2xx status codes"""
+
+
+@dataclass
+class Response:
+    status: int
+    headers: dict = field(default_factory=dict)
+    body: bytes = b""
+
+
+class _Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        self.writer.close()
+
+
+class ConnectionPool:
+    """Keep-alive connections to one origin"""
+
+    def __init__(self, scheme, host, port, size=4, timeout=30):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._idle = []
+        self._slots = asyncio.Semaphore(size)
+        # number of TCP connections opened, handy to check reuse
+        self.connections_opened = 0
+
+    async def _connect(self):
+        ssl = ssl_module.create_default_context() \
+            if self.scheme == "https" else None
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=ssl),
+            self.timeout,
+        )
+        self.connections_opened += 1
+        return _Connection(reader, writer)
+
+    async def request(self, method, target, headers=None):
+        """Send one request, reusing an idle connection when possible"""
+
+        async with self._slots:
+            reused = bool(self._idle)
+            connection = self._idle.pop() if reused else await self._connect()
+            try:
+                response, keep_alive = await self._send(
+                    connection, method, target, headers
+                )
+            except (ConnectionError, asyncio.IncompleteReadError):
+                if not reused:
+                    raise
+                # the server closed an idle keep-alive connection, retry once
+                connection = await self._connect()
+                response, keep_alive = await self._send(
+                    connection, method, target, headers
+                )
+
+            if keep_alive:
+                self._idle.append(connection)
+            else:
+                connection.close()
+            return response
+
+    async def _send(self, connection, method, target, headers):
+        """Run one exchange, the connection is closed if it fails"""
+
+        try:
+            return await asyncio.wait_for(
+                self._exchange(connection, method, target, headers),
+                self.timeout,
+            )
+        except BaseException:
+            connection.close()
+            raise
+
+    async def _exchange(self, connection, method, target, headers):
+        lines = [
+            f"{method} {target} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            "Connection: keep-alive",
+            "Accept-Encoding: identity",
+        ]
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+        connection.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode())
+        await connection.writer.drain()
+
+        reader = connection.reader
+        status_line = await reader.readuntil(b"\r\n")
+        parts = status_line.decode("latin-1").split(" ", 2)
+        if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+            raise HTTPError(f"malformed status line {status_line!r}")
+        status = int(parts[1])
+
+        response_headers = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        keep_alive = (
+            parts[0] == "HTTP/1.1"
+            and response_headers.get("connection", "").lower() != "close"
+        )
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            body = b""
+        elif "chunked" in response_headers.get("transfer-encoding", ""):
+            body = await self._read_chunked(reader)
+        elif "content-length" in response_headers:
+            body = await reader.readexactly(
+                int(response_headers["content-length"])
+            )
+        else:
+            body = await reader.read()
+            keep_alive = False
+        return Response(status, response_headers, body), keep_alive
+
+    @staticmethod
+    async def _read_chunked(reader):
+        chunks = []
+        while True:
+            size_line = await reader.readuntil(b"\r\n")
+            size = int(size_line.split(b";")[0], 16)
+            if size == 0:
+                # skip trailers
+                while await reader.readuntil(b"\r\n") != b"\r\n":
+                    pass
+                return b"".join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+    def close(self):
+        while self._idle:
+            self._idle.pop().close()
+
+
+class HTTPClient:
+    """Shared by all adapters of an ingestion run, one pool per origin"""
+
+    def __init__(self, pool_size=4, timeout=30):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.pools = {}
+
+    def pool_for(self, url, size=None):
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        key = (parts.scheme, parts.hostname, port)
+        if key not in self.pools:
+            self.pools[key] = ConnectionPool(
+                parts.scheme, parts.hostname, port,
+                size=size or self.pool_size, timeout=self.timeout,
+            )
+        return self.pools[key]
+
+    async def get(self, url, headers=None):
+        """GET `url`, raise `HTTPError` unless the status is 2xx"""
+
+        parts = urlsplit(url)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        response = await self.pool_for(url).request("GET", target, headers)
+        if not 200 <= response.status < 300:
+            raise HTTPError(f"GET {url} returned {response.status}")
+        return response
+
+    def close(self):
+        for pool in self.pools.values():
+            pool.close()
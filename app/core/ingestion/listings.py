@@ -0,0 +1,74 @@
+"""
+Validation of raw listings
+
+Nothing here touches the ORM, so it can run in worker processes (see the
+`import_jsonl` command) as well as in the ingestion engine.
+"""
+
+import json
+import time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+def clip(value, max_length=250):
+    return str(value)[:max_length]
+
+
+def clean_listing(listing):
+    """Return the validated fields of one listing dict
+
+    `pub_date` is an aware datetime, or `None` when the listing has none.
+
+    Raises:
+        ValueError: listing has no title or an unparsable `pub_date`
+    """
+
+    if not isinstance(listing, dict) or not listing.get("title"):
+        raise ValueError("listing without title")
+    pub_date = listing.get("pub_date")
+    if pub_date:
+        pub_date = parse_datetime(str(pub_date))
+        if pub_date is None:
+            raise ValueError("invalid pub_date")
+        if timezone.is_naive(pub_date):
+            pub_date = timezone.make_aware(pub_date, timezone.utc)
+    title = clip(listing["title"])
+    return {
+        "title": title,
+        "role": clip(listing.get("role") or title),
+        "description_text": clip(listing.get("description_text", "")),
+        "pub_date": pub_date or None,
+    }
+
+
+def parse_jsonl(lines):
+    """Parse and validate `(byte offset, line)` pairs of a JSONL feed
+
+    Every line is an object with a `portal` name and the listing fields,
+    `portal_description` is used if the portal has to be created.
+
+    Returns `(records, errors, seconds)`: records are `(portal name, portal
+    description, cleaned listing)`, errors `(byte offset, message)`.
+    """
+
+    start = time.process_time()
+    records = []
+    errors = []
+    for offset, line in lines:
+        if not line.strip():
+            continue
+        try:
+            listing = json.loads(line)
+            if not isinstance(listing, dict) or not listing.get("portal"):
+                raise ValueError("record without portal")
+            records.append((
+                clip(listing["portal"]),
+                clip(listing.get("portal_description", "")),
+                clean_listing(listing),
+            ))
+        except ValueError as exc:
+            # `json.JSONDecodeError` is a `ValueError` too
+            errors.append((offset, str(exc)))
+    return records, errors, time.process_time() - start
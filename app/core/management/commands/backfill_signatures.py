@@ -0,0 +1,27 @@
+"""
+Django command to compute the near-duplicate signatures of every job title
+
+Signatures are maintained on save; run this once after deploying the dedup
+tables, after loading data with raw SQL, or to rebuild the clusters.
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.dedup import backfill
+
+
+class Command(BaseCommand):
+    """Django command to backfill MinHash signatures and LSH buckets"""
+
+    help = "Compute JobTitleSignature rows and clusters for every job title"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+
+        total = backfill(batch_size=options["batch_size"], out=self.stdout)
+        self.stdout.write(
+            self.style.SUCCESS(f"Computed signatures of {total} job titles")
+        )
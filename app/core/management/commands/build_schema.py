@@ -0,0 +1,52 @@
+"""
+Django command to build the OpenAPI schema served by `core/openapi.py`
+
+    python manage.py build_schema            # into SCHEMA_DIR
+    python manage.py build_schema --check    # fail if it is out of date
+
+Run at build time (Dockerfile), after any change to the API.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core import openapi
+
+
+class Command(BaseCommand):
+    """Django command to write the schema files and their manifest"""
+
+    help = "Generate the OpenAPI schema once, as hashed JSON / YAML files"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", default=None)
+        parser.add_argument(
+            "--check", action="store_true",
+            help="only compare with the built schema, exit 1 if it differs",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+
+        directory = options["dir"] or settings.SCHEMA_DIR
+        documents, version = openapi.generate()
+
+        if options["check"]:
+            built = openapi.BuiltSchema(directory).documents()
+            if built is None or any(
+                built[name].content != content
+                for name, content in documents.items()
+            ):
+                raise CommandError(
+                    f"The schema in {directory} is out of date, run "
+                    f"`manage.py build_schema`."
+                )
+            self.stdout.write("Schema up to date.")
+            return
+
+        manifest = openapi.write(directory, documents, version)
+        for entry in manifest["formats"].values():
+            self.stdout.write(self.style.SUCCESS(
+                f"Wrote {entry['file']} ({entry['size']} bytes, "
+                f"sha256 {entry['sha256']})"
+            ))
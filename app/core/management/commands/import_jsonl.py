@@ -0,0 +1,191 @@
+"""
+Django command to import job listings from large JSONL files
+
+    python manage.py import_jsonl listings.jsonl --user admin@example.com
+    python manage.py import_jsonl listings.jsonl --workers 8 --restart
+
+One object per line::
+
+    {"portal": "naukri.com", "portal_description": "...",
+     "title": "Python Developer", "role": "...",
+     "description_text": "...", "pub_date": "2023-02-01T10:00:00Z"}
+
+Lines are parsed and validated in a process pool. Portals are looked up by
+their unique name once per batch; unknown portals are created for `--user`
+(or their lines rejected without it). Each batch is written with
+`bulk_create` in its own transaction, which also stores the byte offset
+reached in `ImportCheckpoint`: running the command again on an interrupted
+file continues after the last committed batch.
+"""
+
+import os
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from core.ingestion.engine import BatchWriter, IngestionStats, cleaned_to_rows
+from core.ingestion.listings import parse_jsonl
+from core.models import ImportCheckpoint, Portal
+
+# rejected lines reported one by one, the rest are only counted
+MAX_REPORTED_ERRORS = 20
+
+
+def read_batches(path, offset, batch_size):
+    """Yield `(end offset, [(offset, line), ...])` batches from `offset`"""
+
+    with open(path, "rb") as feed:
+        feed.seek(offset)
+        batch = []
+        for line in feed:
+            batch.append((offset, line))
+            offset += len(line)
+            if len(batch) >= batch_size:
+                yield offset, batch
+                batch = []
+        if batch:
+            yield offset, batch
+
+
+class Command(BaseCommand):
+    """Django command to import a JSONL file of listings"""
+
+    help = "Import Portal / JobDescription / JobTitle rows from a JSONL file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument(
+            "--user", metavar="EMAIL",
+            help="Owner of portals that do not exist yet",
+        )
+        parser.add_argument("--workers", type=int, default=os.cpu_count())
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument(
+            "--restart", action="store_true",
+            help="Ignore the checkpoint and import from the beginning",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+
+        path = os.path.realpath(options["path"])
+        if not os.path.isfile(path):
+            raise CommandError(f"No such file: {options['path']}")
+        self.owner = None
+        if options["user"]:
+            try:
+                self.owner = get_user_model().objects.get(
+                    email=options["user"]
+                )
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"Unknown user: {options['user']}")
+
+        checkpoint, _ = ImportCheckpoint.objects.get_or_create(source=path)
+        if options["restart"]:
+            checkpoint.offset = checkpoint.rows = 0
+        if checkpoint.offset > os.path.getsize(path):
+            raise CommandError(
+                "Checkpoint is past the end of the file, use --restart"
+            )
+        if checkpoint.offset:
+            self.stdout.write(f"Resuming at byte {checkpoint.offset}")
+
+        self.timings = defaultdict(float)
+        self.writer = BatchWriter({}, IngestionStats())
+        self.written = 0
+        self.errors = 0
+        workers = max(1, options["workers"])
+        start = time.perf_counter()
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # parsed batches wait here in file order; bounded, so a slow
+            # database holds back reading instead of filling memory
+            pending = deque()
+            batches = read_batches(
+                path, checkpoint.offset, options["batch_size"]
+            )
+            while True:
+                stage = time.perf_counter()
+                batch = next(batches, None)
+                self.timings["read"] += time.perf_counter() - stage
+                if batch is not None:
+                    end, lines = batch
+                    pending.append((end, pool.submit(parse_jsonl, lines)))
+                if pending and (batch is None or len(pending) >= 2 * workers):
+                    end, future = pending.popleft()
+                    self.write_batch(checkpoint, end, future)
+                elif batch is None:
+                    break
+
+        elapsed = time.perf_counter() - start
+        rate = self.written / elapsed if elapsed else 0
+        for stage in ("read", "parse (cpu)", "parse wait", "resolve",
+                      "write"):
+            self.stdout.write(f"{stage:>12}: {self.timings[stage]:.2f}s")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {self.written} rows in {elapsed:.2f}s "
+            f"({rate:,.0f} rows/s), rejected {self.errors}, "
+            f"{checkpoint.rows} rows from this file in total"
+        ))
+
+    def write_batch(self, checkpoint, end, future):
+        stage = time.perf_counter()
+        records, errors, cpu_seconds = future.result()
+        self.timings["parse wait"] += time.perf_counter() - stage
+        self.timings["parse (cpu)"] += cpu_seconds
+
+        stage = time.perf_counter()
+        portals = self.resolve_portals(records)
+        now = timezone.now()
+        rows = []
+        for portal_name, _, cleaned in records:
+            portal = portals.get(portal_name)
+            if portal is not None:
+                rows.append(cleaned_to_rows(portal, cleaned, now))
+            else:
+                errors.append((None, f"unknown portal {portal_name!r}"))
+        self.timings["resolve"] += time.perf_counter() - stage
+
+        stage = time.perf_counter()
+        with transaction.atomic():
+            self.writer.write_rows(rows)
+            checkpoint.offset = end
+            checkpoint.rows += len(rows)
+            checkpoint.save()
+        self.timings["write"] += time.perf_counter() - stage
+
+        self.written += len(rows)
+        for offset, message in errors:
+            self.errors += 1
+            if self.errors <= MAX_REPORTED_ERRORS:
+                where = "" if offset is None else f"byte {offset}: "
+                self.stderr.write(f"{where}{message}")
+
+    def resolve_portals(self, records):
+        """Return `{name: Portal}` for the batch, creating missing portals"""
+
+        wanted = {name: description for name, description, _ in records}
+        portals = {
+            portal.name: portal
+            for portal in Portal.objects.filter(name__in=wanted)
+        }
+        missing = [name for name in wanted if name not in portals]
+        if missing and self.owner is not None:
+            Portal.objects.bulk_create(
+                [
+                    Portal(user=self.owner, name=name,
+                           description=wanted[name])
+                    for name in missing
+                ],
+                ignore_conflicts=True,
+            )
+            portals.update(
+                (portal.name, portal)
+                for portal in Portal.objects.filter(name__in=missing)
+            )
+        return portals
@@ -0,0 +1,86 @@
+"""
+Django command to ingest job listings from external portals
+
+    python manage.py ingest_portals
+    python manage.py ingest_portals --portal naukri.com
+    python manage.py ingest_portals --source naukri.com=fixtures/naukri.jsonl
+
+Sources come from `settings.INGESTION_SOURCES` unless `--source` is given.
+"""
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.ingestion.adapters import load_adapters
+from core.ingestion.engine import IngestionEngine, IngestionError
+
+
+class Command(BaseCommand):
+    """Django command to ingest portal feeds"""
+
+    help = "Fetch listings from portal feeds into JobDescription / JobTitle"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--portal", action="append", default=[],
+            help="Only ingest this portal (repeatable)",
+        )
+        parser.add_argument(
+            "--source", action="append", default=[], metavar="PORTAL=URL",
+            help="Ingest a feed URL or fixture file with the default "
+                 "JSON adapter instead of INGESTION_SOURCES (repeatable)",
+        )
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--queue-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+
+        if options["source"]:
+            sources = []
+            for value in options["source"]:
+                portal, sep, source = value.partition("=")
+                if not sep:
+                    raise CommandError(f"--source {value!r} is not PORTAL=URL")
+                sources.append({
+                    "portal": portal,
+                    "source": source,
+                    "concurrency": options["concurrency"],
+                })
+        else:
+            sources = getattr(settings, "INGESTION_SOURCES", [])
+        if options["portal"]:
+            sources = [s for s in sources if s["portal"] in options["portal"]]
+        if not sources:
+            raise CommandError("Nothing to ingest")
+
+        engine = IngestionEngine(
+            load_adapters(sources),
+            batch_size=options["batch_size"],
+            queue_size=options["queue_size"],
+        )
+        try:
+            # thread sensitive ORM calls run back in this thread
+            stats = async_to_sync(engine.run)()
+        except IngestionError as exc:
+            raise CommandError(str(exc))
+
+        for portal, portal_stats in sorted(stats.portals.items()):
+            line = (
+                f"{portal}: fetched={portal_stats.fetched} "
+                f"written={portal_stats.written} "
+                f"rejected={portal_stats.rejected}"
+            )
+            if portal_stats.error:
+                self.stdout.write(self.style.ERROR(
+                    f"{line} error={portal_stats.error}"
+                ))
+            else:
+                self.stdout.write(line)
+        rate = stats.written / stats.elapsed if stats.elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Ingested {stats.written} listings in {stats.elapsed:.2f}s "
+            f"({rate:,.0f}/s, {stats.batches} batches)"
+        ))
@@ -0,0 +1,125 @@
+"""
+Django command to inspect the request profiles of `core/profiling.py`
+
+    python manage.py profiles                      # one line per profile
+    python manage.py profiles --aggregate          # per view summary
+    python manage.py profiles --view jobtitle:jobtitle-list \\
+        --output list.collapsed                    # one flame graph
+
+`--output` merges the stacks of the selected profiles into one collapsed
+stack file, rooted at the view name, for flamegraph.pl or speedscope.
+"""
+
+import statistics
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.profiling import load_profiles, load_stacks
+
+
+class Command(BaseCommand):
+    """Django command to list and aggregate the saved request profiles"""
+
+    help = "List and aggregate the saved request profiles by view"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", default=None)
+        parser.add_argument("--view", help="only the profiles of this view")
+        parser.add_argument("--aggregate", action="store_true")
+        parser.add_argument(
+            "--top", type=int, default=10,
+            help="functions listed per view with --aggregate",
+        )
+        parser.add_argument(
+            "--output", help="write the merged collapsed stacks there"
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+
+        directory = options["dir"] or settings.PROFILING_DIR
+        profiles = [
+            profile for profile in load_profiles(directory)
+            if options["view"] in (None, profile["view"])
+        ]
+        if not profiles:
+            self.stdout.write("No profiles.")
+            return
+
+        if options["aggregate"]:
+            self.aggregate(directory, profiles, options["top"])
+        else:
+            self.list_profiles(profiles)
+
+        if options["output"]:
+            merged = Counter()
+            for profile in profiles:
+                for stack, count in load_stacks(
+                    directory, profile["id"]
+                ).items():
+                    merged[f"{profile['view']};{stack}"] += count
+            with open(options["output"], "w") as file:
+                for stack, count in merged.most_common():
+                    file.write(f"{stack} {count}\n")
+            self.stdout.write(self.style.SUCCESS(
+                f"Wrote {len(merged)} stacks of {len(profiles)} profiles to "
+                f"{options['output']}"
+            ))
+
+    def list_profiles(self, profiles):
+        self.stdout.write(
+            f"{'id':<30} {'view':<32} {'status':>6} {'ms':>8} "
+            f"{'samples':>7} {'queries':>7} {'sql ms':>8}"
+        )
+        for profile in profiles:
+            sql_ms = sum(query["duration_ms"] for query in profile["queries"])
+            self.stdout.write(
+                f"{profile['id']:<30} {profile['view']:<32} "
+                f"{profile['status']:>6} {profile['duration_ms']:>8.1f} "
+                f"{profile['samples']:>7} {len(profile['queries']):>7} "
+                f"{sql_ms:>8.1f}"
+            )
+
+    def aggregate(self, directory, profiles, top):
+        by_view = defaultdict(list)
+        for profile in profiles:
+            by_view[profile["view"]].append(profile)
+
+        for view, view_profiles in sorted(by_view.items()):
+            durations = [profile["duration_ms"] for profile in view_profiles]
+            queries = [len(profile["queries"]) for profile in view_profiles]
+            sql_ms = [
+                sum(query["duration_ms"] for query in profile["queries"])
+                for profile in view_profiles
+            ]
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{view}: {len(view_profiles)} profiles, "
+                f"p50={statistics.median(durations):.1f}ms "
+                f"max={max(durations):.1f}ms, "
+                f"{statistics.mean(queries):.1f} queries "
+                f"({statistics.mean(sql_ms):.1f}ms) per request"
+            ))
+
+            # samples a function was running in (self) or under (total)
+            own, total = Counter(), Counter()
+            for profile in view_profiles:
+                for stack, count in load_stacks(
+                    directory, profile["id"]
+                ).items():
+                    frames = stack.split(";")
+                    own[frames[-1]] += count
+                    for frame in set(frames):
+                        total[frame] += count
+            samples = sum(own.values())
+            if not samples:
+                self.stdout.write("  no samples, requests shorter than the "
+                                  "sampling interval")
+                continue
+            self.stdout.write(f"  {'self':>6} {'total':>6}  function")
+            for frame, count in own.most_common(top):
+                self.stdout.write(
+                    f"  {count / samples:>6.1%} "
+                    f"{total[frame] / samples:>6.1%}  {frame}"
+                )
@@ -0,0 +1,31 @@
+"""
+Django command to recompute the per day posting rollups
+
+Rollups are maintained on every write; run this once after deploying the
+rollup tables, after loading data with raw SQL, or to repair drift. Pause
+writers while it runs.
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.rollups import rebuild
+
+
+class Command(BaseCommand):
+    """Django command to rebuild PortalPostingRollup / UserPostingRollup"""
+
+    help = "Recompute the posting rollups from job titles and descriptions"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+
+        job_titles, job_descriptions = rebuild(
+            batch_size=options["batch_size"], out=self.stdout
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Rolled up {job_titles} job titles and "
+            f"{job_descriptions} job descriptions"
+        ))
@@ -0,0 +1,27 @@
+"""
+Django command to rebuild the job title search documents
+
+Search documents are maintained on save; run this after loading data with
+raw SQL or to repair the index.
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.search import rebuild_index
+
+
+class Command(BaseCommand):
+    """Django command to rebuild the search index"""
+
+    help = "Rebuild JobTitleSearchDocument rows for every job title"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+
+        total = rebuild_index(
+            batch_size=options["batch_size"], out=self.stdout
+        )
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} job titles"))
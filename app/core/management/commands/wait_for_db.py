@@ -19,22 +19,43 @@ https://docs.djangoproject.com/en/4.1/howto/custom-management-commands/
 import time
 from MySQLdb import Error
 from django.db.utils import OperationalError
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 
 
 class Command(BaseCommand):
-    """Django command to wait for database"""
+    """Django command to wait for database
 
-    def handle(self, *args, **kwargs):
+    Retries with exponential backoff: `--initial-delay` seconds, doubled
+    after every failure up to `--max-delay`, for `--timeout` seconds in
+    total.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--timeout", type=float, default=60)
+        parser.add_argument("--initial-delay", type=float, default=0.1)
+        parser.add_argument("--max-delay", type=float, default=5)
+
+    def handle(self, *args, **options):
         """Entrypoint for command"""
 
         self.stdout.write("waiting for database....")
-        db_up = False
-        while db_up is False:
+        deadline = time.monotonic() + options["timeout"]
+        delay = options["initial_delay"]
+        while True:
             try:
                 self.check(databases=["default"])
-                db_up = True
+                break
             except (Error, OperationalError):
-                self.stdout.write("Database unavailable, waiting for 1 second...")
-                time.sleep(1)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise CommandError(
+                        f"Database unavailable after {options['timeout']:g} "
+                        f"seconds."
+                    )
+                wait = min(delay, remaining)
+                self.stdout.write(
+                    f"Database unavailable, waiting for {wait:g} seconds..."
+                )
+                time.sleep(wait)
+                delay = min(delay * 2, options["max_delay"])
         self.stdout.write(self.style.SUCCESS("Database available!"))
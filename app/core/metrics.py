@@ -0,0 +1,432 @@
+"""
+Request metrics in the Prometheus text format
+
+`MetricsMiddleware` records, per view (the URL name, e.g.
+`jobtitle:jobtitle-list`, `user:token`):
+
+- `http_request_duration_seconds`: latency histogram, by method / status
+- `http_response_size_bytes`: body size histogram
+- `db_queries_total`, `db_query_duration_seconds_total`: SQL statements
+  and time, counted by an execute wrapper on every connection
+- `serializer_duration_seconds_total`: time spent turning objects into
+  primitives, in `Serializer.data` and the `job.fast_serializers` plans
+
+plus the samples of collectors other apps add with
+`registry.add_collector`, read when the registry is (e.g. the token cache
+counters of `user.authentication`), and `/metrics` serves them. Every
+process keeps its own `Registry`, a request costs one lock and a few dict
+updates. With `METRICS_DIR` set,
+processes also write their registry to `<METRICS_DIR>/<pid>.json` at most
+every `METRICS_FLUSH_INTERVAL` seconds (written then renamed, never read
+half-written), and `/metrics` sums the files of all processes: any worker
+answers for the whole server. Files of exited workers stay, so counters
+never go backwards; wipe the directory when the server (re)starts.
+
+`METRICS_ENABLED = False` removes the middleware and the wrappers.
+"""
+
+import asyncio
+import bisect
+import functools
+import json
+import os
+import tempfile
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# name -> (type, help, histogram buckets)
+METRICS = {
+    "http_request_duration_seconds": (
+        "histogram", "Request latency, by view", LATENCY_BUCKETS,
+    ),
+    "http_response_size_bytes": (
+        "histogram", "Response body size, by view", SIZE_BUCKETS,
+    ),
+    "db_queries_total": ("counter", "SQL statements, by view", None),
+    "db_query_duration_seconds_total": (
+        "counter", "Time spent in SQL statements, by view", None,
+    ),
+    "serializer_duration_seconds_total": (
+        "counter", "Time spent serializing responses, by view", None,
+    ),
+    "token_cache_hits_total": (
+        "counter", "Token lookups answered by the token cache", None,
+    ),
+    "token_cache_misses_total": (
+        "counter", "Token lookups read from the database", None,
+    ),
+    "token_cache_evictions_total": (
+        "counter", "Cached tokens dropped on a change of token or user",
+        None,
+    ),
+    "token_cache_entries": ("gauge", "Tokens cached", None),
+}
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# metrics of the request being served
+_request = ContextVar("metrics_request", default=None)
+
+
+class RequestMetrics:
+    """Counters of one request, filled by the wrappers"""
+
+    __slots__ = ("start", "queries", "sql_seconds", "serializer_seconds")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.serializer_seconds = 0.0
+
+
+class Registry:
+    """Metrics of this process
+
+    Samples are keyed by (name, labels), labels being a tuple of
+    (label, value) pairs. A histogram sample is its bucket counts (the
+    last one `+Inf`) followed by the sum.
+    """
+
+    def __init__(self):
+        self._samples = {}
+        self._lock = threading.Lock()
+        self._collectors = []
+
+    def add_collector(self, collector):
+        """Add `collector()`, returning {name: value} of unlabeled samples"""
+
+        self._collectors.append(collector)
+
+    def record_request(self, view, method, status, seconds, size, metrics):
+        view_labels = (("view", view),)
+        with self._lock:
+            self._observe(
+                "http_request_duration_seconds",
+                (("view", view), ("method", method), ("status", str(status))),
+                seconds,
+            )
+            if size is not None:
+                self._observe("http_response_size_bytes", view_labels, size)
+            self._add("db_queries_total", view_labels, metrics.queries)
+            self._add(
+                "db_query_duration_seconds_total", view_labels,
+                metrics.sql_seconds,
+            )
+            self._add(
+                "serializer_duration_seconds_total", view_labels,
+                metrics.serializer_seconds,
+            )
+
+    def snapshot(self):
+        """Return the samples as a JSON compatible list"""
+
+        with self._lock:
+            snapshot = [
+                [
+                    name,
+                    list(map(list, labels)),
+                    list(value) if isinstance(value, list) else value,
+                ]
+                for (name, labels), value in self._samples.items()
+            ]
+        for collector in self._collectors:
+            snapshot.extend(
+                [name, [], value] for name, value in collector().items()
+            )
+        return snapshot
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+    def _add(self, name, labels, amount):
+        key = (name, labels)
+        self._samples[key] = self._samples.get(key, 0) + amount
+
+    def _observe(self, name, labels, value):
+        buckets = METRICS[name][2]
+        sample = self._samples.get((name, labels))
+        if sample is None:
+            sample = self._samples[(name, labels)] = [0] * (len(buckets) + 2)
+        # non cumulative here, summed up when rendered
+        sample[bisect.bisect_left(buckets, value)] += 1
+        sample[-1] += value
+
+
+registry = Registry()
+
+
+def merge(snapshots):
+    """Sum snapshots into one {(name, labels): value} dict"""
+
+    samples = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot:
+            if name not in METRICS:
+                continue
+            key = (name, tuple(map(tuple, labels)))
+            current = samples.get(key)
+            if current is None:
+                samples[key] = list(value) if isinstance(value, list) \
+                    else value
+            elif isinstance(value, list):
+                samples[key] = [a + b for a, b in zip(current, value)]
+            else:
+                samples[key] = current + value
+    return samples
+
+
+def _labels(labels, *extra):
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ""
+    escaped = (
+        (label, str(value).replace("\\", r"\\").replace('"', r"\"")
+         .replace("\n", r"\n"))
+        for label, value in pairs
+    )
+    return "{" + ",".join(f'{label}="{value}"' for label, value in escaped) \
+        + "}"
+
+
+def _number(value):
+    # `%g` would round large counters
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+def render(samples):
+    """Return `samples` in the Prometheus text format"""
+
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        series = sorted(
+            (labels, value) for (metric, labels), value in samples.items()
+            if metric == name
+        )
+        if not series:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in series:
+            if kind != "histogram":
+                lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                continue
+            total = 0
+            for bound, count in zip((*buckets, "+Inf"), value[:-1]):
+                total += count
+                le = bound if bound == "+Inf" else f"{bound:g}"
+                lines.append(
+                    f"{name}_bucket{_labels(labels, ('le', le))} {total}"
+                )
+            lines.append(
+                f"{name}_sum{_labels(labels)} {_number(value[-1])}"
+            )
+            lines.append(f"{name}_count{_labels(labels)} {total}")
+    return "\n".join(lines) + "\n"
+
+
+class SnapshotWriter:
+    """Write the registry of this process to `METRICS_DIR`, throttled"""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._written_at = None
+        self._lock = threading.Lock()
+
+    def maybe_write(self):
+        if not settings.METRICS_DIR:
+            return
+        now = self.clock()
+        if (
+            self._written_at is not None
+            and now - self._written_at < settings.METRICS_FLUSH_INTERVAL
+        ):
+            return
+        # one writer at a time, the others skip
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._written_at = now
+            self.write()
+        finally:
+            self._lock.release()
+
+    def write(self):
+        directory = Path(settings.METRICS_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as file:
+            json.dump(registry.snapshot(), file)
+        os.replace(tmp, directory / f"{os.getpid()}.json")
+
+
+snapshot_writer = SnapshotWriter()
+
+
+def collect():
+    """Return the samples of every process"""
+
+    snapshots = [registry.snapshot()]
+    if settings.METRICS_DIR:
+        own = f"{os.getpid()}.json"
+        for path in Path(settings.METRICS_DIR).glob("*.json"):
+            if path.name == own:
+                continue
+            try:
+                snapshots.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                # removed while listing
+                continue
+    return merge(snapshots)
+
+
+def metrics_view(request):
+    """`/metrics`, for Prometheus to scrape"""
+
+    return HttpResponse(render(collect()), content_type=CONTENT_TYPE)
+
+
+def timed_serializer(func):
+    """Count the time spent in `func` as serializer time of the request"""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        metrics = _request.get()
+        if metrics is None:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            metrics.serializer_seconds += time.perf_counter() - start
+
+    return wrapper
+
+
+def _count_queries(execute, sql, params, many, context):
+    metrics = _request.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.sql_seconds += time.perf_counter() - start
+
+
+def _watch_connection(sender, connection, **kwargs):
+    if _count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_queries)
+
+
+def install():
+    """Hook the SQL and serializer wrappers, from `CoreConfig.ready`"""
+
+    from rest_framework.serializers import BaseSerializer
+
+    connection_created.connect(
+        _watch_connection, dispatch_uid="core.metrics.watch_connection"
+    )
+    data = BaseSerializer.data
+    if not getattr(data.fget, "__wrapped__", None):
+        BaseSerializer.data = property(timed_serializer(data.fget))
+
+
+class MetricsMiddleware:
+    """Record the metrics of every request, see the module doc
+
+    Goes first in `MIDDLEWARE`, to time the other middleware too.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        else:
+            self._is_coroutine = None
+
+    def __call__(self, request):
+        if self._is_coroutine:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _request.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _request.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request.reset(token)
+        return self.finish(request, response, metrics)
+
+    def finish(self, request, response, metrics):
+        match = request.resolver_match
+        view = match.view_name if match is not None else "<unmatched>"
+        if response.streaming:
+            # recorded once sent, exports query while streaming
+            response.streaming_content = _recorded(
+                response.streaming_content, request.method, view,
+                response.status_code, metrics,
+            )
+            return response
+        # set by `CommonMiddleware`, saves joining the body again
+        size = response.get("Content-Length")
+        record(
+            view, request.method, response.status_code,
+            int(size) if size is not None else len(response.content),
+            metrics,
+        )
+        return response
+
+
+def record(view, method, status, size, metrics):
+    registry.record_request(
+        view, method, status, time.perf_counter() - metrics.start, size,
+        metrics,
+    )
+    snapshot_writer.maybe_write()
+
+
+def _recorded(content, method, view, status, metrics):
+    """Iterate `content` counting its size and queries, record at the end"""
+
+    size = 0
+    content = iter(content)
+    try:
+        while True:
+            token = _request.set(metrics)
+            try:
+                chunk = next(content, None)
+            finally:
+                _request.reset(token)
+            if chunk is None:
+                break
+            size += len(chunk)
+            yield chunk
+    finally:
+        record(view, method, status, size, metrics)
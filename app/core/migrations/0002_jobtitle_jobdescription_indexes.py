@@ -0,0 +1,25 @@
+# Generated by Django 4.1.5 on 2026-10-17 19:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobdescription',
+            index=models.Index(fields=['user', 'pub_date'], name='jobdesc_user_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobtitle',
+            index=models.Index(fields=['user', 'id'], name='jobtitle_user_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobtitle',
+            index=models.Index(fields=['portal', 'last_updated'], name='jobtitle_portal_updated_idx'),
+        ),
+    ]
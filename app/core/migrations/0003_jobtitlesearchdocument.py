@@ -0,0 +1,123 @@
+# Generated by Django 4.1.5 on 2026-10-17 19:21
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+# The full-text index over `core_jobtitlesearchdocument` is vendor specific:
+# - MySQL: FULLTEXT indexes, maintained by InnoDB
+# - SQLite: an external content FTS5 table kept in sync by triggers
+# Other backends get no index and `core.search` falls back to LIKE.
+
+SQLITE_FTS_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE core_jobtitlesearch_fts USING fts5(
+        title, document,
+        content='core_jobtitlesearchdocument', content_rowid='job_title_id',
+        tokenize='unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER core_jobtitlesearch_ai
+    AFTER INSERT ON core_jobtitlesearchdocument BEGIN
+        INSERT INTO core_jobtitlesearch_fts(rowid, title, document)
+        VALUES (new.job_title_id, new.title, new.document);
+    END
+    """,
+    """
+    CREATE TRIGGER core_jobtitlesearch_ad
+    AFTER DELETE ON core_jobtitlesearchdocument BEGIN
+        INSERT INTO core_jobtitlesearch_fts(
+            core_jobtitlesearch_fts, rowid, title, document
+        ) VALUES ('delete', old.job_title_id, old.title, old.document);
+    END
+    """,
+    """
+    CREATE TRIGGER core_jobtitlesearch_au
+    AFTER UPDATE ON core_jobtitlesearchdocument BEGIN
+        INSERT INTO core_jobtitlesearch_fts(
+            core_jobtitlesearch_fts, rowid, title, document
+        ) VALUES ('delete', old.job_title_id, old.title, old.document);
+        INSERT INTO core_jobtitlesearch_fts(rowid, title, document)
+        VALUES (new.job_title_id, new.title, new.document);
+    END
+    """,
+]
+
+SQLITE_FTS_BACKWARD = [
+    "DROP TRIGGER IF EXISTS core_jobtitlesearch_au",
+    "DROP TRIGGER IF EXISTS core_jobtitlesearch_ad",
+    "DROP TRIGGER IF EXISTS core_jobtitlesearch_ai",
+    "DROP TABLE IF EXISTS core_jobtitlesearch_fts",
+]
+
+MYSQL_FTS_FORWARD = [
+    "CREATE FULLTEXT INDEX search_title_ft "
+    "ON core_jobtitlesearchdocument (title)",
+    "CREATE FULLTEXT INDEX search_title_document_ft "
+    "ON core_jobtitlesearchdocument (title, document)",
+]
+
+MYSQL_FTS_BACKWARD = [
+    "DROP INDEX search_title_document_ft ON core_jobtitlesearchdocument",
+    "DROP INDEX search_title_ft ON core_jobtitlesearchdocument",
+]
+
+BACKFILL = """
+    INSERT INTO core_jobtitlesearchdocument
+        (job_title_id, user_id, portal_id, pub_date, title, document)
+    SELECT t.id, t.user_id, t.portal_id, d.pub_date, t.title, {document}
+    FROM core_jobtitle t
+    JOIN core_jobdescription d ON d.id = t.job_description_id
+"""
+
+
+def run_statements(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "mysql":
+        run_statements(schema_editor, MYSQL_FTS_FORWARD)
+        document = "CONCAT_WS(' ', d.role, d.description_text)"
+    else:
+        if vendor == "sqlite":
+            run_statements(schema_editor, SQLITE_FTS_FORWARD)
+        document = "d.role || ' ' || d.description_text"
+    schema_editor.execute(BACKFILL.format(document=document))
+
+
+def drop_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "mysql":
+        run_statements(schema_editor, MYSQL_FTS_BACKWARD)
+    elif vendor == "sqlite":
+        run_statements(schema_editor, SQLITE_FTS_BACKWARD)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_jobtitle_jobdescription_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobTitleSearchDocument',
+            fields=[
+                ('job_title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='core.jobtitle')),
+                ('pub_date', models.DateTimeField()),
+                ('title', models.CharField(max_length=250)),
+                ('document', models.TextField()),
+                ('portal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.portal')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='jobtitlesearchdocument',
+            index=models.Index(fields=['user', 'pub_date'], name='search_user_pub_date_idx'),
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.1.5 on 2026-10-17 19:24
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_jobtitlesearchdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobTitleSignature',
+            fields=[
+                ('job_title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='core.jobtitle')),
+                ('minhash', models.BinaryField()),
+                ('cluster_id', models.BigIntegerField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='JobTitleLSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('bucket', models.BigIntegerField()),
+                ('job_title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='core.jobtitle')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='jobtitlesignature',
+            index=models.Index(fields=['user', 'cluster_id'], name='signature_cluster_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobtitlelshbucket',
+            index=models.Index(fields=['user', 'bucket', 'band'], name='lsh_bucket_idx'),
+        ),
+    ]
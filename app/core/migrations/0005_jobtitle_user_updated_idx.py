@@ -0,0 +1,17 @@
+# Generated by Django 4.1.5 on 2026-10-17 19:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_jobtitle_signatures'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobtitle',
+            index=models.Index(fields=['user', 'last_updated'], name='jobtitle_user_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,102 @@
+# Generated by Django 4.1.5 on 2026-10-17 19:41
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+import django.utils.timezone
+
+BATCH_SIZE = 1000
+
+
+def move_applicants(apps, schema_editor):
+    """Copy every `Applicant` row into `Application`, then count them"""
+
+    Applicant = apps.get_model("core", "Applicant")
+    Application = apps.get_model("core", "Application")
+    JobTitle = apps.get_model("core", "JobTitle")
+
+    batch = []
+    rows = Applicant.objects.order_by("pk").values_list(
+        "user_ptr_id", "applied_for_id", "cover_letter"
+    )
+    for user_id, job_title_id, cover_letter in rows.iterator():
+        batch.append(Application(
+            user_id=user_id,
+            job_title_id=job_title_id,
+            cover_letter=cover_letter,
+        ))
+        if len(batch) >= BATCH_SIZE:
+            Application.objects.bulk_create(batch)
+            batch = []
+    Application.objects.bulk_create(batch)
+
+    counts = (
+        Application.objects.filter(job_title=OuterRef("pk"))
+        .values("job_title")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    JobTitle.objects.filter(
+        pk__in=Application.objects.values("job_title")
+    ).update(applicant_count=Coalesce(Subquery(counts), Value(0)))
+
+
+def restore_applicants(apps, schema_editor):
+    """Recreate `Applicant` rows, one (the oldest) application per user"""
+
+    Applicant = apps.get_model("core", "Applicant")
+    Application = apps.get_model("core", "Application")
+
+    seen = set()
+    for application in Application.objects.order_by("pk").iterator():
+        if application.user_id in seen:
+            continue
+        seen.add(application.user_id)
+        # `raw` saves the child table only, the `core_user` row exists
+        Applicant(
+            user_ptr_id=application.user_id,
+            applied_for_id=application.job_title_id,
+            cover_letter=application.cover_letter,
+        ).save_base(raw=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_importcheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Application',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cover_letter', models.CharField(blank=True, max_length=250)),
+                ('applied_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('job_title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='applications', to='core.jobtitle')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'applied_at'], name='application_user_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='application',
+            constraint=models.UniqueConstraint(fields=('job_title', 'user'), name='application_unique_user'),
+        ),
+        migrations.AddField(
+            model_name='jobtitle',
+            name='applicant_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='jobtitle',
+            index=models.Index(fields=['user', '-applicant_count', '-id'], name='jobtitle_user_applicants_idx'),
+        ),
+        migrations.RunPython(move_applicants, restore_applicants),
+        migrations.DeleteModel(
+            name='Applicant',
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.1.5 on 2026-10-17 19:46
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_application'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserPostingRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('job_titles', models.IntegerField(default=0)),
+                ('job_descriptions', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PortalPostingRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('job_titles', models.IntegerField(default=0)),
+                ('portal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.portal')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='userpostingrollup',
+            constraint=models.UniqueConstraint(fields=('user', 'day'), name='user_rollup_unique_day'),
+        ),
+        migrations.AddConstraint(
+            model_name='portalpostingrollup',
+            constraint=models.UniqueConstraint(fields=('user', 'day', 'portal'), name='portal_rollup_unique_day'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.1.5 on 2026-10-17 20:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_posting_rollups'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobtitle',
+            index=models.Index(fields=['user', 'portal', 'id'], name='jobtitle_user_portal_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobtitle',
+            index=models.Index(fields=['user', 'title'], name='jobtitle_user_title_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.1.5 on 2026-10-17 21:40
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_jobtitle_list_filter_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='portal',
+            name='last_updated',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -2,6 +2,8 @@ from django.db import models  # noqa
 from django.utils import timezone
 from django.conf import settings
 
+from core.hashing import hashing_service
+
 # Create your models here.
 
 
@@ -103,6 +105,25 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     USERNAME_FIELD = "email"  # overrides the default user field from base class
 
+    def set_password(self, raw_password):
+        """Hash in the worker pool of `core.hashing`"""
+
+        self.password = hashing_service.make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        """Check in the worker pool of `core.hashing`"""
+
+        def setter(raw_password):
+            self.set_password(raw_password)
+            # password hash upgrades shouldn't be considered password changes
+            self._password = None
+            self.save(update_fields=["password"])
+
+        return hashing_service.check_password(
+            raw_password, self.password, setter
+        )
+
 
 class Portal(models.Model):
     user = models.ForeignKey(
@@ -111,6 +132,12 @@ class Portal(models.Model):
     )
     name = models.CharField(max_length=250, unique=True)
     description = models.CharField(max_length=250)
+    # validates the job titles served with their portal, see
+    # `job/conditional.py`
+    last_updated = models.DateTimeField(auto_now=True)
+
+    # NOTE :: `Portal(user)` is already covered by the index django
+    # creates for every `ForeignKey` (db_index=True), so no Meta.indexes.
 
     def __str__(self):
         return self.name
@@ -125,6 +152,14 @@ class JobDescription(models.Model):
     description_text = models.CharField(max_length=250)
     pub_date = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            # per-user listing ordered / ranged by publication date
+            models.Index(
+                fields=["user", "pub_date"], name="jobdesc_user_pub_date_idx"
+            ),
+        ]
+
     def __str__(self):
         return self.role
 
@@ -149,19 +184,246 @@ class JobTitle(models.Model):
         "JobDescription", on_delete=models.CASCADE
     )
     portal = models.ForeignKey(Portal, on_delete=models.CASCADE)
+    # denormalized `Application` count, see `core/applications.py`
+    applicant_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        # TODO - refer
+        # https://docs.djangoproject.com/en/4.1/ref/models/indexes/
+        indexes = [
+            # `JobTitleViewSet` lists `WHERE user_id = ? ORDER BY id DESC`
+            models.Index(fields=["user", "id"], name="jobtitle_user_id_idx"),
+            # "top jobs by applicants" reads the counters in index order
+            models.Index(
+                fields=["user", "-applicant_count", "-id"],
+                name="jobtitle_user_applicants_idx",
+            ),
+            # `max(last_updated)` / `count(*)` per user for conditional GETs
+            models.Index(
+                fields=["user", "last_updated"],
+                name="jobtitle_user_updated_idx",
+            ),
+            # per-portal listing ordered / ranged by modification time
+            models.Index(
+                fields=["portal", "last_updated"],
+                name="jobtitle_portal_updated_idx",
+            ),
+            # list filters, see `job/filters.py`: a portal's titles in page
+            # order, title prefix ranges
+            models.Index(
+                fields=["user", "portal", "id"],
+                name="jobtitle_user_portal_idx",
+            ),
+            models.Index(
+                fields=["user", "title"], name="jobtitle_user_title_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.title + f"( {self.portal} )"
 
 
-class Applicant(User):
-    """Derive from user model"""
+class Application(models.Model):
+    """A user applying for a `JobTitle`
 
-    is_applicant = models.BooleanField(default=True)
-    applied_for = models.ForeignKey(JobTitle, on_delete=models.CASCADE)
-    cover_letter = models.CharField(max_length=250)
+    Replaces the former `Applicant(User)` multi-table inheritance: reading
+    applications never joins `core_user`, and a user may apply for any
+    number of job titles. `JobTitle.applicant_count` is kept in step by
+    `core/applications.py`.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE
+    )
+    job_title = models.ForeignKey(
+        JobTitle,
+        on_delete=models.CASCADE,
+        related_name="applications",
+    )
+    cover_letter = models.CharField(max_length=250, blank=True)
+    applied_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            # also the index of the per job title listing
+            models.UniqueConstraint(
+                fields=["job_title", "user"], name="application_unique_user"
+            ),
+        ]
+        indexes = [
+            # a user's applications, newest first
+            models.Index(
+                fields=["user", "applied_at"], name="application_user_idx"
+            ),
+        ]
 
     def __str__(self):
-        return self.name
+        return f"{self.user} -> {self.job_title_id}"
+
+
+class JobTitleSearchDocument(models.Model):
+    """
+    Denormalized search document of one `JobTitle`
+
+    Holds the job title plus the role and text of its `JobDescription`, and
+    copies of the columns search results are filtered on, so a search never
+    joins the source tables. The full-text index over it is vendor specific
+    (MySQL FULLTEXT / SQLite FTS5), see `core/search.py` and the migration.
+
+    Kept up to date by `core.search.index_job_titles`.
+    """
 
+    job_title = models.OneToOneField(
+        JobTitle,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="search_document",
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE
+    )
+    portal = models.ForeignKey(Portal, on_delete=models.CASCADE)
+    pub_date = models.DateTimeField()
+    title = models.CharField(max_length=250)
+    document = models.TextField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "pub_date"], name="search_user_pub_date_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class JobTitleSignature(models.Model):
+    """
+    MinHash signature of one `JobTitle`, see `core/dedup.py`
+
+    `cluster_id` is the id of the oldest job title of the near-duplicate
+    cluster; a job title that is nobody's duplicate has its own id.
+    """
+
+    job_title = models.OneToOneField(
+        JobTitle,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="signature",
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE
+    )
+    # `dedup.NUM_PERM` little endian uint32 values
+    minhash = models.BinaryField()
+    cluster_id = models.BigIntegerField()
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "cluster_id"], name="signature_cluster_idx"
+            ),
+        ]
+
+
+class JobTitleLSHBucket(models.Model):
+    """One locality-sensitive hashing band of a `JobTitleSignature`
+
+    Job titles sharing any `(band, bucket)` are duplicate candidates.
+    """
+
+    job_title = models.ForeignKey(
+        JobTitle,
+        on_delete=models.CASCADE,
+        related_name="lsh_buckets",
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE
+    )
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "bucket", "band"], name="lsh_bucket_idx"
+            ),
+        ]
+
+
+class ImportCheckpoint(models.Model):
+    """How far `import_jsonl` got through one file
+
+    Updated in the transaction that writes each batch, so a resumed import
+    neither skips nor repeats rows.
+    """
+
+    source = models.CharField(max_length=255, unique=True)
+    # byte offset of the first line not imported yet
+    offset = models.BigIntegerField(default=0)
+    rows = models.BigIntegerField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source} @ {self.offset}"
+
+
+class PortalPostingRollup(models.Model):
+    """New job titles of one user on one portal on one day
+
+    `day` is the publication date of the job title's description. Kept up
+    to date incrementally by `core/rollups.py`; `rebuild_rollups`
+    recomputes it from the source tables.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE
+    )
+    portal = models.ForeignKey(Portal, on_delete=models.CASCADE)
+    day = models.DateField()
+    # signed: a drifted counter must never make a delete fail
+    job_titles = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # also the index of the per user date range reads
+            models.UniqueConstraint(
+                fields=["user", "day", "portal"],
+                name="portal_rollup_unique_day",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.portal_id}: {self.job_titles}"
+
+
+class UserPostingRollup(models.Model):
+    """New job titles and job descriptions of one user on one day
+
+    Same maintenance as `PortalPostingRollup`; descriptions belong to no
+    portal, so they are only counted here.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE
+    )
+    day = models.DateField()
+    job_titles = models.IntegerField(default=0)
+    job_descriptions = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "day"], name="user_rollup_unique_day"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day}: {self.job_titles} / {self.job_descriptions}"
@@ -0,0 +1,242 @@
+"""
+OpenAPI schema built once, served from disk
+
+Generating the schema introspects every view and serializer, hundreds of
+milliseconds of CPU. `python manage.py build_schema` does it at build time
+(see the Dockerfile) and writes to `SCHEMA_DIR`:
+
+- `schema.<hash>.yaml` / `schema.<hash>.json`, named after the first
+  characters of their sha256
+- `manifest.json`, written last: the current file, full sha256 and size
+  of each format, plus the API version
+
+`schema_view` (`/api/schema/`) serves the current files from memory with
+a strong ETag, their sha256, and answers `If-None-Match` with 304. YAML by
+default, JSON for `?format=json` or an `Accept` asking for JSON. A request
+naming the current hash in `?v=` gets an immutable response: the Swagger
+UI of `/api/docs/` (`SwaggerView`) links to that URL.
+
+Without a built schema, the schema is generated per request when
+`SCHEMA_LIVE_FALLBACK` (development, `DEBUG`); otherwise `/api/schema/`
+answers 503.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+import drf_spectacular
+from drf_spectacular.plumbing import set_query_parameters
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+
+MANIFEST = "manifest.json"
+# format -> renderer, media type
+FORMATS = {
+    "yaml": (OpenApiYamlRenderer, "application/vnd.oai.openapi"),
+    "json": (OpenApiJsonRenderer, "application/vnd.oai.openapi+json"),
+}
+# characters of the sha256 in the file names and `?v=`
+VERSION_LENGTH = 16
+
+
+def generate():
+    """Generate the schema now, return ({format: bytes}, API version)"""
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    return {
+        name: renderer().render(schema, renderer_context={})
+        for name, (renderer, _) in FORMATS.items()
+    }, schema["info"].get("version")
+
+
+def write(directory, documents, version=None):
+    """Write `documents` ({format: bytes}) and their manifest
+
+    Files of older builds are deleted. Returns the manifest.
+    """
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest = {"version": version, "formats": {}}
+    for name, content in documents.items():
+        digest = hashlib.sha256(content).hexdigest()
+        filename = f"schema.{digest[:VERSION_LENGTH]}.{name}"
+        _write(directory / filename, content)
+        manifest["formats"][name] = {
+            "file": filename, "sha256": digest, "size": len(content),
+        }
+    # readers look at the manifest first, it goes last
+    _write(directory / MANIFEST, json.dumps(manifest, indent=2).encode())
+
+    current = {entry["file"] for entry in manifest["formats"].values()}
+    for path in directory.glob("schema.*"):
+        if path.name not in current:
+            path.unlink(missing_ok=True)
+    return manifest
+
+
+def _write(path, content):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(content)
+    os.replace(tmp, path)
+
+
+class Document:
+    """One format of the built schema"""
+
+    def __init__(self, content, sha256, media_type):
+        self.content = content
+        self.sha256 = sha256
+        self.media_type = media_type
+        self.etag = f'"{sha256}"'
+        self.version = sha256[:VERSION_LENGTH]
+
+
+class BuiltSchema:
+    """The schema of a directory, held in memory
+
+    Reloaded when the manifest changes, one `stat` per access.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self._documents = None
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def documents(self):
+        """Return {format: Document}, None when nothing was built"""
+
+        try:
+            mtime = (self.directory / MANIFEST).stat().st_mtime_ns
+        except OSError:
+            return None
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    self._documents = self._load()
+                    # a failed load is retried on the next access
+                    if self._documents is not None:
+                        self._mtime = mtime
+        return self._documents
+
+    def _load(self):
+        try:
+            manifest = json.loads((self.directory / MANIFEST).read_bytes())
+            documents = {}
+            for name, entry in manifest["formats"].items():
+                content = (self.directory / entry["file"]).read_bytes()
+                if hashlib.sha256(content).hexdigest() != entry["sha256"]:
+                    # rebuilt while loading
+                    return None
+                documents[name] = Document(
+                    content, entry["sha256"], FORMATS[name][1]
+                )
+        except (OSError, ValueError, KeyError):
+            return None
+        return documents
+
+
+_built = {}
+
+
+def built_schema():
+    """The `BuiltSchema` of `SCHEMA_DIR`"""
+
+    directory = settings.SCHEMA_DIR
+    if directory not in _built:
+        _built[directory] = BuiltSchema(directory)
+    return _built[directory]
+
+
+def negotiate(request):
+    """"json" or "yaml", from `?format=` then `Accept`"""
+
+    requested = request.GET.get("format")
+    if requested in ("json", "openapi-json"):
+        return "json"
+    if requested in ("yaml", "openapi"):
+        return "yaml"
+    accept = request.headers.get("Accept", "")
+    return "json" if "json" in accept else "yaml"
+
+
+_live_view = SpectacularAPIView.as_view()
+
+
+def schema_view(request):
+    """The OpenAPI schema, the built one if any, see the module doc"""
+
+    if request.method not in ("GET", "HEAD"):
+        return HttpResponse(status=405, headers={"Allow": "GET, HEAD"})
+    documents = built_schema().documents()
+    if documents is None:
+        if settings.SCHEMA_LIVE_FALLBACK:
+            return _live_view(request)
+        return JsonResponse(
+            {"detail": "Schema not built, run `manage.py build_schema`."},
+            status=503,
+        )
+
+    name = negotiate(request)
+    document = documents[name]
+    response = HttpResponse(document.content, content_type=document.media_type)
+    response["ETag"] = document.etag
+    response["Content-Disposition"] = (
+        f'inline; filename="schema.{document.version}.{name}"'
+    )
+    if request.GET.get("v") == document.version:
+        response["Cache-Control"] = "public, max-age=31536000, immutable"
+    else:
+        response["Cache-Control"] = "public, no-cache"
+    patch_vary_headers(response, ["Accept"])
+    return get_conditional_response(
+        request, etag=document.etag, response=response
+    )
+
+
+class SwaggerView(SpectacularSwaggerView):
+    """Swagger UI on the versioned built schema, with an ETag"""
+
+    def _get_schema_url(self, request):
+        url = super()._get_schema_url(request)
+        documents = built_schema().documents()
+        if documents is None:
+            return url
+        return set_query_parameters(
+            url, format="json", v=documents["json"].version
+        )
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        documents = built_schema().documents()
+        if (
+            documents is None
+            or request.method != "GET"
+            or response.status_code != 200
+        ):
+            return response
+        # the page embeds a CSRF token masked anew on every render, its
+        # ETag covers what the page depends on rather than its bytes
+        key = "|".join((
+            documents["json"].sha256,
+            request.get_full_path(),
+            request.COOKIES.get(settings.CSRF_COOKIE_NAME, ""),
+            drf_spectacular.__version__,
+            json.dumps(spectacular_settings.SWAGGER_UI_SETTINGS, default=str),
+        ))
+        etag = f'"{hashlib.sha256(key.encode()).hexdigest()}"'
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        # a 304 skips rendering the template
+        return get_conditional_response(request, etag=etag, response=response)
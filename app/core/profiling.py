@@ -0,0 +1,317 @@
+"""
+Sampled request profiling
+
+With `PROFILING_ENABLED`, `ProfilingMiddleware` profiles a share
+(`PROFILING_SAMPLE_RATE`) of the requests, and every request sending an
+`X-Profile` header equal to `PROFILING_TOKEN`. A profiled request gets:
+
+- a `StackSampler`: a thread reading the request thread's stack every
+  `PROFILING_INTERVAL` seconds. The request itself runs unmodified, there
+  is no per call tracing as with cProfile.
+- its SQL statements with their start offset and duration, from an
+  execute wrapper
+
+Each profile is saved in `PROFILING_DIR` as `<id>.collapsed`, one
+`frame;frame;frame count` line per stack (flamegraph.pl, speedscope,
+...), and `<id>.json` with the view, status, duration and SQL timeline.
+Only the `PROFILING_MAX_PROFILES` newest are kept. Profiled responses
+carry their id in `X-Profile-Id`.
+
+`python manage.py profiles` lists them and aggregates them by view.
+
+Disabled (the default) the middleware removes itself and no wrapper is
+installed: nothing runs per request.
+
+NOTE :: under ASGI a request hops between threads, all threads of the
+process are sampled then, other requests included.
+"""
+
+import asyncio
+import functools
+import hmac
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+# longest SQL text and number of statements kept per profile
+MAX_SQL_LENGTH = 2000
+MAX_QUERIES = 1000
+
+# profile of the request being served
+_request = ContextVar("profiling_request", default=None)
+
+
+@functools.lru_cache(maxsize=8192)
+def frame_name(code):
+    """`function (module.py:line)` of a code object"""
+
+    filename = code.co_filename
+    for prefix in ("site-packages" + os.sep, str(settings.BASE_DIR) + os.sep):
+        if prefix in filename:
+            filename = filename.split(prefix, 1)[1]
+            break
+    # `;` separates the frames of a stack
+    name = f"{code.co_qualname} ({filename}:{code.co_firstlineno})"
+    return name.replace(";", ":")
+
+
+def collapse(frame):
+    """Return the stack of `frame`, outermost first, `;` separated"""
+
+    names = []
+    while frame is not None:
+        names.append(frame_name(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """Count the stacks of a thread, sampled from another thread
+
+    Args:
+        thread_id: thread to sample, None for every other thread
+        interval: seconds between samples
+    """
+
+    def __init__(self, thread_id=None, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="profiling-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling, return the counts"""
+
+        self._stop.set()
+        self._thread.join()
+        return self.counts
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            if self.thread_id is not None:
+                frames = {self.thread_id: frames.get(self.thread_id)}
+            for thread_id, frame in frames.items():
+                if thread_id != own and frame is not None:
+                    self.counts[collapse(frame)] += 1
+
+
+class RequestProfile:
+    """Samples and SQL timeline of one request"""
+
+    def __init__(self, thread_id=None):
+        self.sampler = StackSampler(thread_id, settings.PROFILING_INTERVAL)
+        self.queries = []
+        self.start = None
+        self.duration = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self.sampler.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.sampler.stop()
+        self.duration = time.perf_counter() - self.start
+
+    def save(self, request, response):
+        """Write the profile to `PROFILING_DIR`, return its id"""
+
+        directory = Path(settings.PROFILING_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        # sorts by time, also across processes
+        profile_id = f"{time.time_ns()}-{os.getpid()}"
+        match = request.resolver_match
+        meta = {
+            "id": profile_id,
+            "view": match.view_name if match is not None else "<unmatched>",
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "started_at": time.time() - self.duration,
+            "duration_ms": self.duration * 1000,
+            "interval_ms": self.sampler.interval * 1000,
+            "samples": sum(self.sampler.counts.values()),
+            "queries": self.queries,
+        }
+        _write(
+            directory / f"{profile_id}.collapsed",
+            "".join(
+                f"{stack} {count}\n"
+                for stack, count in self.sampler.counts.most_common()
+            ),
+        )
+        # written last, listing only looks at the `.json` files
+        _write(directory / f"{profile_id}.json", json.dumps(meta))
+        prune(directory, settings.PROFILING_MAX_PROFILES)
+        return profile_id
+
+
+def _write(path, text):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+def prune(directory, keep):
+    """Delete all but the `keep` newest profiles of `directory`"""
+
+    for path in sorted(Path(directory).glob("*.json"))[:-keep or None]:
+        for stale in (path, path.with_suffix(".collapsed")):
+            try:
+                stale.unlink()
+            except FileNotFoundError:
+                # pruned by another process
+                pass
+
+
+def load_profiles(directory):
+    """Return the saved profiles of `directory`, oldest first"""
+
+    profiles = []
+    for path in sorted(Path(directory).glob("*.json")):
+        try:
+            profiles.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+def load_stacks(directory, profile_id):
+    """Return the collapsed stack counts of one profile"""
+
+    counts = Counter()
+    try:
+        lines = Path(directory, f"{profile_id}.collapsed").read_text()
+    except OSError:
+        return counts
+    for line in lines.splitlines():
+        stack, _, count = line.rpartition(" ")
+        if stack:
+            counts[stack] += int(count)
+    return counts
+
+
+def _record_query(execute, sql, params, many, context):
+    profile = _request.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if len(profile.queries) < MAX_QUERIES:
+            profile.queries.append({
+                "start_ms": (start - profile.start) * 1000,
+                "duration_ms": (time.perf_counter() - start) * 1000,
+                "sql": sql[:MAX_SQL_LENGTH],
+                "database": context["connection"].alias,
+            })
+
+
+def _watch_connection(sender, connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def install():
+    """Hook the SQL timeline wrapper, from `CoreConfig.ready`"""
+
+    connection_created.connect(
+        _watch_connection, dispatch_uid="core.profiling.watch_connection"
+    )
+    # connections this thread already opened
+    for connection in connections.all(initialized_only=True):
+        _watch_connection(None, connection)
+
+
+def uninstall():
+    connection_created.disconnect(
+        dispatch_uid="core.profiling.watch_connection"
+    )
+    for connection in connections.all(initialized_only=True):
+        if _record_query in connection.execute_wrappers:
+            connection.execute_wrappers.remove(_record_query)
+
+
+class ProfilingMiddleware:
+    """Profile sampled or requested requests, see the module doc"""
+
+    sync_capable = True
+    async_capable = True
+
+    header = "X-Profile"
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        else:
+            self._is_coroutine = None
+
+    def should_profile(self, request):
+        token = settings.PROFILING_TOKEN
+        value = request.headers.get(self.header)
+        # `compare_digest` only takes ASCII strings
+        if token and value and hmac.compare_digest(
+            value.encode(), token.encode()
+        ):
+            return True
+        return random.random() < settings.PROFILING_SAMPLE_RATE
+
+    def __call__(self, request):
+        if self._is_coroutine:
+            return self.__acall__(request)
+        if not self.should_profile(request):
+            return self.get_response(request)
+        profile = RequestProfile(threading.get_ident())
+        token = _request.set(profile)
+        try:
+            with profile:
+                response = self.get_response(request)
+        finally:
+            _request.reset(token)
+        return self.finish(request, response, profile)
+
+    async def __acall__(self, request):
+        if not self.should_profile(request):
+            return await self.get_response(request)
+        profile = RequestProfile()
+        token = _request.set(profile)
+        try:
+            with profile:
+                response = await self.get_response(request)
+        finally:
+            _request.reset(token)
+        return self.finish(request, response, profile)
+
+    def finish(self, request, response, profile):
+        try:
+            response["X-Profile-Id"] = profile.save(request, response)
+        except OSError:
+            logger.exception("could not save the profile of %s", request.path)
+        return response
@@ -0,0 +1,326 @@
+"""
+Read replicas
+
+`ReplicaRouter` sends the reads of GET / HEAD / OPTIONS requests to a read
+replica, one per request picked at random among the healthy ones, and
+everything else to the primary (`default`):
+
+- writes, and every query of the other requests
+- reads of a request once it wrote, and inside a transaction
+- reads outside of a request (management commands, ingestion, shell)
+- auth tokens and sessions, so a token works as soon as it is issued
+
+Read your writes: after a request wrote, `PrimaryPinningMiddleware` keeps
+the time of the write in the cache under the client (its `Authorization`
+header or session cookie) for `REPLICA_PIN_SECONDS`. Within that window
+the client only reads from replicas whose last health check showed they
+had applied the write: checked at `t` lagging `lag` seconds, a replica has
+every write committed before `t - lag`.
+
+Health: every `REPLICA_CHECK_INTERVAL` seconds each process checks a
+replica on the next read going to it. A replica that cannot be reached,
+does not replicate or lags more than `REPLICA_MAX_LAG` seconds leaves the
+rotation until a later check passes. A query failing on a lost connection
+takes it out at once.
+
+NOTE :: pins live in the configured cache (`CACHES`); with several worker
+processes it has to be shared for a client to read its writes whichever
+worker serves it.
+"""
+
+import asyncio
+import hashlib
+import math
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    DatabaseError,
+    InterfaceError,
+    OperationalError,
+    connections,
+)
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+PRIMARY = DEFAULT_DB_ALIAS
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+PIN_CACHE_PREFIX = "replicas:pin:"
+
+# routing state of the request being served
+_request = ContextVar("replica_request", default=None)
+
+
+class RequestState:
+    """Where the reads of one request go
+
+    Args:
+        client: cache key of the client, None if anonymous
+        wrote_at: time of the client's pinned write, if any
+        primary: read from the primary only
+    """
+
+    __slots__ = ("client", "wrote_at", "primary", "wrote", "replica")
+
+    def __init__(self, client=None, wrote_at=None, primary=False):
+        self.client = client
+        self.wrote_at = wrote_at
+        self.primary = primary
+        self.wrote = False
+        # chosen on the first read, then kept for the whole request
+        self.replica = None
+
+
+def replica_lag(connection):
+    """Seconds the database of `connection` lags behind the primary
+
+    Returns `math.inf` if replication is stopped, None if the backend
+    cannot tell.
+
+    Raises:
+        DatabaseError: the database cannot be reached
+    """
+
+    with connection.cursor() as cursor:
+        if connection.vendor != "mysql":
+            cursor.execute("SELECT 1")
+            return None
+        # MySQL 8.0.22+
+        cursor.execute("SHOW REPLICA STATUS")
+        row = cursor.fetchone()
+        columns = [column[0] for column in cursor.description or ()]
+    if row is None:
+        # not set up as a replica, e.g. behind a managed reader endpoint
+        return None
+    lag = dict(zip(columns, row)).get("Seconds_Behind_Source")
+    return math.inf if lag is None else float(lag)
+
+
+class ReplicaHealth:
+    """Health of the replicas, as seen by this process
+
+    Args:
+        clock: wall clock, pins are compared across processes
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        # alias -> (healthy, applied_until, checked_at)
+        self._status = {}
+        self._checking = set()
+        self._lock = threading.Lock()
+
+    def choose(self, wrote_at=None):
+        """Return a healthy replica that applied `wrote_at`, None if none"""
+
+        now = self.clock()
+        candidates = []
+        for alias in settings.DATABASE_REPLICAS:
+            healthy, applied_until, _ = self.status(alias, now)
+            if healthy and (
+                wrote_at is None
+                or applied_until is not None and applied_until > wrote_at
+            ):
+                candidates.append(alias)
+        return random.choice(candidates) if candidates else None
+
+    def status(self, alias, now):
+        """Return the status of `alias`, checking it if outdated
+
+        One thread checks at a time, the others keep the previous status,
+        a replica never checked yet is out of rotation meanwhile.
+        """
+
+        status = self._status.get(alias, (False, None, None))
+        checked_at = status[2]
+        if (
+            checked_at is not None
+            and now - checked_at < settings.REPLICA_CHECK_INTERVAL
+        ):
+            return status
+        with self._lock:
+            if alias in self._checking:
+                return status
+            self._checking.add(alias)
+        try:
+            return self.check(alias)
+        finally:
+            with self._lock:
+                self._checking.discard(alias)
+
+    def check(self, alias):
+        checked_at = self.clock()
+        try:
+            lag = replica_lag(connections[alias])
+        except DatabaseError:
+            status = (False, None, checked_at)
+        else:
+            status = (
+                lag is None or lag <= settings.REPLICA_MAX_LAG,
+                None if lag is None else checked_at - lag,
+                checked_at,
+            )
+        self._status[alias] = status
+        return status
+
+    def mark_down(self, alias):
+        """Take `alias` out of rotation until its next check"""
+
+        self._status[alias] = (False, None, self.clock())
+
+    def reset(self):
+        self._status.clear()
+
+
+replica_health = ReplicaHealth()
+
+
+def _mark_down_on_error(execute, sql, params, many, context):
+    try:
+        return execute(sql, params, many, context)
+    except (OperationalError, InterfaceError):
+        connection = context["connection"]
+        if not connection.is_usable():
+            replica_health.mark_down(connection.alias)
+        raise
+
+
+@receiver(connection_created)
+def watch_replica(sender, connection, **kwargs):
+    if (
+        connection.alias in settings.DATABASE_REPLICAS
+        and _mark_down_on_error not in connection.execute_wrappers
+    ):
+        connection.execute_wrappers.append(_mark_down_on_error)
+
+
+class ReplicaRouter:
+    """Database router reading from the replicas, see the module doc"""
+
+    # read from the primary only
+    primary_apps = {"authtoken", "sessions"}
+
+    def db_for_read(self, model, **hints):
+        state = _request.get()
+        if (
+            state is None
+            or state.primary
+            or model._meta.app_label in self.primary_apps
+            or connections[PRIMARY].in_atomic_block
+        ):
+            return PRIMARY
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            # related objects come from the same database
+            return instance._state.db
+        if state.replica is None:
+            state.replica = replica_health.choose(state.wrote_at) or PRIMARY
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _request.get()
+        if state is not None:
+            state.primary = state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+def client_key(request):
+    """Return the cache key pinning the client of `request`, or None"""
+
+    credentials = request.META.get("HTTP_AUTHORIZATION") or (
+        request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    )
+    if not credentials:
+        return None
+    digest = hashlib.blake2b(credentials.encode(), digest_size=16)
+    return PIN_CACHE_PREFIX + digest.hexdigest()
+
+
+class PrimaryPinningMiddleware:
+    """Set up the routing state of each request, pin clients after writes
+
+    Does nothing without replicas.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        else:
+            self._is_coroutine = None
+
+    def __call__(self, request):
+        if self._is_coroutine:
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        state = self.start(request)
+        token = _request.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request.reset(token)
+        return self.finish(state, response)
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+        state = self.start(request)
+        token = _request.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request.reset(token)
+        return self.finish(state, response)
+
+    def start(self, request):
+        client = client_key(request)
+        if request.method not in SAFE_METHODS:
+            return RequestState(client, primary=True)
+        wrote_at = cache.get(client) if client is not None else None
+        return RequestState(client, wrote_at)
+
+    def finish(self, state, response):
+        if response.streaming:
+            # exports read while the response is sent
+            response.streaming_content = _routed(
+                response.streaming_content, state
+            )
+        if state.wrote and state.client is not None:
+            cache.set(
+                state.client, replica_health.clock(),
+                settings.REPLICA_PIN_SECONDS,
+            )
+        return response
+
+
+def _routed(content, state):
+    """Iterate `content` with the routing state of its request"""
+
+    content = iter(content)
+    while True:
+        token = _request.set(state)
+        try:
+            chunk = next(content, None)
+        finally:
+            _request.reset(token)
+        if chunk is None:
+            return
+        yield chunk
@@ -0,0 +1,235 @@
+"""
+Per day posting rollups, maintained incrementally
+
+Dashboards chart new job titles per portal per day and new job titles /
+job descriptions per user per day. Counting them with GROUP BY over the
+source tables gets slower as they grow; `PortalPostingRollup` and
+`UserPostingRollup` hold the counts instead, so a chart reads at most one
+row per day (and portal) of its range.
+
+Every write applies its difference to the rollups, as `F()` increments in
+the writer's transaction:
+
+- saves and deletes through the signal handlers in `core/signals.py`,
+  which count the affected rows before and after the write (a title moved
+  to another portal, or a description republished on another day, moves
+  its counts)
+- `bulk_create` writers (`job.bulk`, the ingestion `BatchWriter`) with
+  `track` or `apply_changes`
+
+A posting's day is the publication date of its job description, in the
+current time zone. Rows written with raw SQL are not counted;
+`rebuild_rollups` recomputes everything from the source tables.
+"""
+
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.models import (
+    JobDescription,
+    JobTitle,
+    PortalPostingRollup,
+    UserPostingRollup,
+)
+
+# rows per INSERT statement of `rebuild`
+WRITE_BATCH_SIZE = 1000
+
+COUNTERS = {
+    PortalPostingRollup: ("job_titles",),
+    UserPostingRollup: ("job_titles", "job_descriptions"),
+}
+
+
+def posting_day(pub_date):
+    """Return the rollup day of a publication date"""
+
+    if timezone.is_aware(pub_date):
+        pub_date = timezone.localtime(pub_date)
+    return pub_date.date()
+
+
+def job_title_counts(job_titles):
+    """Return `{(user_id, portal_id, day): count}` of a job title queryset"""
+
+    return Counter(
+        (user_id, portal_id, posting_day(pub_date))
+        for user_id, portal_id, pub_date in job_titles.values_list(
+            "user_id", "portal_id", "job_description__pub_date"
+        )
+    )
+
+
+def job_description_counts(descriptions):
+    """Return `{(user_id, day): count}` of a job description queryset"""
+
+    return Counter(
+        (user_id, posting_day(pub_date))
+        for user_id, pub_date in descriptions.values_list(
+            "user_id", "pub_date"
+        )
+    )
+
+
+def difference(after, before):
+    """Return the signed per key change from `before` to `after`"""
+
+    changes = Counter(after)
+    changes.subtract(before)
+    return {key: count for key, count in changes.items() if count}
+
+
+def apply_changes(job_titles=None, job_descriptions=None):
+    """Add signed counts to the rollups
+
+    Args:
+        job_titles: `{(user_id, portal_id, day): change}`
+        job_descriptions: `{(user_id, day): change}`
+    """
+
+    job_titles = job_titles or {}
+    job_descriptions = job_descriptions or {}
+    for (user_id, portal_id, day), count in job_titles.items():
+        if count:
+            _add(
+                PortalPostingRollup,
+                {"user_id": user_id, "portal_id": portal_id, "day": day},
+                job_titles=count,
+            )
+    per_user = _per_user(job_titles, job_descriptions)
+    for (user_id, day), (titles, descriptions) in per_user.items():
+        changes = {"job_titles": titles, "job_descriptions": descriptions}
+        changes = {name: count for name, count in changes.items() if count}
+        if changes:
+            _add(UserPostingRollup, {"user_id": user_id, "day": day},
+                 **changes)
+
+
+def _per_user(job_titles, job_descriptions):
+    """Return `{(user_id, day): [job titles, job descriptions]}`"""
+
+    per_user = defaultdict(lambda: [0, 0])
+    for (user_id, _, day), count in job_titles.items():
+        per_user[user_id, day][0] += count
+    for (user_id, day), count in job_descriptions.items():
+        per_user[user_id, day][1] += count
+    return per_user
+
+
+def _add(model, key, **changes):
+    """Increment the counters of one rollup row, creating or deleting it"""
+
+    rows = model.objects.filter(**key)
+    increments = {name: F(name) + count for name, count in changes.items()}
+    if rows.update(**increments):
+        if min(changes.values()) < 0:
+            # keep the tables as small as the data: drop emptied rows
+            rows.filter(**{name: 0 for name in COUNTERS[model]}).delete()
+        return
+    if max(changes.values()) <= 0:
+        # the row went with a cascade, or was never counted
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**key, **changes)
+    except IntegrityError:
+        # a concurrent writer created the row first
+        rows.update(**increments)
+
+
+@contextmanager
+def track(job_titles=None, job_descriptions=None):
+    """Apply the rollup changes of the writes in the `with` block
+
+    The querysets must match the written rows before and after the block,
+    e.g. `JobTitle.objects.filter(job_description_id__in=ids)`.
+    """
+
+    before = _counts(job_titles, job_descriptions)
+    yield
+    after = _counts(job_titles, job_descriptions)
+    apply_changes(*(
+        difference(new, old) for new, old in zip(after, before)
+    ))
+
+
+def _counts(job_titles, job_descriptions):
+    return (
+        job_title_counts(job_titles) if job_titles is not None else {},
+        job_description_counts(job_descriptions)
+        if job_descriptions is not None else {},
+    )
+
+
+def rebuild(batch_size=5000, out=None):
+    """Recompute every rollup row from the source tables
+
+    Runs in one transaction; writes committed while it runs may be lost,
+    so pause writers first. Returns the number of counted job titles and
+    job descriptions.
+    """
+
+    with transaction.atomic():
+        job_titles = Counter()
+        for chunk in _chunks(JobTitle.objects.values_list(
+            "id", "user_id", "portal_id", "job_description__pub_date"
+        ), batch_size):
+            job_titles.update(
+                (user_id, portal_id, posting_day(pub_date))
+                for _, user_id, portal_id, pub_date in chunk
+            )
+            if out is not None:
+                out.write(f"counted job titles up to id {chunk[-1][0]}")
+        job_descriptions = Counter()
+        for chunk in _chunks(JobDescription.objects.values_list(
+            "id", "user_id", "pub_date"
+        ), batch_size):
+            job_descriptions.update(
+                (user_id, posting_day(pub_date))
+                for _, user_id, pub_date in chunk
+            )
+            if out is not None:
+                out.write(f"counted job descriptions up to id {chunk[-1][0]}")
+
+        per_user = _per_user(job_titles, job_descriptions)
+        PortalPostingRollup.objects.all().delete()
+        UserPostingRollup.objects.all().delete()
+        PortalPostingRollup.objects.bulk_create(
+            [
+                PortalPostingRollup(
+                    user_id=user_id, portal_id=portal_id, day=day,
+                    job_titles=count,
+                )
+                for (user_id, portal_id, day), count in job_titles.items()
+            ],
+            batch_size=WRITE_BATCH_SIZE,
+        )
+        UserPostingRollup.objects.bulk_create(
+            [
+                UserPostingRollup(
+                    user_id=user_id, day=day, job_titles=titles,
+                    job_descriptions=descriptions,
+                )
+                for (user_id, day), (titles, descriptions)
+                in per_user.items()
+            ],
+            batch_size=WRITE_BATCH_SIZE,
+        )
+    return sum(job_titles.values()), sum(job_descriptions.values())
+
+
+def _chunks(rows, batch_size):
+    """Yield lists of `rows` (id first) in keyset chunks of `batch_size`"""
+
+    rows = rows.order_by("id")
+    last_id = 0
+    while True:
+        chunk = list(rows.filter(id__gt=last_id)[:batch_size])
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1][0]
@@ -0,0 +1,222 @@
+"""
+Full-text search over job titles
+
+Searches run against `JobTitleSearchDocument` (title + role + description
+text of one job title) through the vendor's full-text index:
+
+- MySQL: `MATCH ... AGAINST (... IN BOOLEAN MODE)` on FULLTEXT indexes
+- SQLite: the `core_jobtitlesearch_fts` FTS5 table (used by the tests)
+- anything else: `LIKE` on every term, unranked
+
+Query syntax: words are AND-ed, `"two words"` is a phrase and `pyth*` a
+prefix. Everything except letters and digits is dropped, so user input can
+never reach the full-text query parser as syntax.
+"""
+
+import re
+from dataclasses import dataclass
+
+from django.db import connection, transaction
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from core.models import JobTitle, JobTitleSearchDocument
+
+# letters and digits, `_` is a separator for both FTS5 and InnoDB
+WORD_RE = re.compile(r"[^\W_]+")
+TOKEN_RE = re.compile(r'"([^"]*)"?|(\S+)')
+
+# bounds the work a single query can ask for
+MAX_TERMS = 10
+
+# rows per DELETE / INSERT when (re)indexing
+INDEX_BATCH_SIZE = 1000
+
+# a match in the title counts twice as much as one in the description
+TITLE_WEIGHT = 2.0
+
+
+@dataclass(frozen=True)
+class Term:
+    """A word or phrase, `prefix` applies to its last word"""
+
+    words: tuple
+    prefix: bool = False
+
+
+def parse_query(query):
+    """Split a user query into `Term`s
+
+    Raises:
+        ValueError: the query contains no searchable word
+    """
+
+    terms = []
+    for phrase, word in TOKEN_RE.findall(query or ""):
+        text = phrase or word
+        words = tuple(WORD_RE.findall(text.lower()))
+        if words:
+            terms.append(Term(words, prefix=text.endswith("*")))
+    if not terms:
+        raise ValueError("Search query must contain at least one word.")
+    return terms[:MAX_TERMS]
+
+
+def to_fts5(terms):
+    """`Term`s as an FTS5 MATCH expression"""
+
+    parts = []
+    for term in terms:
+        part = '"' + " ".join(term.words) + '"'
+        parts.append(part + "*" if term.prefix else part)
+    return " AND ".join(parts)
+
+
+def to_mysql_boolean(terms):
+    """`Term`s as a MySQL boolean mode expression, every term required"""
+
+    parts = []
+    for term in terms:
+        if term.prefix:
+            # boolean mode has no phrase prefix, require every word instead
+            parts.extend("+" + word for word in term.words[:-1])
+            parts.append("+" + term.words[-1] + "*")
+        elif len(term.words) > 1:
+            parts.append('+"' + " ".join(term.words) + '"')
+        else:
+            parts.append("+" + term.words[0])
+    return " ".join(parts)
+
+
+def search_job_titles(user, query, portal=None, pub_date_after=None,
+                      pub_date_before=None):
+    """Return `user`'s matching search documents, best match first
+
+    Each document is annotated with `rank` (higher is better).
+
+    Raises:
+        ValueError: `query` contains no searchable word
+    """
+
+    terms = parse_query(query)
+    documents = JobTitleSearchDocument.objects.filter(user=user)
+    if portal is not None:
+        documents = documents.filter(portal=portal)
+    if pub_date_after is not None:
+        documents = documents.filter(pub_date__gte=pub_date_after)
+    if pub_date_before is not None:
+        documents = documents.filter(pub_date__lte=pub_date_before)
+
+    vendor = connection.vendor
+    table = JobTitleSearchDocument._meta.db_table
+    if vendor == "mysql":
+        expression = to_mysql_boolean(terms)
+        # a bare MATCH in the WHERE clause is answered by the FULLTEXT
+        # index; inside arithmetic it would be computed for every document
+        # of the user. The weighted rank is only selected and sorted on.
+        documents = documents.filter(
+            RawSQL(
+                f"MATCH ({table}.title, {table}.document)"
+                " AGAINST (%s IN BOOLEAN MODE)",
+                [expression],
+                output_field=BooleanField(),
+            )
+        ).annotate(
+            rank=RawSQL(
+                f"MATCH ({table}.title) AGAINST (%s IN BOOLEAN MODE) * %s"
+                f" + MATCH ({table}.title, {table}.document)"
+                " AGAINST (%s IN BOOLEAN MODE)",
+                [expression, TITLE_WEIGHT, expression],
+                output_field=FloatField(),
+            ),
+        )
+    elif vendor == "sqlite":
+        expression = to_fts5(terms)
+        documents = documents.filter(
+            job_title_id__in=RawSQL(
+                "SELECT rowid FROM core_jobtitlesearch_fts"
+                " WHERE core_jobtitlesearch_fts MATCH %s",
+                [expression],
+            )
+        ).annotate(
+            # bm25 is "smaller is better", negate it
+            rank=RawSQL(
+                "SELECT -bm25(core_jobtitlesearch_fts, %s, 1.0)"
+                " FROM core_jobtitlesearch_fts"
+                " WHERE core_jobtitlesearch_fts MATCH %s"
+                f" AND rowid = {table}.job_title_id",
+                [TITLE_WEIGHT, expression],
+                output_field=FloatField(),
+            ),
+        )
+    else:
+        for term in terms:
+            text = " ".join(term.words)
+            documents = documents.filter(
+                Q(title__icontains=text) | Q(document__icontains=text)
+            )
+        documents = documents.annotate(
+            rank=Value(0.0, output_field=FloatField())
+        )
+
+    return documents.order_by("-rank", "-job_title_id")
+
+
+def index_job_titles(job_titles):
+    """(Re)build the search documents of the `job_titles` queryset
+
+    Called on save through signals, and explicitly after `bulk_create`,
+    which sends no signals.
+    """
+
+    rows = list(job_titles.values_list(
+        "id", "user_id", "portal_id", "title",
+        "job_description__pub_date",
+        "job_description__role",
+        "job_description__description_text",
+    ))
+    for start in range(0, len(rows), INDEX_BATCH_SIZE):
+        _write_documents(rows[start:start + INDEX_BATCH_SIZE])
+
+
+def _write_documents(rows):
+    documents = [
+        JobTitleSearchDocument(
+            job_title_id=pk,
+            user_id=user_id,
+            portal_id=portal_id,
+            title=title,
+            pub_date=pub_date,
+            document=f"{role} {description_text}",
+        )
+        for pk, user_id, portal_id, title, pub_date, role, description_text
+        in rows
+    ]
+    with transaction.atomic():
+        JobTitleSearchDocument.objects.filter(
+            job_title_id__in=[document.job_title_id for document in documents]
+        ).delete()
+        JobTitleSearchDocument.objects.bulk_create(documents)
+
+
+def rebuild_index(batch_size=5000, out=None):
+    """Index every job title, `batch_size` titles per pass
+
+    Returns the number of indexed job titles.
+    """
+
+    last_id = 0
+    total = 0
+    while True:
+        ids = list(
+            JobTitle.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return total
+        index_job_titles(JobTitle.objects.filter(id__in=ids))
+        total += len(ids)
+        last_id = ids[-1]
+        if out is not None:
+            out.write(f"indexed {total} job titles")
@@ -0,0 +1,146 @@
+"""
+Signal handlers keeping search documents and duplicate signatures in sync
+with their sources.
+
+Saving a description also bumps `JobTitle.last_updated` of its job title,
+which is served with it through `?expand=` and validated with ETags;
+portals, shared by the titles of every user, are validated on their own
+(see `job/conditional.py`). Deleting a job title (or its description)
+removes the derived rows through `on_delete=CASCADE`; a deleted duplicate
+cluster root hands its cluster to the oldest survivor. `bulk_create` sends
+no signals, callers refresh those rows with
+`core.indexing.refresh_job_titles` themselves.
+
+Deleted applications decrement `JobTitle.applicant_count`, see
+`core/applications.py`.
+
+Job title and description writes update the posting rollups, see
+`core/rollups.py`: the affected rows are counted before (`pre_*`) and after
+(`post_*`) the write and the difference applied.
+"""
+
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core import rollups
+from core.applications import applicant_removed
+from core.dedup import reroot_cluster
+from core.models import (
+    Application,
+    JobDescription,
+    JobTitle,
+    JobTitleSignature,
+)
+from core.indexing import refresh_job_titles
+
+
+@receiver(post_save, sender=JobTitle)
+def index_job_title(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_job_titles(JobTitle.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=JobDescription)
+def index_job_description(sender, instance, created=False, raw=False,
+                          **kwargs):
+    # a new description has no job title yet
+    if not raw and not created:
+        job_titles = JobTitle.objects.filter(job_description=instance)
+        job_titles.update(last_updated=timezone.now())
+        refresh_job_titles(job_titles)
+
+
+@receiver(post_delete, sender=JobTitleSignature)
+def reroot_deleted_cluster(sender, instance, **kwargs):
+    # cascaded from the job title, the other deleted rows already gone
+    reroot_cluster(instance)
+
+
+@receiver(post_delete, sender=Application)
+def count_removed_application(sender, instance, **kwargs):
+    applicant_removed(instance.job_title_id)
+
+
+@receiver(pre_save, sender=JobTitle)
+@receiver(pre_delete, sender=JobTitle)
+def count_job_title(sender, instance, raw=False, **kwargs):
+    if not raw and instance.pk is not None:
+        instance._rollup_counts = rollups.job_title_counts(
+            JobTitle.objects.filter(pk=instance.pk)
+        )
+
+
+@receiver(post_save, sender=JobTitle)
+def roll_up_job_title(sender, instance, raw=False, **kwargs):
+    if not raw:
+        before = instance.__dict__.pop("_rollup_counts", {})
+        after = rollups.job_title_counts(
+            JobTitle.objects.filter(pk=instance.pk)
+        )
+        rollups.apply_changes(
+            job_titles=rollups.difference(after, before)
+        )
+
+
+@receiver(post_delete, sender=JobTitle)
+def roll_up_deleted_job_title(sender, instance, **kwargs):
+    before = instance.__dict__.pop("_rollup_counts", {})
+    rollups.apply_changes(job_titles=rollups.difference({}, before))
+
+
+@receiver(pre_save, sender=JobDescription)
+def count_job_description(sender, instance, raw=False, **kwargs):
+    # a new publication date also moves the job title to another day
+    if not raw and instance.pk is not None:
+        instance._rollup_counts = (
+            rollups.job_title_counts(
+                JobTitle.objects.filter(job_description_id=instance.pk)
+            ),
+            rollups.job_description_counts(
+                JobDescription.objects.filter(pk=instance.pk)
+            ),
+        )
+
+
+@receiver(post_save, sender=JobDescription)
+def roll_up_job_description(sender, instance, created=False, raw=False,
+                            **kwargs):
+    if raw:
+        return
+    titles, descriptions = instance.__dict__.pop(
+        "_rollup_counts", ({}, {})
+    )
+    if created and not descriptions:
+        # nothing else to count, the new row is in memory
+        rollups.apply_changes(job_descriptions={
+            (instance.user_id, rollups.posting_day(instance.pub_date)): 1
+        })
+        return
+    rollups.apply_changes(
+        job_titles=rollups.difference(
+            rollups.job_title_counts(
+                JobTitle.objects.filter(job_description_id=instance.pk)
+            ),
+            titles,
+        ),
+        job_descriptions=rollups.difference(
+            rollups.job_description_counts(
+                JobDescription.objects.filter(pk=instance.pk)
+            ),
+            descriptions,
+        ),
+    )
+
+
+@receiver(post_delete, sender=JobDescription)
+def roll_up_deleted_job_description(sender, instance, **kwargs):
+    # its job title was deleted first and counted by its own handler
+    rollups.apply_changes(job_descriptions={
+        (instance.user_id, rollups.posting_day(instance.pub_date)): -1
+    })
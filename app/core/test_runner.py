@@ -0,0 +1,26 @@
+"""
+Test runner of the project, `TEST_RUNNER`
+
+Throttle buckets are kept in the memory of the test process rather than in
+the host wide file of `THROTTLE_STORE = "shared"`, which other test runs
+and servers of the host use too, and every test starts with full buckets.
+"""
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import iter_test_cases
+
+from core.throttling import clear_buckets
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        # as Django swaps in the locmem email backend
+        settings.THROTTLE_STORE = "memory"
+
+    def build_suite(self, *args, **kwargs):
+        suite = super().build_suite(*args, **kwargs)
+        for test in iter_test_cases(suite):
+            test.addCleanup(clear_buckets)
+        return suite
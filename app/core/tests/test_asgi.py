@@ -0,0 +1,39 @@
+"""Test the ASGI handler streaming responses from a thread"""
+
+import threading
+
+from django.http import StreamingHttpResponse
+from django.test import SimpleTestCase
+
+from core.asgi import ASGIHandler
+
+
+class SendResponseTests(SimpleTestCase):
+    """Test streaming responses are read while they are sent"""
+
+    async def test_chunks_read_one_at_a_time(self):
+        read = []
+        loop_thread = threading.get_ident()
+
+        def chunks():
+            for number in range(3):
+                # off the event loop, where queries may run
+                self.assertNotEqual(threading.get_ident(), loop_thread)
+                read.append(number)
+                yield f"chunk {number}\n".encode()
+
+        sent = []
+
+        async def send(message):
+            # the body is not read ahead of what was sent
+            sent.append((message, len(read)))
+
+        response = StreamingHttpResponse(chunks())
+        await ASGIHandler().send_response(response, send)
+
+        self.assertEqual(sent[0][0]["type"], "http.response.start")
+        self.assertEqual(
+            [(message.get("body"), count) for message, count in sent[1:]],
+            [(b"chunk 0\n", 1), (b"chunk 1\n", 2), (b"chunk 2\n", 3),
+             (None, 3)],
+        )
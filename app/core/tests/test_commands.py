@@ -2,10 +2,11 @@
 Test custom django management commands
 """
 
+from io import StringIO
 from unittest.mock import patch
 from MySQLdb import Error
 
-from django.core.management import call_command
+from django.core.management import CommandError, call_command
 from django.db.utils import OperationalError
 from django.test import SimpleTestCase
 
@@ -29,3 +30,38 @@ class CommandTests(SimpleTestCase):
         call_command("wait_for_db")
         self.assertEqual(patched_check.call_count, 6)
         patched_check.assert_called_with(databases=["default"])
+
+    @patch("time.sleep")
+    def test_wait_for_db_backoff(self, patched_sleep, patched_check):
+        """Test delays double up to the maximum"""
+
+        patched_check.side_effect = [OperationalError] * 5 + [True]
+        call_command(
+            "wait_for_db", initial_delay=0.5, max_delay=3, stdout=StringIO()
+        )
+        self.assertEqual(
+            [call.args[0] for call in patched_sleep.call_args_list],
+            [0.5, 1, 2, 3, 3],
+        )
+
+    @patch("time.monotonic")
+    @patch("time.sleep")
+    def test_wait_for_db_timeout(
+        self, patched_sleep, patched_monotonic, patched_check
+    ):
+        """Test giving up once the timeout is spent"""
+
+        clock = [0]
+        patched_monotonic.side_effect = lambda: clock[0]
+        patched_sleep.side_effect = lambda seconds: clock.__setitem__(
+            0, clock[0] + seconds
+        )
+        patched_check.side_effect = OperationalError
+
+        with self.assertRaises(CommandError):
+            call_command(
+                "wait_for_db", timeout=10, initial_delay=1, max_delay=4,
+                stdout=StringIO(),
+            )
+        # 1 + 2 + 4 + 3 (what was left)
+        self.assertEqual(clock[0], 10)
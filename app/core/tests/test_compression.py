@@ -0,0 +1,137 @@
+"""Test the negotiated response compression"""
+
+import gzip
+import zlib
+
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.compression import CompressionMiddleware, negotiate
+from core.models import JobDescription, JobTitle, Portal
+
+EXPORT_URL = reverse("jobtitle:jobtitle-export")
+BODY = b'{"id":1,"title":"Python Developer"},' * 100
+
+
+class NegotiateTests(SimpleTestCase):
+    """Test choosing a coding from `Accept-Encoding`"""
+
+    def test_negotiate(self):
+        available = ("zstd", "br", "gzip")
+        for header, expected in [
+            ("gzip, deflate, br", "br"),
+            ("gzip, deflate, br, zstd", "zstd"),
+            ("br;q=0.5, gzip", "gzip"),
+            ("GZIP ; q=0.8", "gzip"),
+            ("*", "zstd"),
+            ("*;q=0, gzip", "gzip"),
+            ("br;q=0, *", "zstd"),
+            ("identity", None),
+            ("gzip;q=0", None),
+            ("", None),
+            ("gzip;q=high", None),
+        ]:
+            with self.subTest(header=header):
+                self.assertEqual(negotiate(header, available), expected)
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    """Test which responses are compressed, and how"""
+
+    def process(self, response, accept_encoding="gzip"):
+        request = RequestFactory().get(
+            "/", HTTP_ACCEPT_ENCODING=accept_encoding
+        )
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_compressed(self):
+        response = HttpResponse(BODY, content_type="application/json")
+        response["ETag"] = '"abc"'
+
+        response = self.process(response)
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), BODY)
+        self.assertEqual(
+            int(response["Content-Length"]), len(response.content)
+        )
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(response["ETag"], 'W/"abc"')
+
+    def test_not_accepted(self):
+        response = self.process(
+            HttpResponse(BODY, content_type="application/json"), "identity"
+        )
+
+        self.assertEqual(response.content, BODY)
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+
+    def test_left_as_is(self):
+        for body, content_type, headers in [
+            (BODY[:1000], "application/json", {}),
+            (BODY, "text/html; charset=utf-8", {}),
+            (BODY, "application/gzip", {}),
+            (BODY, "application/json", {"Content-Encoding": "br"}),
+            (BODY, "application/json", {"Cache-Control": "no-transform"}),
+        ]:
+            with self.subTest(content_type=content_type, headers=headers):
+                response = HttpResponse(
+                    body, content_type=content_type, headers=headers
+                )
+
+                response = self.process(response)
+
+                self.assertEqual(response.content, body)
+                self.assertNotEqual(response.get("Content-Encoding"), "gzip")
+
+    def test_streaming_flushes_every_chunk(self):
+        response = StreamingHttpResponse(
+            iter([BODY, BODY]), content_type="application/x-ndjson"
+        )
+
+        response = self.process(response)
+        chunks = iter(response.streaming_content)
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+
+        # the first chunk decodes on its own
+        self.assertEqual(decompressor.decompress(next(chunks)), BODY)
+        self.assertEqual(
+            decompressor.decompress(b"".join(chunks)) + decompressor.flush(),
+            BODY,
+        )
+        self.assertFalse(response.has_header("Content-Length"))
+
+
+class CompressedApiTests(TestCase):
+    """Test compressed API responses end to end"""
+
+    def test_export(self):
+        user = get_user_model().objects.create_user(
+            "test@example.com", "password@321"
+        )
+        portal = Portal.objects.create(
+            user=user, name="naukri.com", description="job portal"
+        )
+        for number in range(50):
+            JobTitle.objects.create(
+                user=user,
+                title=f"Python Developer {number}",
+                portal=portal,
+                job_description=JobDescription.objects.create(
+                    user=user, role="role", description_text="git"
+                ),
+            )
+        client = APIClient()
+        client.force_authenticate(user)
+
+        plain = client.get(EXPORT_URL)
+        compressed = client.get(EXPORT_URL, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(compressed["Content-Encoding"], "gzip")
+        self.assertEqual(
+            gzip.decompress(b"".join(compressed.streaming_content)),
+            b"".join(plain.streaming_content),
+        )
@@ -0,0 +1,88 @@
+"""Test the orjson renderer and parser"""
+
+import io
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from core import fast_json
+
+DATA = ReturnDict({
+    "id": 1,
+    "title": "Développeur\u2028Python",
+    "rate": Decimal("1.50"),
+    "lazy": gettext_lazy("This field is required."),
+    "counts": {1: 2},
+    "tags": ["git", None, True, 1.5],
+    "last_updated": datetime(2023, 1, 2, 3, 4, 5, 678901, timezone.utc),
+    "pub_date": date(2023, 1, 2),
+    "at": time(3, 4, 5, 678901),
+}, serializer=None)
+
+
+class RendererTests(SimpleTestCase):
+    """Test `FastJSONRenderer` renders as DRF's `JSONRenderer`"""
+
+    def render(self, renderer, data, **context):
+        return renderer.render(
+            data, "application/json", {"indent": None, **context}
+        )
+
+    def test_same_output(self):
+        fast = self.render(fast_json.FastJSONRenderer(), DATA)
+
+        self.assertEqual(fast, self.render(JSONRenderer(), DATA))
+        self.assertIn(b"\\u2028", fast)
+
+    def test_fallbacks(self):
+        renderer = fast_json.FastJSONRenderer()
+        for data, context in [
+            (DATA, {"indent": 4}),
+            ({"id": 2 ** 64}, {}),
+        ]:
+            with self.subTest(data=data, context=context):
+                self.assertEqual(
+                    self.render(renderer, data, **context),
+                    self.render(JSONRenderer(), data, **context),
+                )
+        with mock.patch.object(fast_json, "orjson", None):
+            self.assertEqual(
+                self.render(renderer, DATA), self.render(JSONRenderer(), DATA)
+            )
+
+    def test_none(self):
+        self.assertEqual(fast_json.FastJSONRenderer().render(None), b"")
+
+
+class ParserTests(SimpleTestCase):
+    """Test `FastJSONParser` parses as DRF's `JSONParser`"""
+
+    def parse(self, parser, content, encoding="utf-8"):
+        return parser.parse(
+            io.BytesIO(content), "application/json", {"encoding": encoding}
+        )
+
+    def test_same_result(self):
+        for content, encoding in [
+            ('[{"title": "Développeur", "portal": 1}]'.encode(), "utf-8"),
+            (b'{"id": 18446744073709551616}', "utf-8"),
+            ('{"title": "D\xe9veloppeur"}'.encode("latin-1"), "latin-1"),
+        ]:
+            with self.subTest(content=content):
+                self.assertEqual(
+                    self.parse(fast_json.FastJSONParser(), content, encoding),
+                    self.parse(JSONParser(), content, encoding),
+                )
+
+    def test_invalid(self):
+        for content in (b'{"title": ', b'{"rate": NaN}'):
+            with self.subTest(content=content):
+                with self.assertRaises(ParseError):
+                    self.parse(fast_json.FastJSONParser(), content)
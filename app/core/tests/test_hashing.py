@@ -0,0 +1,155 @@
+"""Test password hashing in the worker pool"""
+
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model, hashers
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.test import APIClient
+
+from core.hashing import HashingOverloaded, HashingService
+
+
+TOKEN_URL = reverse("user:token")
+
+
+class HashingServiceTests(SimpleTestCase):
+    """Test the service against Django's own hashers"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.service = HashingService(workers=2, max_pending=4)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.service.shutdown()
+        super().tearDownClass()
+
+    def test_round_trip(self):
+        encoded = self.service.make_password("password@321")
+
+        self.assertTrue(hashers.check_password("password@321", encoded))
+        self.assertTrue(self.service.check_password("password@321", encoded))
+        self.assertFalse(self.service.check_password("wrong", encoded))
+
+    def test_unusable_passwords_not_hashed(self):
+        encoded = self.service.make_password(None)
+
+        self.assertFalse(hashers.is_password_usable(encoded))
+        with patch.object(self.service, "_run") as run:
+            self.assertFalse(self.service.check_password("x", encoded))
+            self.assertFalse(self.service.check_password(None, "pbkdf2$x"))
+        run.assert_not_called()
+
+    def test_outdated_hash_upgraded(self):
+        encoded = hashers.make_password("password@321", hasher="pbkdf2_sha1")
+        upgraded = []
+
+        valid = self.service.check_password(
+            "password@321", encoded, upgraded.append
+        )
+
+        self.assertTrue(valid)
+        self.assertEqual(upgraded, ["password@321"])
+
+    def test_make_passwords_in_order(self):
+        passwords = [f"password-{number}" for number in range(5)]
+
+        encoded = self.service.make_passwords(passwords, chunksize=2)
+
+        self.assertEqual(len(encoded), 5)
+        for password, value in zip(passwords, encoded):
+            self.assertTrue(hashers.check_password(password, value))
+
+    def test_overload_fails_fast(self):
+        service = HashingService(workers=1, max_pending=1)
+        # the only slot is taken by another request
+        service._slots.acquire()
+
+        with self.assertRaises(HashingOverloaded) as raised:
+            service.make_password("password@321")
+        # the model layer knows nothing of the API
+        self.assertNotIsInstance(raised.exception, APIException)
+
+    def test_inline(self):
+        service = HashingService(workers=0)
+
+        encoded = service.make_password("password@321")
+
+        self.assertTrue(service.check_password("password@321", encoded))
+        self.assertIsNone(service._pool)
+
+
+class HashingApiTests(TestCase):
+    """Test logins through the pool and overload responses"""
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@example.com",
+            "password@321"
+        )
+
+    def test_login(self):
+        res = self.client.post(
+            TOKEN_URL,
+            {"email": "test@example.com", "password": "password@321"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("token", res.data)
+
+    def test_overloaded_login(self):
+        busy = HashingService(workers=1, max_pending=1)
+        busy._slots.acquire()
+
+        with patch("core.models.hashing_service", busy):
+            res = self.client.post(
+                TOKEN_URL,
+                {"email": "test@example.com", "password": "password@321"},
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res["Retry-After"], "1")
+
+
+class ProvisionUsersTests(TestCase):
+    """Test creating users in bulk from a CSV file"""
+
+    def test_provision(self):
+        get_user_model().objects.create_user(
+            "existing@example.com",
+            "password@321"
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "users.csv"
+            path.write_text(
+                "email,name,password\n"
+                "one@example.com,One,secret-1\n"
+                "two@EXAMPLE.com,Two,secret-2\n"
+                "existing@example.com,Old,secret-3\n"
+                "nopassword@example.com,None,\n"
+            )
+            out = StringIO()
+            call_command(
+                "provision_users", str(path), "--workers", "2",
+                "--batch-size", "2", stdout=out,
+            )
+
+        self.assertIn("Created 2 users", out.getvalue())
+        self.assertIn("skipped 2", out.getvalue())
+        user = get_user_model().objects.get(email="two@example.com")
+        self.assertEqual(user.name, "Two")
+        self.assertTrue(user.check_password("secret-2"))
+        self.assertFalse(
+            get_user_model().objects.filter(
+                email="nopassword@example.com"
+            ).exists()
+        )
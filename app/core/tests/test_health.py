@@ -0,0 +1,77 @@
+"""Test the liveness and readiness probes"""
+
+from unittest.mock import patch
+
+from django.db import OperationalError, connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.health import DatabasePing, database_ping
+
+LIVENESS_URL = reverse("liveness")
+READINESS_URL = reverse("readiness")
+
+
+@override_settings(HEALTH_CHECK_INTERVAL=2)
+class HealthApiTests(TestCase):
+    """Test the probe endpoints"""
+
+    def setUp(self) -> None:
+        database_ping.reset()
+        self.addCleanup(database_ping.reset)
+
+    def test_liveness_does_not_query(self):
+        with self.assertNumQueries(0):
+            res = self.client.get(LIVENESS_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json(), {"status": "ok"})
+        self.assertIn("no-cache", res["Cache-Control"])
+
+    def test_readiness_pings_once_per_interval(self):
+        with self.assertNumQueries(1):
+            res = self.client.get(READINESS_URL)
+        with self.assertNumQueries(0):
+            self.client.get(READINESS_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json(), {"status": "ok"})
+
+    def test_database_unavailable(self):
+        with patch.object(
+            connection, "cursor", side_effect=OperationalError("gone away")
+        ), self.assertLogs("core.health", "ERROR"):
+            res = self.client.get(READINESS_URL)
+
+        self.assertEqual(res.status_code, 503)
+        self.assertEqual(res.json()["status"], "unavailable")
+
+
+@override_settings(HEALTH_CHECK_INTERVAL=2)
+class DatabasePingTests(TestCase):
+    """Test caching of the ping result"""
+
+    def test_pings_again_after_the_interval(self):
+        now = [100.0]
+        ping = DatabasePing(clock=lambda: now[0])
+
+        with patch.object(ping, "ping", side_effect=[True, False]) as pinged:
+            self.assertTrue(ping.is_ok())
+            now[0] += 1.9
+            self.assertTrue(ping.is_ok())
+            now[0] += 0.1
+            self.assertFalse(ping.is_ok())
+
+        self.assertEqual(pinged.call_count, 2)
+
+    def test_others_get_the_last_result_while_pinging(self):
+        now = [100.0]
+        ping = DatabasePing(clock=lambda: now[0])
+        with patch.object(ping, "ping", return_value=True):
+            ping.is_ok()
+        now[0] += 5
+
+        with ping._lock, patch.object(ping, "ping") as pinged:
+            self.assertTrue(ping.is_ok())
+
+        pinged.assert_not_called()
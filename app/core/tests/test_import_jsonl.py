@@ -0,0 +1,150 @@
+"""Test the resumable JSONL import command"""
+
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from core.ingestion.engine import BatchWriter
+from core.models import ImportCheckpoint, JobTitle, Portal
+
+
+def record(number, portal="naukri.com"):
+    return {
+        "portal": portal,
+        "portal_description": f"{portal} job board",
+        "title": f"Python Developer {number}",
+        "role": "Build backend services",
+        "description_text": "should know git, CICD and linux",
+        "pub_date": "2023-02-01T10:00:00Z",
+    }
+
+
+class ImportJsonlTests(TestCase):
+    """Test importing listings from a JSONL file"""
+
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            "test@example.com",
+            "password@321"
+        )
+        self.portal = Portal.objects.create(
+            user=self.user, name="naukri.com", description="job portal"
+        )
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "listings.jsonl"
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def write(self, lines):
+        self.path.write_text("\n".join(
+            line if isinstance(line, str) else json.dumps(line)
+            for line in lines
+        ) + "\n")
+
+    def run_import(self, *args):
+        out = StringIO()
+        err = StringIO()
+        call_command(
+            "import_jsonl", str(self.path), "--workers", "2",
+            "--batch-size", "3", *args, stdout=out, stderr=err,
+        )
+        return out.getvalue(), err.getvalue()
+
+    def test_import(self):
+        self.write([record(number) for number in range(10)])
+
+        out, _ = self.run_import()
+
+        self.assertEqual(JobTitle.objects.count(), 10)
+        job_title = JobTitle.objects.get(title="Python Developer 7")
+        self.assertEqual(job_title.portal, self.portal)
+        self.assertEqual(job_title.user, self.user)
+        self.assertEqual(
+            job_title.job_description.role, "Build backend services"
+        )
+        self.assertIn("Imported 10 rows", out)
+        for stage in ("read", "parse (cpu)", "resolve", "write"):
+            self.assertIn(stage, out)
+
+    def test_invalid_lines_rejected(self):
+        self.write([
+            record(1),
+            "{not json",
+            {"title": "no portal"},
+            record(2) | {"pub_date": "yesterday"},
+            record(3),
+        ])
+
+        out, err = self.run_import()
+
+        self.assertEqual(JobTitle.objects.count(), 2)
+        self.assertIn("rejected 3", out)
+        self.assertIn("byte", err)
+
+    def test_unknown_portal(self):
+        self.write([record(1, portal="indeed.com"), record(2)])
+
+        _, err = self.run_import()
+
+        self.assertIn("unknown portal 'indeed.com'", err)
+        self.assertEqual(JobTitle.objects.count(), 1)
+
+    def test_unknown_portal_created_for_user(self):
+        self.write([record(1, portal="indeed.com")])
+
+        self.run_import("--user", "test@example.com")
+
+        portal = Portal.objects.get(name="indeed.com")
+        self.assertEqual(portal.user, self.user)
+        self.assertEqual(portal.description, "indeed.com job board")
+        self.assertEqual(JobTitle.objects.get().portal, portal)
+
+    def test_resume_after_interruption(self):
+        """Test a failed batch is retried, committed ones are not repeated"""
+
+        self.write([record(number) for number in range(10)])
+        write_rows = BatchWriter.write_rows
+        calls = []
+
+        def fail_third_batch(writer, rows):
+            calls.append(len(rows))
+            if len(calls) == 3:
+                raise RuntimeError("connection lost")
+            return write_rows(writer, rows)
+
+        with patch.object(BatchWriter, "write_rows", fail_third_batch):
+            with self.assertRaises(RuntimeError):
+                self.run_import()
+        self.assertEqual(JobTitle.objects.count(), 6)
+
+        out, _ = self.run_import()
+
+        self.assertIn("Resuming at byte", out)
+        self.assertIn("Imported 4 rows", out)
+        self.assertEqual(
+            sorted(JobTitle.objects.values_list("title", flat=True)),
+            sorted(f"Python Developer {number}" for number in range(10)),
+        )
+        checkpoint = ImportCheckpoint.objects.get()
+        self.assertEqual(checkpoint.offset, self.path.stat().st_size)
+        self.assertEqual(checkpoint.rows, 10)
+
+    def test_restart(self):
+        self.write([record(1)])
+        self.run_import()
+
+        self.run_import("--restart")
+
+        self.assertEqual(JobTitle.objects.count(), 2)
+
+    def test_missing_file(self):
+        with self.assertRaises(CommandError):
+            call_command("import_jsonl", str(self.path))
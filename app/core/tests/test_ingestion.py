@@ -0,0 +1,248 @@
+"""
+Test the portal ingestion engine against fixture files and a local
+stand-in HTTP server
+"""
+
+import json
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch, PropertyMock
+from urllib.parse import parse_qs, urlsplit
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+
+from core.ingestion.adapters import JSONFeedAdapter
+from core.ingestion.engine import BatchWriter, IngestionEngine
+from core.models import JobDescription, JobTitle, Portal
+
+
+def listing(number):
+    return {
+        "title": f"Python Developer {number}",
+        "role": "Build backend services",
+        "description_text": "should know git, CICD and linux",
+        "pub_date": "2023-02-01T10:00:00Z",
+    }
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    """Serves `pages` pages of `per_page` listings, then an empty page"""
+
+    protocol_version = "HTTP/1.1"
+    pages = 3
+    per_page = 5
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path != "/jobs":
+            body = b"not found"
+            self.send_response(404)
+        else:
+            page = int(parse_qs(parts.query)["page"][0])
+            listings = []
+            if page <= self.pages:
+                first = (page - 1) * self.per_page
+                listings = [
+                    listing(n) for n in range(first, first + self.per_page)
+                ]
+            body = json.dumps({"results": listings}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class IngestionTests(TestCase):
+    """Test ingesting listings into JobDescription / JobTitle"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FeedHandler)
+        cls.server.connections = 0
+        cls.server.daemon_threads = True
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.thread.join()
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        self.server.connections = 0
+        self.user = get_user_model().objects.create_user(
+            "test@example.com",
+            "password@321"
+        )
+        self.portal = Portal.objects.create(
+            user=self.user,
+            name="naukri.com",
+            description="famous job hunting website"
+        )
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def write_fixture(self, name, listings):
+        path = Path(self.tmp.name) / name
+        if path.suffix == ".jsonl":
+            path.write_text("\n".join(json.dumps(item) for item in listings))
+        else:
+            path.write_text(json.dumps(listings))
+        return path
+
+    def test_ingest_fixture_file(self):
+        """Test a JSONL fixture is written as descriptions and titles"""
+
+        path = self.write_fixture("feed.jsonl", [listing(1), listing(2)])
+        out = StringIO()
+
+        call_command(
+            "ingest_portals", "--source", f"naukri.com={path}", stdout=out
+        )
+
+        self.assertEqual(JobTitle.objects.count(), 2)
+        job_title = JobTitle.objects.get(title="Python Developer 1")
+        self.assertEqual(job_title.portal, self.portal)
+        self.assertEqual(job_title.user, self.user)
+        self.assertEqual(
+            job_title.job_description.role, "Build backend services"
+        )
+        self.assertIn("Ingested 2 listings", out.getvalue())
+
+    def test_ingest_http_feed_reuses_connections(self):
+        """Test every page is fetched over at most `concurrency` sockets"""
+
+        adapter = JSONFeedAdapter(
+            "naukri.com", f"{self.base_url}/jobs", concurrency=2
+        )
+        engine = IngestionEngine([adapter], batch_size=4, queue_size=3)
+
+        stats = async_to_sync(engine.run)()
+
+        self.assertEqual(JobTitle.objects.count(), 15)
+        self.assertEqual(JobDescription.objects.count(), 15)
+        self.assertEqual(stats.portals["naukri.com"].written, 15)
+        self.assertEqual(stats.batches, 4)
+        pool = next(iter(engine.client.pools.values()))
+        self.assertLessEqual(pool.connections_opened, 2)
+        self.assertLessEqual(self.server.connections, 2)
+
+    def test_ingest_without_returned_ids(self):
+        """Test the MySQL path pairs titles with their own descriptions"""
+
+        listings = [dict(listing(n), role=f"role {n % 2}") for n in range(6)]
+        path = self.write_fixture("feed.jsonl", listings)
+        adapter = JSONFeedAdapter("naukri.com", path)
+
+        with patch.object(
+            type(connection.features), "can_return_rows_from_bulk_insert",
+            new_callable=PropertyMock, return_value=False,
+        ):
+            async_to_sync(IngestionEngine([adapter]).run)()
+
+        for job_title in JobTitle.objects.select_related("job_description"):
+            number = int(job_title.title.rsplit(" ", 1)[1])
+            self.assertEqual(
+                job_title.job_description.role, f"role {number % 2}"
+            )
+        self.assertEqual(JobTitle.objects.count(), 6)
+
+    def test_ingest_without_returned_ids_interleaved(self):
+        """Test another writer's rows in the id range are not paired"""
+
+        other = JobDescription.objects.create(
+            user=self.user, role="other writer", description_text="text"
+        )
+        listings = [dict(listing(n), role=f"role {n}") for n in range(4)]
+        adapter = JSONFeedAdapter(
+            "naukri.com", self.write_fixture("feed.jsonl", listings)
+        )
+        first_inserted_id = BatchWriter._first_inserted_id
+
+        def one_off(count):
+            # as if `other` had been inserted in the middle of the batch
+            return first_inserted_id(count) - 1
+
+        with patch.object(
+            type(connection.features), "can_return_rows_from_bulk_insert",
+            new_callable=PropertyMock, return_value=False,
+        ), patch.object(BatchWriter, "_first_inserted_id", one_off):
+            async_to_sync(IngestionEngine([adapter]).run)()
+
+        self.assertEqual(JobTitle.objects.count(), 4)
+        for job_title in JobTitle.objects.select_related("job_description"):
+            number = job_title.title.rsplit(" ", 1)[1]
+            self.assertEqual(job_title.job_description.role, f"role {number}")
+        self.assertFalse(JobTitle.objects.filter(job_description=other))
+        # the bulk insert was rolled back
+        self.assertEqual(JobDescription.objects.count(), 5)
+
+    def test_invalid_listings_rejected(self):
+        """Test listings without title or with a bad date are skipped"""
+
+        bad_date = dict(listing(3), pub_date="yesterday")
+        path = self.write_fixture(
+            "feed.jsonl", [listing(1), {"role": "no title"}, bad_date]
+        )
+        adapter = JSONFeedAdapter("naukri.com", path)
+
+        stats = async_to_sync(IngestionEngine([adapter]).run)()
+
+        self.assertEqual(stats.portals["naukri.com"].written, 1)
+        self.assertEqual(stats.portals["naukri.com"].rejected, 2)
+        self.assertEqual(JobTitle.objects.count(), 1)
+
+    def test_failing_portal_does_not_stop_others(self):
+        """Test an HTTP error is reported and other portals still ingest"""
+
+        Portal.objects.create(
+            user=self.user, name="broken.com", description="broken portal"
+        )
+        path = self.write_fixture("feed.json", [listing(1)])
+        out = StringIO()
+
+        with self.assertLogs("core.ingestion.engine", "ERROR"):
+            call_command(
+                "ingest_portals",
+                "--source", f"naukri.com={path}",
+                "--source", f"broken.com={self.base_url}/missing",
+                stdout=out,
+            )
+
+        self.assertEqual(JobTitle.objects.count(), 1)
+        self.assertIn("broken.com: fetched=0", out.getvalue())
+        self.assertIn("returned 404", out.getvalue())
+
+    def test_unknown_portal(self):
+        """Test ingesting into a portal that does not exist fails"""
+
+        path = self.write_fixture("feed.jsonl", [listing(1)])
+
+        with self.assertRaises(CommandError):
+            call_command(
+                "ingest_portals", "--source", f"unknown.com={path}",
+                stdout=StringIO(),
+            )
+        self.assertEqual(JobTitle.objects.count(), 0)
@@ -0,0 +1,195 @@
+"""Test the request metrics and the `/metrics` endpoint"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core import metrics
+from core.models import JobDescription, JobTitle, Portal
+
+JOB_TITLE_URL = reverse("jobtitle:jobtitle-list")
+EXPORT_URL = reverse("jobtitle:jobtitle-export")
+METRICS_URL = reverse("metrics")
+
+LIST_VIEW = (("view", "jobtitle:jobtitle-list"),)
+
+
+class RenderTests(SimpleTestCase):
+    """Test the Prometheus text format"""
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = metrics.Registry()
+        for seconds in (0.003, 0.005, 0.2, 30):
+            registry._observe(
+                "http_request_duration_seconds", LIST_VIEW, seconds
+            )
+
+        text = metrics.render(metrics.merge([registry.snapshot()]))
+
+        self.assertIn(
+            "# TYPE http_request_duration_seconds histogram", text
+        )
+        name = "http_request_duration_seconds"
+        view = 'view="jobtitle:jobtitle-list"'
+        self.assertIn(f'{name}_bucket{{{view},le="0.005"}} 2\n', text)
+        self.assertIn(f'{name}_bucket{{{view},le="0.25"}} 3\n', text)
+        self.assertIn(f'{name}_bucket{{{view},le="+Inf"}} 4\n', text)
+        self.assertIn(f"{name}_count{{{view}}} 4\n", text)
+        self.assertIn(f"{name}_sum{{{view}}} 30.208\n", text)
+
+    def test_label_values_escaped(self):
+        self.assertEqual(
+            metrics._labels((("view", 'a"b\\c'),)), '{view="a\\"b\\\\c"}'
+        )
+
+    def test_merge_sums_processes(self):
+        one, other = metrics.Registry(), metrics.Registry()
+        one._add("db_queries_total", LIST_VIEW, 3)
+        other._add("db_queries_total", LIST_VIEW, 4)
+        one._observe("http_response_size_bytes", LIST_VIEW, 100)
+        other._observe("http_response_size_bytes", LIST_VIEW, 5000)
+
+        samples = metrics.merge([one.snapshot(), other.snapshot()])
+
+        self.assertEqual(samples[("db_queries_total", LIST_VIEW)], 7)
+        self.assertEqual(
+            samples[("http_response_size_bytes", LIST_VIEW)],
+            [1, 0, 0, 1, 0, 0, 0, 0, 0, 5100],
+        )
+
+
+class MetricsMiddlewareTests(TestCase):
+    """Test requests are recorded per view"""
+
+    def setUp(self) -> None:
+        metrics.registry.clear()
+        self.addCleanup(metrics.registry.clear)
+        self.user = get_user_model().objects.create_user(
+            "test@example.com",
+            "password@321"
+        )
+        portal = Portal.objects.create(
+            user=self.user, name="naukri.com", description="job portal"
+        )
+        for number in range(3):
+            description = JobDescription.objects.create(
+                user=self.user, role="role", description_text="git, Linux"
+            )
+            JobTitle.objects.create(
+                user=self.user, title=f"title {number}", portal=portal,
+                job_description=description,
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def samples(self):
+        return metrics.collect()
+
+    def test_list_recorded(self):
+        res = self.client.get(JOB_TITLE_URL)
+        samples = self.samples()
+
+        latency = samples[(
+            "http_request_duration_seconds",
+            (*LIST_VIEW, ("method", "GET"), ("status", "200")),
+        )]
+        self.assertEqual(sum(latency[:-1]), 1)
+        self.assertGreater(latency[-1], 0)
+        size = samples[("http_response_size_bytes", LIST_VIEW)]
+        self.assertEqual(size[-1], len(res.content))
+        self.assertGreater(samples[("db_queries_total", LIST_VIEW)], 0)
+        self.assertGreater(
+            samples[("db_query_duration_seconds_total", LIST_VIEW)], 0
+        )
+        self.assertGreater(
+            samples[("serializer_duration_seconds_total", LIST_VIEW)], 0
+        )
+
+    def test_serializer_time_of_detail(self):
+        job_title = JobTitle.objects.first()
+        self.client.get(
+            reverse("jobtitle:jobtitle-detail", args=[job_title.id])
+        )
+
+        self.assertGreater(self.samples()[(
+            "serializer_duration_seconds_total",
+            (("view", "jobtitle:jobtitle-detail"),),
+        )], 0)
+
+    def test_unmatched_urls_share_one_label(self):
+        self.client.get("/no/such/page/")
+        self.client.get("/nor/this/one/")
+
+        self.assertEqual(
+            self.samples()[(
+                "db_queries_total", (("view", "<unmatched>"),)
+            )],
+            0,
+        )
+
+    def test_streamed_response_recorded_once_sent(self):
+        res = self.client.get(EXPORT_URL)
+        view = (("view", "jobtitle:jobtitle-export"),)
+
+        self.assertNotIn(("db_queries_total", view), self.samples())
+        content = b"".join(res.streaming_content)
+
+        samples = self.samples()
+        self.assertGreater(samples[("db_queries_total", view)], 0)
+        self.assertEqual(
+            samples[("http_response_size_bytes", view)][-1], len(content)
+        )
+
+    def test_metrics_endpoint(self):
+        self.client.get(JOB_TITLE_URL)
+
+        res = APIClient().get(METRICS_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res["Content-Type"], metrics.CONTENT_TYPE)
+        text = res.content.decode()
+        self.assertIn(
+            'http_request_duration_seconds_count{view="jobtitle:jobtitle-'
+            'list",method="GET",status="200"} 1\n',
+            text,
+        )
+        self.assertIn("# TYPE db_queries_total counter", text)
+
+    def test_processes_share_a_directory(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        directory = tmp.name
+        # another worker's registry
+        other = metrics.Registry()
+        other._add("db_queries_total", LIST_VIEW, 1000)
+        Path(directory, "1.json").write_text(json.dumps(other.snapshot()))
+
+        with override_settings(METRICS_DIR=directory):
+            self.client.get(JOB_TITLE_URL)
+            queries = self.samples()[("db_queries_total", LIST_VIEW)]
+            written = Path(directory, f"{os.getpid()}.json")
+
+        self.assertGreater(queries, 1000)
+        self.assertTrue(written.exists())
+        self.assertEqual(
+            metrics.merge([json.loads(written.read_text())])[
+                ("db_queries_total", LIST_VIEW)
+            ],
+            queries - 1000,
+        )
+
+
+class MetricsDisabledTests(SimpleTestCase):
+    """Test metrics can be turned off"""
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_middleware_not_used(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            metrics.MetricsMiddleware(lambda request: None)
@@ -0,0 +1,103 @@
+"""Test data migrations"""
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+
+class MoveApplicantsMigrationTests(TransactionTestCase):
+    """Test `Applicant` rows are moved to `Application`"""
+
+    before = [("core", "0006_importcheckpoint")]
+    after = [("core", "0007_application")]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self) -> None:
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_applicants_moved_and_counted(self):
+        apps = self.migrate(self.before)
+        User = apps.get_model("core", "User")
+        Portal = apps.get_model("core", "Portal")
+        JobDescription = apps.get_model("core", "JobDescription")
+        JobTitle = apps.get_model("core", "JobTitle")
+        Applicant = apps.get_model("core", "Applicant")
+
+        owner = User.objects.create(email="owner@example.com", password="x")
+        portal = Portal.objects.create(
+            user=owner, name="naukri.com", description="job portal"
+        )
+        job_titles = []
+        for number in range(2):
+            description = JobDescription.objects.create(
+                user=owner, role="role", description_text="text"
+            )
+            job_titles.append(JobTitle.objects.create(
+                user=owner, title=f"title {number}", portal=portal,
+                job_description=description,
+            ))
+        for number, job_title in enumerate([job_titles[0]] * 2
+                                           + [job_titles[1]]):
+            Applicant.objects.create(
+                email=f"applicant{number}@example.com", password="x",
+                applied_for=job_title, cover_letter=f"letter {number}",
+            )
+
+        apps = self.migrate(self.after)
+        Application = apps.get_model("core", "Application")
+        JobTitle = apps.get_model("core", "JobTitle")
+        User = apps.get_model("core", "User")
+
+        self.assertEqual(Application.objects.count(), 3)
+        application = Application.objects.get(cover_letter="letter 2")
+        self.assertEqual(application.job_title_id, job_titles[1].id)
+        self.assertEqual(
+            application.user.email, "applicant2@example.com"
+        )
+        self.assertEqual(
+            list(JobTitle.objects.order_by("id").values_list(
+                "applicant_count", flat=True
+            )),
+            [2, 1],
+        )
+        # former applicants stay users
+        self.assertEqual(User.objects.count(), 4)
+
+    def test_reverse(self):
+        """Test each user's oldest application becomes an `Applicant`"""
+
+        apps = self.migrate(self.after)
+        User = apps.get_model("core", "User")
+        Portal = apps.get_model("core", "Portal")
+        JobDescription = apps.get_model("core", "JobDescription")
+        JobTitle = apps.get_model("core", "JobTitle")
+        Application = apps.get_model("core", "Application")
+
+        user = User.objects.create(email="user@example.com", password="x")
+        portal = Portal.objects.create(
+            user=user, name="naukri.com", description="job portal"
+        )
+        for number in range(2):
+            description = JobDescription.objects.create(
+                user=user, role="role", description_text="text"
+            )
+            Application.objects.create(
+                user=user,
+                job_title=JobTitle.objects.create(
+                    user=user, title=f"title {number}", portal=portal,
+                    job_description=description,
+                ),
+                cover_letter=f"letter {number}",
+            )
+
+        apps = self.migrate(self.before)
+
+        applicant = apps.get_model("core", "Applicant").objects.get()
+        self.assertEqual(applicant.email, "user@example.com")
+        self.assertEqual(applicant.cover_letter, "letter 0")
@@ -0,0 +1,142 @@
+"""Test the built OpenAPI schema and its endpoints"""
+
+import hashlib
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from core import openapi
+
+SCHEMA_URL = reverse("api-schema")
+DOCS_URL = reverse("api-docs")
+
+
+class BuiltSchemaTests(SimpleTestCase):
+    """Test `build_schema` and serving its files"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.directory = cls.tmp.name
+        call_command("build_schema", "--dir", cls.directory, stdout=StringIO())
+        cls.manifest = json.loads(
+            Path(cls.directory, openapi.MANIFEST).read_text()
+        )
+        cls.enterClassContext(override_settings(
+            SCHEMA_DIR=cls.directory, SCHEMA_LIVE_FALLBACK=False
+        ))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+        super().tearDownClass()
+
+    def entry(self, name):
+        return self.manifest["formats"][name]
+
+    def test_files_named_after_their_hash(self):
+        for name in ("yaml", "json"):
+            entry = self.entry(name)
+            content = Path(self.directory, entry["file"]).read_bytes()
+            digest = hashlib.sha256(content).hexdigest()
+            self.assertEqual(entry["sha256"], digest)
+            self.assertEqual(entry["file"], f"schema.{digest[:16]}.{name}")
+        self.assertEqual(
+            sorted(path.name for path in Path(self.directory).iterdir()),
+            sorted([
+                openapi.MANIFEST, self.entry("json")["file"],
+                self.entry("yaml")["file"],
+            ]),
+        )
+
+    def test_check(self):
+        out = StringIO()
+        call_command("build_schema", "--dir", self.directory, "--check",
+                     stdout=out)
+        self.assertIn("up to date", out.getvalue())
+
+        with tempfile.TemporaryDirectory() as directory:
+            with self.assertRaises(CommandError):
+                call_command("build_schema", "--dir", directory, "--check")
+
+    def test_yaml_by_default(self):
+        res = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res["Content-Type"], "application/vnd.oai.openapi")
+        self.assertEqual(res["ETag"], f'"{self.entry("yaml")["sha256"]}"')
+        self.assertIn(b"openapi: 3.0.3", res.content)
+        self.assertIn("Accept", res["Vary"])
+
+    def test_json_negotiated(self):
+        for extra in ({"data": {"format": "json"}},
+                      {"HTTP_ACCEPT": "application/json"}):
+            res = self.client.get(SCHEMA_URL, **extra)
+
+            self.assertEqual(
+                res["ETag"], f'"{self.entry("json")["sha256"]}"'
+            )
+            self.assertIn("/api/user/me/", json.loads(res.content)["paths"])
+
+    def test_not_modified(self):
+        etag = self.client.get(SCHEMA_URL)["ETag"]
+
+        res = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res.content, b"")
+        self.assertEqual(res["ETag"], etag)
+
+    def test_versioned_url_immutable(self):
+        version = self.entry("json")["sha256"][:16]
+
+        current = self.client.get(SCHEMA_URL, {"v": version, "format": "json"})
+        stale = self.client.get(SCHEMA_URL, {"v": "0" * 16, "format": "json"})
+
+        self.assertIn("immutable", current["Cache-Control"])
+        self.assertEqual(stale["Cache-Control"], "public, no-cache")
+
+    def test_docs_link_the_versioned_schema(self):
+        # sets the CSRF cookie the page depends on
+        self.client.get(DOCS_URL)
+        res = self.client.get(DOCS_URL)
+        version = self.entry("json")["sha256"][:16]
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIn(version, res.content.decode())
+        self.assertEqual(res["Cache-Control"], "private, no-cache")
+        again = self.client.get(DOCS_URL, HTTP_IF_NONE_MATCH=res["ETag"])
+        self.assertEqual(again.status_code, 304)
+
+
+class UnbuiltSchemaTests(SimpleTestCase):
+    """Test the fallback when no schema was built"""
+
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = tmp.name
+
+    def test_unavailable_in_production(self):
+        with self.settings(
+            SCHEMA_DIR=self.directory, SCHEMA_LIVE_FALLBACK=False
+        ):
+            res = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(res.status_code, 503)
+
+    def test_generated_in_development(self):
+        with self.settings(
+            SCHEMA_DIR=self.directory, SCHEMA_LIVE_FALLBACK=True
+        ):
+            res = self.client.get(SCHEMA_URL, {"format": "json"})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIn("/api/user/me/", json.loads(res.content)["paths"])
@@ -0,0 +1,179 @@
+"""Test the sampled request profiling"""
+
+import tempfile
+import threading
+import time
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import profiling
+from core.models import JobDescription, JobTitle, Portal
+
+JOB_TITLE_URL = reverse("jobtitle:jobtitle-list")
+
+
+def spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class StackSamplerTests(SimpleTestCase):
+    """Test sampling another thread's stack"""
+
+    def test_samples_the_running_function(self):
+        worker = threading.Thread(target=spin, args=(0.2,))
+        worker.start()
+        sampler = profiling.StackSampler(worker.ident, interval=0.001)
+        sampler.start()
+        worker.join()
+        counts = sampler.stop()
+
+        self.assertGreater(sum(counts.values()), 0)
+        stack = counts.most_common(1)[0][0]
+        self.assertIn(";", stack)
+        self.assertTrue(stack.split(";")[-1].startswith("spin ("))
+        self.assertIn("core/tests/test_profiling.py", stack)
+
+    def test_prune_keeps_the_newest(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for number in range(5):
+                Path(directory, f"{number}.json").write_text("{}")
+                Path(directory, f"{number}.collapsed").write_text("")
+
+            profiling.prune(directory, 2)
+
+            self.assertEqual(
+                sorted(path.name for path in Path(directory).iterdir()),
+                ["3.collapsed", "3.json", "4.collapsed", "4.json"],
+            )
+
+
+class ProfilingMiddlewareTests(TestCase):
+    """Test which requests are profiled and what is saved"""
+
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = tmp.name
+        settings = override_settings(
+            PROFILING_ENABLED=True,
+            PROFILING_SAMPLE_RATE=0,
+            PROFILING_TOKEN="secret",
+            PROFILING_DIR=self.directory,
+            PROFILING_MAX_PROFILES=3,
+            PROFILING_INTERVAL=0.001,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        profiling.install()
+        self.addCleanup(profiling.uninstall)
+
+        self.user = get_user_model().objects.create_user(
+            "test@example.com",
+            "password@321"
+        )
+        portal = Portal.objects.create(
+            user=self.user, name="naukri.com", description="job portal"
+        )
+        description = JobDescription.objects.create(
+            user=self.user, role="role", description_text="git, Linux"
+        )
+        JobTitle.objects.create(
+            user=self.user, title="title", portal=portal,
+            job_description=description,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def profiles(self):
+        return profiling.load_profiles(self.directory)
+
+    def test_profiled_on_request(self):
+        res = self.client.get(JOB_TITLE_URL, HTTP_X_PROFILE="secret")
+
+        profile, = self.profiles()
+        self.assertEqual(res["X-Profile-Id"], profile["id"])
+        self.assertEqual(profile["view"], "jobtitle:jobtitle-list")
+        self.assertEqual(profile["status"], 200)
+        self.assertGreater(profile["duration_ms"], 0)
+        self.assertTrue(profile["queries"])
+        query = profile["queries"][0]
+        self.assertIn("SELECT", query["sql"])
+        self.assertEqual(query["database"], "default")
+        self.assertGreaterEqual(query["start_ms"], 0)
+        self.assertTrue(
+            Path(self.directory, f"{profile['id']}.collapsed").exists()
+        )
+
+    def test_not_profiled(self):
+        res = self.client.get(JOB_TITLE_URL, HTTP_X_PROFILE="wrong")
+        self.client.get(JOB_TITLE_URL)
+
+        self.assertNotIn("X-Profile-Id", res)
+        self.assertEqual(self.profiles(), [])
+
+    def test_non_ascii_header(self):
+        res = self.client.get(JOB_TITLE_URL, HTTP_X_PROFILE="é")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.profiles(), [])
+
+    def test_no_token_no_header_trigger(self):
+        with self.settings(PROFILING_TOKEN=None):
+            self.client.get(JOB_TITLE_URL, HTTP_X_PROFILE="")
+
+        self.assertEqual(self.profiles(), [])
+
+    def test_sampled_and_bounded(self):
+        with self.settings(PROFILING_SAMPLE_RATE=1):
+            for _ in range(5):
+                self.client.get(JOB_TITLE_URL)
+
+        self.assertEqual(len(self.profiles()), 3)
+        self.assertEqual(
+            len(list(Path(self.directory).glob("*.collapsed"))), 3
+        )
+
+    def test_command_aggregates_by_view(self):
+        with self.settings(PROFILING_SAMPLE_RATE=1):
+            for _ in range(2):
+                self.client.get(JOB_TITLE_URL)
+            self.client.get(reverse("user:me"))
+        output = Path(self.directory, "merged.txt")
+
+        out = StringIO()
+        call_command(
+            "profiles", "--aggregate", "--output", str(output), stdout=out
+        )
+        listing = StringIO()
+        call_command(
+            "profiles", "--view", "user:me", stdout=listing
+        )
+
+        self.assertIn("jobtitle:jobtitle-list: 2 profiles", out.getvalue())
+        self.assertIn("user:me: 1 profiles", out.getvalue())
+        self.assertEqual(len(listing.getvalue().splitlines()), 2)
+        for line in output.read_text().splitlines():
+            stack, count = line.rsplit(" ", 1)
+            self.assertIn(
+                stack.split(";")[0], ("jobtitle:jobtitle-list", "user:me")
+            )
+            self.assertGreater(int(count), 0)
+
+
+class ProfilingDisabledTests(SimpleTestCase):
+    """Test profiling off costs nothing per request"""
+
+    @override_settings(PROFILING_ENABLED=False)
+    def test_middleware_not_used(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            profiling.ProfilingMiddleware(lambda request: None)
@@ -0,0 +1,242 @@
+"""Test routing reads to the read replicas"""
+
+from contextlib import contextmanager
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import OperationalError, connections, router
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.models import JobDescription, JobTitle, Portal
+from core.replicas import replica_health
+
+JOB_TITLE_URL = reverse("jobtitle:jobtitle-list")
+EXPORT_URL = reverse("jobtitle:jobtitle-export")
+
+REPLICAS = ["replica_1", "replica_2"]
+
+
+def replicate(*aliases):
+    """Copy the primary to the replicas, as replication would"""
+
+    primary = connections["default"]
+    primary.ensure_connection()
+    for alias in aliases or REPLICAS:
+        connections[alias].ensure_connection()
+        primary.connection.backup(connections[alias].connection)
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS, REPLICA_PIN_SECONDS=60)
+class ReplicaRoutingTests(TransactionTestCase):
+    """Test the router against SQLite databases standing in for replicas"""
+
+    @classmethod
+    def setUpClass(cls):
+        # added here rather than in the class body: the test runner would
+        # set up (and migrate) a test database for each of them, replicas
+        # are copies of the primary made by `replicate` instead
+        connections.settings.update(connections.configure_settings({
+            **connections.settings,
+            **{
+                alias: {
+                    "ENGINE": "django.db.backends.sqlite3",
+                    "NAME": ":memory:",
+                }
+                for alias in REPLICAS
+            },
+        }))
+        cls.databases = {"default", *REPLICAS}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        for alias in REPLICAS:
+            del connections[alias]
+            del connections.settings[alias]
+
+    def setUp(self) -> None:
+        cache.clear()
+        replica_health.reset()
+        lag = patch("core.replicas.replica_lag", return_value=None)
+        self.replica_lag = lag.start()
+        self.addCleanup(lag.stop)
+
+        self.user = get_user_model().objects.create_user(
+            "test@example.com",
+            "password@321"
+        )
+        self.portal = Portal.objects.create(
+            user=self.user, name="naukri.com", description="job portal"
+        )
+        self.create_job_title("replicated")
+        replicate()
+        self.client = self.client_for(self.user)
+
+    def client_for(self, user):
+        client = APIClient()
+        token = Token.objects.create(user=user)
+        client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        return client
+
+    def create_job_title(self, title, user=None):
+        description = JobDescription.objects.create(
+            user=user or self.user, role=title, description_text="git, Linux"
+        )
+        return JobTitle.objects.create(
+            user=user or self.user, title=title, portal=self.portal,
+            job_description=description,
+        )
+
+    def list_titles(self, client=None):
+        res = (client or self.client).get(JOB_TITLE_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [job_title["title"] for job_title in res.data["results"]]
+
+    @contextmanager
+    def count_queries(self):
+        """Yield a dict of queries run per database"""
+
+        counts = {}
+        contexts = {
+            alias: CaptureQueriesContext(connections[alias])
+            for alias in ["default", *REPLICAS]
+        }
+        for context in contexts.values():
+            context.__enter__()
+        try:
+            yield counts
+        finally:
+            for alias, context in contexts.items():
+                context.__exit__(None, None, None)
+                counts[alias] = len(context)
+
+    def test_reads_go_to_a_replica(self):
+        # written outside a request, not replicated yet
+        self.create_job_title("on the primary only")
+
+        with self.count_queries() as queries:
+            titles = self.list_titles()
+
+        self.assertEqual(titles, ["replicated"])
+        self.assertGreater(queries["replica_1"] + queries["replica_2"], 0)
+        # the replica was picked once for the whole request
+        self.assertEqual(min(queries["replica_1"], queries["replica_2"]), 0)
+
+    def test_reads_outside_requests_use_the_primary(self):
+        self.create_job_title("on the primary only")
+
+        self.assertEqual(JobTitle.objects.count(), 2)
+
+    def test_replicas_not_migrated(self):
+        self.assertTrue(router.allow_migrate("default", "core"))
+        self.assertFalse(router.allow_migrate("replica_1", "core"))
+
+    def test_writes_read_the_primary(self):
+        """Test validation of a write sees rows not replicated yet"""
+
+        description = JobDescription.objects.create(
+            user=self.user, role="new", description_text="text"
+        )
+
+        with self.count_queries() as queries:
+            res = self.client.post(JOB_TITLE_URL, {
+                "title": "new", "portal": self.portal.id,
+                "job_description": description.id,
+            })
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(queries["replica_1"] + queries["replica_2"], 0)
+
+    def test_client_reads_its_writes(self):
+        description = JobDescription.objects.create(
+            user=self.user, role="new", description_text="text"
+        )
+        other_user = get_user_model().objects.create_user(
+            "other@example.com", "password@321"
+        )
+        other_client = self.client_for(other_user)
+        self.create_job_title("other's", user=other_user)
+
+        res = self.client.post(JOB_TITLE_URL, {
+            "title": "new", "portal": self.portal.id,
+            "job_description": description.id,
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.list_titles(), ["new", "replicated"])
+        # not pinned by someone else's write
+        self.assertEqual(self.list_titles(other_client), [])
+
+    def test_pin_expires(self):
+        description = JobDescription.objects.create(
+            user=self.user, role="new", description_text="text"
+        )
+
+        with self.settings(REPLICA_PIN_SECONDS=0):
+            self.client.post(JOB_TITLE_URL, {
+                "title": "new", "portal": self.portal.id,
+                "job_description": description.id,
+            })
+
+        self.assertEqual(self.list_titles(), ["replicated"])
+
+    def test_replica_that_applied_the_write_serves_the_client(self):
+        description = JobDescription.objects.create(
+            user=self.user, role="new", description_text="text"
+        )
+        self.client.post(JOB_TITLE_URL, {
+            "title": "new", "portal": self.portal.id,
+            "job_description": description.id,
+        })
+        replicate("replica_1")
+
+        # checked after the write, replica_1 is up to date
+        self.replica_lag.side_effect = lambda connection: (
+            0 if connection.alias == "replica_1" else 30
+        )
+        replica_health.reset()
+        with self.count_queries() as queries:
+            titles = self.list_titles()
+
+        self.assertEqual(titles, ["new", "replicated"])
+        self.assertGreater(queries["replica_1"], 0)
+        self.assertEqual(queries["replica_2"], 0)
+
+    def test_unhealthy_replicas_leave_the_rotation(self):
+        def replica_lag(connection):
+            if connection.alias == "replica_1":
+                raise OperationalError("unable to open database file")
+            return None
+
+        self.replica_lag.side_effect = replica_lag
+        with self.count_queries() as queries:
+            for _ in range(5):
+                self.list_titles()
+
+        self.assertEqual(queries["replica_1"], 0)
+        self.assertGreater(queries["replica_2"], 0)
+
+        # lagging too much
+        self.replica_lag.side_effect = lambda connection: 3600
+        replica_health.reset()
+        with self.count_queries() as queries:
+            self.create_job_title("on the primary only")
+            titles = self.list_titles()
+
+        self.assertEqual(titles, ["on the primary only", "replicated"])
+        self.assertEqual(queries["replica_1"] + queries["replica_2"], 0)
+
+    def test_streamed_export_reads_a_replica(self):
+        with self.count_queries() as queries:
+            res = self.client.get(EXPORT_URL)
+            content = b"".join(res.streaming_content)
+
+        self.assertIn(b"replicated", content)
+        self.assertGreater(queries["replica_1"] + queries["replica_2"], 0)
@@ -0,0 +1,184 @@
+"""Tests for the incrementally maintained posting rollups"""
+
+from datetime import date, datetime, timezone as dt_timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.ingestion.engine import BatchWriter, IngestionStats
+from core.models import (
+    JobDescription,
+    JobTitle,
+    Portal,
+    PortalPostingRollup,
+    UserPostingRollup,
+)
+from job.bulk import bulk_upsert_job_titles
+
+DAY = date(2023, 2, 1)
+OTHER_DAY = date(2023, 2, 3)
+
+
+def at(day):
+    return datetime(day.year, day.month, day.day, 10, tzinfo=dt_timezone.utc)
+
+
+class RollupTests(TestCase):
+    """Test every write path keeps the rollups equal to a full count"""
+
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            "test@example.com",
+            "password@321"
+        )
+        self.portals = [
+            Portal.objects.create(
+                user=self.user, name=name, description="job portal"
+            )
+            for name in ("naukri.com", "indeed.com")
+        ]
+
+    def create_posting(self, title, day=DAY, portal=None):
+        description = JobDescription.objects.create(
+            user=self.user, role=title, description_text="git, Linux",
+            pub_date=at(day),
+        )
+        return JobTitle.objects.create(
+            user=self.user, title=title, portal=portal or self.portals[0],
+            job_description=description,
+        )
+
+    def portal_rollups(self):
+        return dict(
+            ((portal_id, day), count)
+            for portal_id, day, count in PortalPostingRollup.objects
+            .values_list("portal_id", "day", "job_titles")
+        )
+
+    def user_rollups(self):
+        return dict(
+            (day, (titles, descriptions))
+            for day, titles, descriptions in UserPostingRollup.objects
+            .values_list("day", "job_titles", "job_descriptions")
+        )
+
+    def assertRebuildKeeps(self):
+        """The incremental rollups equal the rebuilt ones"""
+
+        portal_rollups, user_rollups = (
+            self.portal_rollups(), self.user_rollups()
+        )
+        call_command("rebuild_rollups", stdout=StringIO())
+        self.assertEqual(self.portal_rollups(), portal_rollups)
+        self.assertEqual(self.user_rollups(), user_rollups)
+
+    def test_create(self):
+        naukri, indeed = self.portals
+        self.create_posting("a")
+        self.create_posting("b")
+        self.create_posting("c", portal=indeed)
+        self.create_posting("d", day=OTHER_DAY)
+        JobDescription.objects.create(
+            user=self.user, role="no title yet", description_text="x",
+            pub_date=at(OTHER_DAY),
+        )
+
+        self.assertEqual(self.portal_rollups(), {
+            (naukri.id, DAY): 2,
+            (indeed.id, DAY): 1,
+            (naukri.id, OTHER_DAY): 1,
+        })
+        self.assertEqual(self.user_rollups(), {
+            DAY: (3, 3), OTHER_DAY: (1, 2),
+        })
+        self.assertRebuildKeeps()
+
+    def test_move_to_other_portal(self):
+        naukri, indeed = self.portals
+        job_title = self.create_posting("a")
+        job_title.portal = indeed
+        job_title.save()
+
+        self.assertEqual(self.portal_rollups(), {(indeed.id, DAY): 1})
+        self.assertEqual(self.user_rollups(), {DAY: (1, 1)})
+        self.assertRebuildKeeps()
+
+    def test_republish_on_other_day(self):
+        naukri = self.portals[0]
+        job_title = self.create_posting("a")
+        description = job_title.job_description
+        description.pub_date = at(OTHER_DAY)
+        description.save()
+
+        self.assertEqual(self.portal_rollups(), {(naukri.id, OTHER_DAY): 1})
+        self.assertEqual(self.user_rollups(), {OTHER_DAY: (1, 1)})
+        self.assertRebuildKeeps()
+
+    def test_delete(self):
+        """Test deletes decrement, and emptied rows are dropped"""
+
+        naukri = self.portals[0]
+        first = self.create_posting("a")
+        self.create_posting("b")
+        first.delete()
+
+        self.assertEqual(self.portal_rollups(), {(naukri.id, DAY): 1})
+        self.assertEqual(self.user_rollups(), {DAY: (1, 2)})
+
+        # cascades from the description
+        JobDescription.objects.all().delete()
+
+        self.assertEqual(self.portal_rollups(), {})
+        self.assertEqual(self.user_rollups(), {})
+
+    def test_bulk_upsert(self):
+        naukri, indeed = self.portals
+        descriptions = [
+            JobDescription.objects.create(
+                user=self.user, role=name, description_text="x",
+                pub_date=at(DAY),
+            )
+            for name in ("a", "b")
+        ]
+        items = [
+            {"title": description.role, "portal": naukri.id,
+             "job_description": description.id}
+            for description in descriptions
+        ]
+        bulk_upsert_job_titles(self.user, items)
+        self.assertEqual(self.portal_rollups(), {(naukri.id, DAY): 2})
+
+        items[0]["portal"] = indeed.id
+        bulk_upsert_job_titles(self.user, items[:1], upsert=True)
+
+        self.assertEqual(self.portal_rollups(), {
+            (naukri.id, DAY): 1, (indeed.id, DAY): 1,
+        })
+        self.assertEqual(self.user_rollups(), {DAY: (2, 2)})
+        self.assertRebuildKeeps()
+
+    def test_batch_writer(self):
+        naukri = self.portals[0]
+        writer = BatchWriter({naukri.name: naukri}, IngestionStats())
+        writer.write([
+            (naukri.name, {"title": f"title {number}",
+                           "pub_date": "2023-02-01T10:00:00Z"})
+            for number in range(3)
+        ])
+
+        self.assertEqual(self.portal_rollups(), {(naukri.id, DAY): 3})
+        self.assertEqual(self.user_rollups(), {DAY: (3, 3)})
+        self.assertRebuildKeeps()
+
+    def test_rebuild_repairs_drift(self):
+        naukri = self.portals[0]
+        self.create_posting("a")
+        PortalPostingRollup.objects.update(job_titles=42)
+        UserPostingRollup.objects.all().delete()
+
+        call_command("rebuild_rollups", stdout=StringIO())
+
+        self.assertEqual(self.portal_rollups(), {(naukri.id, DAY): 1})
+        self.assertEqual(self.user_rollups(), {DAY: (1, 1)})
@@ -0,0 +1,229 @@
+"""Test the token bucket throttles"""
+
+import multiprocessing
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import throttling
+from core.models import JobDescription, Portal
+from job.tests.test_async_views import AsyncViewsMixin
+
+CREATE_USER_URL = reverse("user:create")
+TOKEN_URL = reverse("user:token")
+BULK_URL = reverse("jobtitle:jobtitle-bulk")
+JOB_TITLE_URL = reverse("jobtitle:jobtitle-list")
+
+
+def _consume_all(path, results):
+    store = throttling.SharedBucketStore(path, slots=64)
+    results.put(sum(
+        store.consume("key", 100, 0.001, 1) == 0 for _ in range(100)
+    ))
+
+
+class BucketTests(SimpleTestCase):
+    """Test the bucket arithmetic and stores"""
+
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "buckets")
+
+    def shared(self, slots=64):
+        store = throttling.SharedBucketStore(self.path, slots=slots)
+        self.addCleanup(store.close)
+        return store
+
+    def test_parse_rate(self):
+        self.assertEqual(throttling.parse_rate("10/min"), (10, 10 / 60))
+        self.assertEqual(throttling.parse_rate("3/10s"), (3, 0.3))
+        with self.assertRaises(ImproperlyConfigured):
+            throttling.parse_rate("10/fortnight")
+
+    def test_empty_bucket_waits_for_its_cost(self):
+        for store in (throttling.MemoryBucketStore(), self.shared()):
+            waits = [
+                store.consume("key", 3, 1, 1, now=100) for _ in range(4)
+            ]
+            self.assertEqual(waits, [0, 0, 0, 1])
+            # cost 2 after half a second: 0.5 tokens, 1.5 seconds short
+            self.assertEqual(store.consume("key", 3, 1, 2, now=100.5), 1.5)
+            self.assertEqual(store.consume("key", 3, 1, 2, now=102), 0)
+            # refills up to the capacity only
+            waits = [
+                store.consume("key", 3, 1, 1, now=1000) for _ in range(4)
+            ]
+            self.assertEqual(waits, [0, 0, 0, 1])
+
+    def test_keys_have_their_own_bucket(self):
+        store = self.shared()
+
+        self.assertEqual(store.consume("one", 1, 1, 1, now=0), 0)
+        self.assertEqual(store.consume("other", 1, 1, 1, now=0), 0)
+        self.assertEqual(store.consume("one", 1, 1, 1, now=0), 1)
+
+    def test_full_group_evicts_least_recently_updated(self):
+        store = self.shared(slots=throttling.GROUP_SLOTS)
+        for number in range(throttling.GROUP_SLOTS):
+            store.consume(f"key {number}", 1, 1, 1, now=number)
+
+        store.consume("new", 1, 1, 1, now=100)
+
+        # "key 0" was evicted, comes back full
+        self.assertEqual(store.consume("key 0", 1, 0.001, 1, now=100), 0)
+        self.assertGreater(store.consume("key 7", 1, 0.001, 1, now=100), 0)
+
+    def test_processes_share_buckets(self):
+        self.shared()
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        workers = [
+            context.Process(target=_consume_all, args=(self.path, results))
+            for _ in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        allowed = [results.get(timeout=30) for _ in workers]
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(sum(allowed), 100)
+
+    def test_clear(self):
+        store = self.shared()
+        store.consume("key", 1, 0.001, 1)
+
+        store.clear()
+
+        self.assertEqual(store.consume("key", 1, 0.001, 1), 0)
+
+
+RATES = {
+    "auth.ip": "5/min",
+    "auth.email": "2/min",
+    "writes.user": "3/min",
+}
+
+
+@override_settings(
+    THROTTLE_STORE="memory",
+    REST_FRAMEWORK={
+        "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+        "DEFAULT_THROTTLE_RATES": RATES,
+    },
+)
+class ThrottledApiTests(TestCase):
+    """Test the throttled endpoints"""
+
+    def setUp(self) -> None:
+        throttling.clear_buckets()
+        self.client = APIClient()
+
+    def login(self, email, **extra):
+        return self.client.post(
+            TOKEN_URL, {"email": email, "password": "wrong"}, **extra
+        )
+
+    def test_login_throttled_per_email(self):
+        statuses = [
+            self.login("test@example.com").status_code for _ in range(3)
+        ]
+        other = self.login("Other@Example.com ")
+
+        self.assertEqual(statuses[:2], [status.HTTP_400_BAD_REQUEST] * 2)
+        self.assertEqual(statuses[2], status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(other.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_email_case_and_spaces_share_a_bucket(self):
+        self.login("test@example.com")
+        self.login(" TEST@example.com")
+
+        res = self.login("Test@Example.com")
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_rejection_carries_retry_after(self):
+        self.login("test@example.com")
+        self.login("test@example.com")
+
+        res = self.login("test@example.com")
+
+        # the bucket refills a token every 30 seconds
+        self.assertIn(int(res["Retry-After"]), range(29, 31))
+
+    def test_login_throttled_per_ip(self):
+        statuses = [
+            self.login(f"user{number}@example.com").status_code
+            for number in range(6)
+        ]
+        other_ip = self.login(
+            "user0@example.com", REMOTE_ADDR="10.0.0.2"
+        )
+
+        self.assertNotIn(status.HTTP_429_TOO_MANY_REQUESTS, statuses[:5])
+        self.assertEqual(statuses[5], status.HTTP_429_TOO_MANY_REQUESTS)
+        # only user0's email bucket has been used, once
+        self.assertEqual(other_ip.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sign_up_costs_more(self):
+        statuses = [
+            self.client.post(CREATE_USER_URL, {
+                "email": f"user{number}@example.com",
+                "password": "password@321",
+                "name": "Test Name",
+            }).status_code
+            for number in range(3)
+        ]
+
+        self.assertEqual(statuses, [
+            status.HTTP_201_CREATED,
+            status.HTTP_201_CREATED,
+            status.HTTP_429_TOO_MANY_REQUESTS,
+        ])
+
+    def test_writes_throttled_per_user_reads_free(self):
+        user = get_user_model().objects.create_user(
+            "test@example.com", "password@321"
+        )
+        portal = Portal.objects.create(
+            user=user, name="naukri.com", description="job portal"
+        )
+        payload = [
+            {
+                "title": f"title {number}",
+                "portal": portal.id,
+                "job_description": JobDescription.objects.create(
+                    user=user, role="role", description_text="git"
+                ).id,
+            }
+            for number in range(150)
+        ]
+        self.client.force_authenticate(user)
+
+        # 150 items cost 2 tokens of 3
+        bulk = self.client.post(BULK_URL, payload, format="json")
+        reads = [
+            self.client.get(JOB_TITLE_URL).status_code for _ in range(5)
+        ]
+        writes = [
+            self.client.post(BULK_URL, payload[:1], format="json")
+            for _ in range(2)
+        ]
+
+        self.assertEqual(bulk.status_code, status.HTTP_200_OK)
+        self.assertEqual(reads, [status.HTTP_200_OK] * 5)
+        self.assertEqual(writes[0].status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            writes[1].status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+
+
+class AsyncThrottledApiTests(AsyncViewsMixin, ThrottledApiTests):
+    """Same through the async views, throttles checked on the event loop"""
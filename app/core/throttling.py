@@ -0,0 +1,324 @@
+"""
+Token bucket throttles for the CPU expensive endpoints
+
+A view opts in with `throttle_classes = BUCKET_THROTTLES`, a
+`throttle_scope` and the token cost of its methods, `throttle_costs`
+(`{"POST": 2}`) or a `get_throttle_cost(request)` method. Methods without
+a cost are not throttled.
+
+Every throttle class keys the scope's buckets on one identity: client IP
+(`IPBucketThrottle`, `NUM_PROXIES` aware), the `email` of the request body
+(`EmailBucketThrottle`) or the authenticated user (`UserBucketThrottle`).
+Their rates are set per scope and identity in the DRF settings,
+`"<scope>.<ip|email|user>": "<tokens>/<period>"`: a bucket holds at most
+`tokens` and refills completely over `period`. Identities without a rate
+are not throttled.
+
+    "DEFAULT_THROTTLE_RATES": {"auth.ip": "60/min", "auth.email": "10/min"}
+
+A request takes its cost from every bucket it is keyed on; once one is
+short the request is rejected with 429 and `Retry-After`, the seconds
+until that bucket holds the cost again.
+
+`THROTTLE_STORE` keeps the buckets:
+
+- "shared": a memory mapped file (`THROTTLE_PATH`, /dev/shm by default)
+  shared by every worker process of the host. Keys hash into groups of
+  `GROUP_SLOTS` slots, a group is locked with `fcntl.lockf` for the few
+  microseconds of one update. A full group evicts its least recently
+  updated bucket, which comes back full.
+- "memory": a dict, per process, as in the tests (`core/test_runner.py`)
+"""
+
+import fcntl
+import hashlib
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from collections.abc import Mapping
+from contextlib import contextmanager
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+# key hash, tokens, last update (unix time)
+SLOT = struct.Struct("<Qdd")
+GROUP_SLOTS = 8
+# threads of one process do not exclude each other with `fcntl` locks
+THREAD_LOCKS = 64
+
+PERIODS = {"s": 1, "sec": 1, "m": 60, "min": 60, "h": 3600, "hour": 3600,
+           "d": 86400, "day": 86400}
+RATE = re.compile(r"^\s*(\d+)\s*/\s*(\d*)\s*([a-z]+)\s*$")
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """`"10/min"` -> (capacity 10, refill 10 / 60 tokens per second)"""
+
+    match = RATE.match(rate)
+    if match is None or match.group(3) not in PERIODS:
+        raise ImproperlyConfigured(f"Invalid throttle rate {rate!r}")
+    tokens, count, unit = match.groups()
+    period = int(count or 1) * PERIODS[unit]
+    return int(tokens), int(tokens) / period
+
+
+def take(tokens, updated, capacity, rate, cost, now):
+    """Refill a bucket and take `cost` from it
+
+    Returns (tokens left, seconds to wait), the wait is 0 when the cost
+    was taken.
+    """
+
+    tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+    # a cost above the capacity could never be paid
+    cost = min(cost, capacity)
+    if tokens >= cost:
+        return tokens - cost, 0.0
+    return tokens, (cost - tokens) / rate
+
+
+class MemoryBucketStore:
+    """Buckets of this process only
+
+    Args:
+        max_keys: buckets kept, the least recently updated are dropped
+    """
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, rate, cost, now=None):
+        """Take `cost` from the bucket `key`, return the seconds to wait"""
+
+        now = time.time() if now is None else now
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens, wait = take(tokens, updated, capacity, rate, cost, now)
+            # insertion order is the update order
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                del self._buckets[next(iter(self._buckets))]
+        return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class SharedBucketStore:
+    """Buckets in a memory mapped file shared by the processes of a host
+
+    Args:
+        path: the file, created if missing
+        slots: buckets the file holds, rounded up to whole groups
+    """
+
+    def __init__(self, path, slots=65536):
+        self.path = path
+        self.groups = max(1, -(-slots // GROUP_SLOTS))
+        self.group_size = GROUP_SLOTS * SLOT.size
+        size = self.groups * self.group_size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < size:
+            # zero filled, concurrent growers agree on the size
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+        self._locks = [threading.Lock() for _ in range(THREAD_LOCKS)]
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
+
+    def clear(self):
+        with self._lock_all():
+            self._map[:] = bytes(len(self._map))
+
+    @contextmanager
+    def _lock_all(self):
+        for lock in self._locks:
+            lock.acquire()
+        # 0 bytes locks up to the end of the file
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, 0, 0)
+        try:
+            yield
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 0, 0)
+            for lock in self._locks:
+                lock.release()
+
+    def consume(self, key, capacity, rate, cost, now=None):
+        """Take `cost` from the bucket `key`, return the seconds to wait"""
+
+        now = time.time() if now is None else now
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        # 0 marks an empty slot
+        key_hash = int.from_bytes(digest, "little") | 1
+        group = key_hash % self.groups
+        start = group * self.group_size
+        with self._locks[group % THREAD_LOCKS]:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, self.group_size, start)
+            try:
+                offset = self._find(start, key_hash)
+                stored, tokens, updated = SLOT.unpack_from(self._map, offset)
+                if stored != key_hash:
+                    tokens, updated = capacity, now
+                tokens, wait = take(
+                    tokens, updated, capacity, rate, cost, now
+                )
+                SLOT.pack_into(self._map, offset, key_hash, tokens, now)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, self.group_size, start)
+        return wait
+
+    def _find(self, start, key_hash):
+        """Offset of the slot of `key_hash`, else of an empty or the
+        least recently updated slot of the group"""
+
+        oldest = None
+        for offset in range(start, start + self.group_size, SLOT.size):
+            stored, _, updated = SLOT.unpack_from(self._map, offset)
+            if stored == key_hash or stored == 0:
+                return offset
+            if oldest is None or updated < oldest[0]:
+                oldest = (updated, offset)
+        return oldest[1]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """The bucket store of `THROTTLE_STORE`, created on first use"""
+
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if settings.THROTTLE_STORE == "memory":
+                    _store = MemoryBucketStore()
+                elif settings.THROTTLE_STORE == "shared":
+                    _store = SharedBucketStore(
+                        settings.THROTTLE_PATH, settings.THROTTLE_SLOTS
+                    )
+                else:
+                    raise ImproperlyConfigured(
+                        f"Unknown THROTTLE_STORE {settings.THROTTLE_STORE!r}"
+                    )
+    return _store
+
+
+def clear_buckets():
+    """Refill every bucket, e.g. between tests"""
+
+    get_store().clear()
+
+
+@receiver(setting_changed)
+def _reset_store(*, setting, **kwargs):
+    global _store
+    if setting in ("THROTTLE_STORE", "THROTTLE_PATH", "THROTTLE_SLOTS"):
+        with _store_lock:
+            if isinstance(_store, SharedBucketStore):
+                _store.close()
+            _store = None
+
+
+# unsafe methods cost a token unless the view says otherwise
+DEFAULT_COSTS = {"POST": 1, "PUT": 1, "PATCH": 1, "DELETE": 1}
+
+
+def get_cost(request, view):
+    """Tokens `request` costs, None when it is not throttled"""
+
+    method = getattr(view, "get_throttle_cost", None)
+    if method is not None:
+        return method(request)
+    return getattr(view, "throttle_costs", DEFAULT_COSTS).get(request.method)
+
+
+class BucketThrottle(BaseThrottle):
+    """Token bucket of `view.throttle_scope` keyed on `get_key`"""
+
+    # the identity part of the rate names, "<scope>.<kind>"
+    kind = None
+
+    def __init__(self):
+        self.delay = None
+
+    def get_key(self, request):
+        """The identity the bucket is keyed on, None to skip it"""
+
+        raise NotImplementedError(".get_key() must be overridden")
+
+    def allow_request(self, request, view):
+        scope = getattr(view, "throttle_scope", None)
+        if scope is None:
+            return True
+        name = f"{scope}.{self.kind}"
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(name)
+        if rate is None:
+            return True
+        cost = get_cost(request, view)
+        if not cost:
+            return True
+        ident = self.get_key(request)
+        if ident is None:
+            return True
+        capacity, per_second = parse_rate(rate)
+        self.delay = get_store().consume(
+            f"{name}:{ident}", capacity, per_second, cost
+        )
+        return not self.delay
+
+    def wait(self):
+        return self.delay
+
+
+class IPBucketThrottle(BucketThrottle):
+    """Bucket per client IP"""
+
+    kind = "ip"
+
+    def get_key(self, request):
+        return self.get_ident(request)
+
+
+class EmailBucketThrottle(BucketThrottle):
+    """Bucket per `email` of the request body, e.g. the account logged
+    into from many addresses"""
+
+    kind = "email"
+
+    def get_key(self, request):
+        data = request.data
+        email = data.get("email") if isinstance(data, Mapping) else None
+        if not isinstance(email, str) or not email.strip():
+            return None
+        return email.strip().lower()
+
+
+class UserBucketThrottle(BucketThrottle):
+    """Bucket per authenticated user"""
+
+    kind = "user"
+
+    def get_key(self, request):
+        if not request.user or not request.user.is_authenticated:
+            return None
+        return request.user.pk
+
+
+BUCKET_THROTTLES = [IPBucketThrottle, EmailBucketThrottle, UserBucketThrottle]
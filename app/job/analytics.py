@@ -0,0 +1,140 @@
+"""
+Time-bucketed posting counts for dashboards
+
+Series are read from the daily rollups (`core/rollups.py`), never from the
+job title tables: a request reads at most one row per day (and portal) of
+its range, whatever the number of postings. Days are summed into day,
+week (starting Monday) or month buckets with one vectorized `bincount`
+per measure.
+"""
+
+import numpy as np
+
+from core.models import PortalPostingRollup, UserPostingRollup
+
+BUCKETS = ("day", "week", "month")
+
+
+def _week_start(day):
+    # 1970-01-01, day 0 of `datetime64[D]`, was a Thursday
+    weekday = (day.astype(np.int64) + 3) % 7
+    return day - weekday.astype("timedelta64[D]")
+
+
+def bucket_starts(start, end, bucket):
+    """Return the first day of every bucket overlapping `start..end`
+
+    The first bucket may begin before `start`, it only counts days from
+    `start` on.
+    """
+
+    start, end = np.datetime64(start, "D"), np.datetime64(end, "D")
+    if bucket == "month":
+        return np.arange(
+            start.astype("datetime64[M]"),
+            end.astype("datetime64[M]") + 1,
+        ).astype("datetime64[D]")
+    if bucket == "week":
+        return np.arange(_week_start(start), end + 1, 7)
+    return np.arange(start, end + 1)
+
+
+def bucket_index(days, start, bucket):
+    """Return the bucket number of each of `days`, bucket 0 holds `start`"""
+
+    start = np.datetime64(start, "D")
+    if bucket == "month":
+        return (
+            days.astype("datetime64[M]") - start.astype("datetime64[M]")
+        ).astype(np.int64)
+    if bucket == "week":
+        return (days - _week_start(start)).astype(np.int64) // 7
+    return (days - start).astype(np.int64)
+
+
+def bucketize(days, counts, start, end, bucket, series=None, num_series=1):
+    """Sum daily `counts` per series and bucket
+
+    Args:
+        days: `datetime64[D]` array, all within `start..end`
+        counts: array of the counts of `days`
+        series: series number (`0 <= n < num_series`) of every day, all
+            in series 0 when omitted
+
+    Returns:
+        int64 array of shape `(num_series, number of buckets)`
+    """
+
+    num_buckets = len(bucket_starts(start, end, bucket))
+    index = bucket_index(days, start, bucket)
+    if series is not None:
+        index = index + np.asarray(series, dtype=np.int64) * num_buckets
+    sums = np.bincount(
+        index, weights=counts, minlength=num_series * num_buckets
+    )
+    return sums.astype(np.int64).reshape(num_series, num_buckets)
+
+
+def _columns(rows, count):
+    """Split `rows` into `count` column arrays, days first"""
+
+    columns = list(zip(*rows)) or [()] * count
+    days = np.array(columns[0], dtype="datetime64[D]")
+    return [days] + [np.array(column) for column in columns[1:]]
+
+
+def posting_series(user, start, end, bucket="day", group_by=None):
+    """Return `user`'s new postings from `start` to `end` (dates)
+
+    Returns:
+        dict with the bucket start dates and a list of series: the user's
+        job titles and job descriptions, or the job titles of each portal
+        (`group_by="portal"`), most active portal first
+    """
+
+    starts = bucket_starts(start, end, bucket)
+    if group_by == "portal":
+        rows = PortalPostingRollup.objects.filter(
+            user=user, day__range=(start, end)
+        ).values_list("day", "job_titles", "portal_id", "portal__name")
+        days, counts, portal_ids, names = _columns(rows, 4)
+        portals, series = np.unique(
+            portal_ids.astype(np.int64), return_inverse=True
+        )
+        sums = bucketize(
+            days, counts, start, end, bucket,
+            series=series, num_series=len(portals),
+        )
+        names = dict(zip(portal_ids.tolist(), names.tolist()))
+        order = np.argsort(-sums.sum(axis=1), kind="stable")
+        result = [
+            {
+                "portal": {
+                    "id": int(portals[number]),
+                    "name": names[portals[number]],
+                },
+                "job_titles": sums[number].tolist(),
+            }
+            for number in order
+        ]
+    else:
+        rows = UserPostingRollup.objects.filter(
+            user=user, day__range=(start, end)
+        ).values_list("day", "job_titles", "job_descriptions")
+        days, titles, descriptions = _columns(rows, 3)
+        result = [{
+            "portal": None,
+            "job_titles": bucketize(
+                days, titles, start, end, bucket
+            )[0].tolist(),
+            "job_descriptions": bucketize(
+                days, descriptions, start, end, bucket
+            )[0].tolist(),
+        }]
+    return {
+        "start": start,
+        "end": end,
+        "bucket": bucket,
+        "buckets": starts.astype(object).tolist(),
+        "series": result,
+    }
@@ -0,0 +1,71 @@
+"""
+Async job title views, routed instead of `job.views` under ASGI
+
+See `core/async_views.py`. Reads, the bulk of the traffic, are awaited end
+to end: token lookup, validators (ETag / 304) and the page. Writes and the
+extra actions run their sync handlers in a thread.
+"""
+
+from asgiref.sync import sync_to_async
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.async_views import AsyncDispatchMixin
+from job.views import JobTitleViewSet, job_title_schema
+
+
+@job_title_schema
+class AsyncJobTitleViewSet(AsyncDispatchMixin, JobTitleViewSet):
+    """`JobTitleViewSet` with async `list`, `retrieve` and `destroy`"""
+
+    async def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        state = await queryset.aaggregate(**self.get_list_state())
+        return await self._aconditional(
+            request,
+            *self.list_validators(state),
+            lambda: self._alist_page(queryset),
+        )
+
+    async def _alist_page(self, queryset):
+        plan = self.get_list_plan()
+        rows = queryset
+        if plan is not None:
+            rows = self.get_list_rows(plan, queryset)
+        page = await self.paginator.apaginate_queryset(
+            rows, self.request, view=self
+        )
+        if page is None:
+            page = [row async for row in rows]
+        if plan is None:
+            data = self.get_serializer(page, many=True).data
+        else:
+            data = plan.serialize(page)
+        return self.get_paginated_response(data)
+
+    async def retrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+
+        async def respond():
+            return Response(self.get_serializer(instance).data)
+
+        return await self._aconditional(
+            request, *self.detail_validators(instance), respond
+        )
+
+    async def destroy(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        # cascades and signal handlers are sync
+        await sync_to_async(self.perform_destroy)(instance)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    async def _aconditional(self, request, last_modified, parts, respond):
+        """`ConditionalGetMixin._conditional` awaiting `respond()`"""
+
+        not_modified, headers = self.check_conditions(
+            request, last_modified, parts
+        )
+        response = await respond() if not_modified is None else not_modified
+        for name, value in headers.items():
+            response[name] = value
+        return response
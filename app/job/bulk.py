@@ -0,0 +1,162 @@
+"""
+Bulk create / upsert of job titles
+
+Used by `JobTitleViewSet.bulk`. Whatever the batch size, validation costs one
+query per referenced table (`core_portal`, `core_jobdescription`,
+`core_jobtitle`) and the rows are written with `bulk_create`.
+
+`JobTitle.job_description` is a one-to-one field, so it is the natural key of
+a job title: a job description has at most one title. With `upsert=True` an
+item whose job description already has a title updates that title's `title`,
+`portal` and `last_updated` instead of failing.
+"""
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from rest_framework.exceptions import ValidationError
+
+from core import rollups
+from core.models import JobDescription, JobTitle, Portal
+from core.indexing import refresh_job_titles
+from job.serializers import JobTitleBulkItemSerializer
+
+CREATED = "created"
+UPDATED = "updated"
+ERROR = "error"
+
+# rows per INSERT statement
+WRITE_BATCH_SIZE = 1000
+
+
+def bulk_upsert_job_titles(user, data, upsert=False):
+    """Validate and write `data`, return one result dict per item
+
+    Args:
+        user: owner of the new job titles
+        data: list of dicts with `title`, `portal` and `job_description`
+        upsert: update the existing title of a job description
+            instead of reporting a conflict
+
+    Returns:
+        list of `{"index", "status", "id"}` or `{"index", "status", "errors"}`
+        in the order of `data`
+    """
+
+    results = [None] * len(data)
+    items = {}
+    item_serializer = JobTitleBulkItemSerializer()
+    for index, raw in enumerate(data):
+        try:
+            items[index] = item_serializer.run_validation(raw)
+        except ValidationError as exc:
+            results[index] = {
+                "index": index, "status": ERROR, "errors": exc.detail
+            }
+
+    portal_ids = {item["portal"] for item in items.values()}
+    description_ids = {item["job_description"] for item in items.values()}
+
+    known_portals = set(
+        Portal.objects.filter(id__in=portal_ids).values_list("id", flat=True)
+    )
+    own_descriptions = set(
+        JobDescription.objects.filter(
+            id__in=description_ids, user=user
+        ).values_list("id", flat=True)
+    )
+    # job_description_id -> owner id of its existing job title
+    existing = dict(
+        JobTitle.objects.filter(
+            job_description_id__in=description_ids
+        ).values_list("job_description_id", "user_id")
+    )
+
+    # the last item naming a job description wins, earlier ones are errors
+    last_index = {
+        item["job_description"]: index for index, item in items.items()
+    }
+
+    rows = []
+    now = timezone.now()
+    for index, item in items.items():
+        description_id = item["job_description"]
+        errors = {}
+        if item["portal"] not in known_portals:
+            errors["portal"] = [
+                f"Invalid pk \"{item['portal']}\" - object does not exist."
+            ]
+        if description_id not in own_descriptions:
+            errors["job_description"] = [
+                f"Invalid pk \"{description_id}\" - object does not exist."
+            ]
+        elif last_index[description_id] != index:
+            errors["job_description"] = [
+                "Repeated later in the same batch."
+            ]
+        elif description_id in existing:
+            if not upsert:
+                errors["job_description"] = [
+                    "job title with this job description already exists."
+                ]
+            elif existing[description_id] != user.id:
+                errors["job_description"] = [
+                    "job description belongs to another user's job title."
+                ]
+
+        if errors:
+            results[index] = {
+                "index": index, "status": ERROR, "errors": errors
+            }
+            continue
+
+        status = UPDATED if description_id in existing else CREATED
+        results[index] = {"index": index, "status": status, "id": None}
+        rows.append(JobTitle(
+            user=user,
+            title=item["title"],
+            portal_id=item["portal"],
+            job_description_id=description_id,
+            last_updated=now,
+        ))
+
+    if rows:
+        _write(rows, upsert=upsert)
+        # MySQL does not return ids from `bulk_create`, read them back
+        ids = dict(
+            JobTitle.objects.filter(
+                job_description_id__in=[row.job_description_id for row in rows]
+            ).values_list("job_description_id", "id")
+        )
+        for result in results:
+            if result["status"] != ERROR:
+                item = items[result["index"]]
+                result["id"] = ids[item["job_description"]]
+
+    return results
+
+
+def _write(rows, upsert):
+    """INSERT (or INSERT ... ON CONFLICT UPDATE) `rows` in one transaction"""
+
+    options = {}
+    if upsert:
+        options = {
+            "update_conflicts": True,
+            "update_fields": ["title", "portal", "last_updated"],
+        }
+        # MySQL's ON DUPLICATE KEY UPDATE takes no conflict target
+        if connection.features.supports_update_conflicts_with_target:
+            options["unique_fields"] = ["job_description"]
+
+    written = JobTitle.objects.filter(
+        job_description_id__in=[row.job_description_id for row in rows]
+    )
+    with transaction.atomic():
+        # an upsert may move existing titles to another portal
+        with rollups.track(job_titles=written):
+            JobTitle.objects.bulk_create(
+                rows, batch_size=WRITE_BATCH_SIZE, **options
+            )
+        # `bulk_create` sends no `post_save`
+        refresh_job_titles(written)
@@ -0,0 +1,143 @@
+"""
+Conditional GET (ETag / Last-Modified / 304) for job title endpoints
+
+Validators are computed without fetching rows:
+
+- list: `max(last_updated)` and `count(*)` of the filtered queryset, one
+  aggregate query answered from the `(user, last_updated)` index
+- detail: `last_updated` of the object, which is fetched anyway
+
+Every write bumps `last_updated` (see `JobTitleViewSet.perform_create` /
+`perform_update`, `job.bulk` and the ingestion writer); a delete lowers the
+count. Portals are shared by the job titles of every user, an edit of one
+does not touch them: with `?expand=portal` the validators also cover
+`max(portal.last_updated)`, through the JOIN the page makes anyway. The
+detail, which shows it, also covers `applicant_count`: applications of
+other users do not bump `last_updated` either. The
+ETag also covers the user and the full request (path, query string,
+accepted media type), so different pages, orderings or expansions never
+share a validator. `Last-Modified` has one second resolution and
+misses deletes; clients should prefer `If-None-Match`, which Django checks
+first when both are sent.
+"""
+
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+# TODO - refer
+# https://docs.djangoproject.com/en/4.1/topics/conditional-view-processing/
+
+# validators of a list, one aggregate query
+LIST_STATE = {"last_modified": Max("last_updated"), "count": Count("id")}
+# added with `?expand=portal`
+PORTAL_STATE = {"portal_modified": Max("portal__last_updated")}
+
+
+def make_etag(request, *parts):
+    """Return a weak ETag of `parts` and what the response depends on"""
+
+    key = "|".join(str(part) for part in (
+        request.user.pk,
+        request.get_full_path(),
+        request.META.get("HTTP_ACCEPT", ""),
+        *parts,
+    ))
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _latest(times):
+    return max((time for time in times if time is not None), default=None)
+
+
+class ConditionalGetMixin:
+    """Answer unchanged `list` / `retrieve` requests with 304
+
+    Validators are checked before pagination and serialization, so a 304
+    costs one query and no serializer work.
+    """
+
+    def list(self, request, *args, **kwargs):
+        state = self.filter_queryset(self.get_queryset()).aggregate(
+            **self.get_list_state()
+        )
+        return self._conditional(
+            request,
+            *self.list_validators(state),
+            lambda: super(ConditionalGetMixin, self).list(
+                request, *args, **kwargs
+            ),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        return self._conditional(
+            request,
+            *self.detail_validators(instance),
+            lambda: Response(self.get_serializer(instance).data),
+        )
+
+    def serves_field(self, name):
+        """Whether the response objects have the field `name` (`?fields=`)"""
+
+        fields = self.get_sparse_fields()
+        return fields is None or name in fields
+
+    def serves_portal(self):
+        """Whether the response nests the portals of the job titles"""
+
+        return "portal" in self.get_expand() and self.serves_field("portal")
+
+    def get_list_state(self):
+        """Return the aggregates validating the list"""
+
+        if self.serves_portal():
+            return {**LIST_STATE, **PORTAL_STATE}
+        return LIST_STATE
+
+    def list_validators(self, state):
+        """Return `(last modified, ETag parts)` of the aggregated list"""
+
+        times = [state["last_modified"], state.get("portal_modified")]
+        return _latest(times), (state["count"], *times)
+
+    def detail_validators(self, instance):
+        """Return `(last modified, ETag parts)` of `instance`"""
+
+        times = [instance.last_updated]
+        if self.serves_portal():
+            # loaded along, see `get_queryset`
+            times.append(instance.portal.last_updated)
+        parts = (instance.pk, *times)
+        if self.serves_field("applicant_count"):
+            # `Last-Modified` misses applications, the ETag does not
+            parts += (instance.applicant_count,)
+        return _latest(times), parts
+
+    def _conditional(self, request, last_modified, parts, respond):
+        """Return 304 if the client is up to date, else `respond()`"""
+
+        not_modified, headers = self.check_conditions(
+            request, last_modified, parts
+        )
+        response = respond() if not_modified is None else not_modified
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    def check_conditions(self, request, last_modified, parts):
+        """Return `(304 response or None, validator headers)`"""
+
+        etag = make_etag(request, *parts)
+        headers = {"ETag": etag}
+        timestamp = last_modified.timestamp() if last_modified else None
+        if timestamp is not None:
+            headers["Last-Modified"] = http_date(timestamp)
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        return not_modified, headers
@@ -0,0 +1,99 @@
+"""
+Streaming export of job titles joined with their description and portal
+
+Rows are read in keyset chunks (`WHERE id > <last id> ORDER BY id LIMIT n`)
+and encoded chunk by chunk into the `StreamingHttpResponse`, so memory is
+bounded by `chunk_size` whatever the number of rows. `QuerySet.iterator()`
+is not enough on its own: mysqlclient buffers the whole result set client
+side, chunked or not.
+"""
+
+import csv
+import io
+import zlib
+
+from core.fast_json import dumps
+
+# output name -> lookup, in column order
+COLUMNS = {
+    "id": "id",
+    "title": "title",
+    "last_updated": "last_updated",
+    "portal_id": "portal_id",
+    "portal_name": "portal__name",
+    "job_description_id": "job_description_id",
+    "role": "job_description__role",
+    "description_text": "job_description__description_text",
+    "pub_date": "job_description__pub_date",
+}
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+CHUNK_SIZE = 2000
+
+
+def export_rows(queryset, chunk_size=CHUNK_SIZE):
+    """Yield lists of up to `chunk_size` row tuples of `queryset`, by id"""
+
+    rows = queryset.order_by("id").values_list(*COLUMNS.values())
+    last_id = 0
+    while True:
+        chunk = list(rows.filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1][0]
+
+
+def _isoformat(row):
+    return [
+        value.isoformat() if hasattr(value, "isoformat") else value
+        for value in row
+    ]
+
+
+def ndjson_chunks(chunks):
+    """Encode row chunks as newline delimited JSON objects"""
+
+    names = list(COLUMNS)
+    for chunk in chunks:
+        yield b"".join(
+            dumps(dict(zip(names, _isoformat(row)))) + b"\n"
+            for row in chunk
+        )
+
+
+def csv_chunks(chunks):
+    """Encode row chunks as CSV, with a header line"""
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for chunk in chunks:
+        writer.writerows(_isoformat(row) for row in chunk)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def gzip_chunks(chunks, level=6):
+    """gzip a stream of byte chunks on the fly"""
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(queryset, output="ndjson", gzip=False,
+                  chunk_size=CHUNK_SIZE):
+    """Return the byte chunks of `queryset` exported as `output`"""
+
+    encoder = ndjson_chunks if output == "ndjson" else csv_chunks
+    stream = encoder(export_rows(queryset, chunk_size))
+    return gzip_chunks(stream) if gzip else stream
@@ -0,0 +1,80 @@
+"""
+Filters of the job title list
+
+Every filter is an index range or equality under the per user scoping,
+and composes with the `-id` keyset pagination. With an equality (or no
+filter) a page is read in index order and costs the same at any depth. A
+range is either walked in `(user, id)` order, skipping rows out of range,
+or read from its own index and the matches sorted, as the planner
+estimates cheaper:
+
+- `portal`: `(user, portal, id)`, walked in page order like the unfiltered
+  list walks `(user, id)`. A portal name is matched through the unique
+  index on `Portal.name`, without a query of its own.
+- `title_prefix`: a range of `(user, title)`. On MySQL `LIKE 'prefix%'`,
+  which its case insensitive collation reads as an index range; a range
+  ending at the next code point would sort punctuation (`Dez` -> `De{`)
+  before letters and digits there. Elsewhere (SQLite, binary collations)
+  the range `prefix <= title < next prefix`, as `LIKE` is never indexed
+  on SQLite.
+- `last_updated_*`: a range of `(user, last_updated)`
+- `pub_date_*`: job descriptions are read by primary key from the titles
+  walked in `(user, id)` order
+
+`job/tests/test_filters.py` checks the plans with EXPLAIN.
+"""
+
+import sys
+
+from django.db import connection
+
+# query parameters, an unfiltered list skips their validation
+FILTERS = (
+    "portal", "title_prefix", "last_updated_after", "last_updated_before",
+    "pub_date_after", "pub_date_before",
+)
+
+
+def prefix_range(prefix):
+    """Return (lowest, above) strings of the `prefix` range, `above` None
+    when unbounded"""
+
+    for end in range(len(prefix), 0, -1):
+        code = ord(prefix[end - 1]) + 1
+        if 0xD800 <= code <= 0xDFFF:
+            # surrogates can not be encoded
+            code = 0xE000
+        if code <= sys.maxunicode:
+            return prefix, prefix[:end - 1] + chr(code)
+    return prefix, None
+
+
+def filter_job_titles(queryset, params):
+    """Apply the validated list filters `params` to `queryset`"""
+
+    portal = params.get("portal")
+    if portal is not None:
+        if portal.isdigit():
+            queryset = queryset.filter(portal_id=int(portal))
+        else:
+            queryset = queryset.filter(portal__name=portal)
+
+    prefix = params.get("title_prefix")
+    if prefix and connection.vendor == "mysql":
+        queryset = queryset.filter(title__istartswith=prefix)
+    elif prefix:
+        lowest, above = prefix_range(prefix)
+        queryset = queryset.filter(title__gte=lowest)
+        if above is not None:
+            queryset = queryset.filter(title__lt=above)
+
+    ranges = {
+        "last_updated__gte": "last_updated_after",
+        "last_updated__lte": "last_updated_before",
+        "job_description__pub_date__gte": "pub_date_after",
+        "job_description__pub_date__lte": "pub_date_before",
+    }
+    for lookup, name in ranges.items():
+        if params.get(name) is not None:
+            queryset = queryset.filter(**{lookup: params[name]})
+    return queryset
@@ -0,0 +1,232 @@
+"""
+Pagination classes for Job API
+"""
+
+from collections import OrderedDict
+
+from django.core import signing
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    CursorPagination,
+    Cursor,
+    LimitOffsetPagination,
+    _reverse_ordering,
+)
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+# TODO - refer
+# https://www.django-rest-framework.org/api-guide/pagination/#cursorpagination
+
+
+class JobTitleCursorPagination(CursorPagination):
+    """Keyset pagination for job titles
+
+    Each page is fetched with `WHERE id < <last seen id> ORDER BY id DESC
+    LIMIT n`, so page 1000 costs the same as page 1 (no OFFSET scan).
+
+    The cursor handed to the client is signed with `SECRET_KEY`; a cursor
+    that was modified, or that was issued for another ordering, is rejected
+    with 404 instead of being trusted.
+    """
+
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+    ordering = "-id"
+    ordering_query_param = "ordering"
+    ordering_query_description = "Order by `-id` (default) or `-last_updated`."
+
+    # `id` is appended to `last_updated` as a tie breaker, only the
+    # first column is used as the keyset position.
+    orderings = {
+        "-id": ("-id",),
+        "-last_updated": ("-last_updated", "-id"),
+    }
+
+    signing_salt = "job.pagination.JobTitleCursorPagination"
+
+    # `CursorPagination.paginate_queryset`, split around the one query so
+    # async views can fetch the page with the async ORM
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page = self.get_page_queryset(queryset, request, view)
+        if page is None:
+            return None
+        return self.set_page(list(page))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        page = self.get_page_queryset(queryset, request, view)
+        if page is None:
+            return None
+        return self.set_page([row async for row in page])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """Return the rows to fetch: the page plus one, or None"""
+
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        offset, reverse, position = self.cursor or (0, False, None)
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            order = self.ordering[0]
+            # (cursor reversed) XOR (ordering reversed)
+            lookup = "lt" if reverse != order.startswith("-") else "gt"
+            queryset = queryset.filter(
+                **{f"{order.lstrip('-')}__{lookup}": position}
+            )
+        return queryset[offset:offset + self.page_size + 1]
+
+    def set_page(self, results):
+        """Set the next / previous positions from the fetched rows"""
+
+        offset, reverse, position = self.cursor or (0, False, None)
+        self.page = list(results[:self.page_size])
+
+        has_following = len(results) > len(self.page)
+        following = None
+        if has_following:
+            following = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+        at_start = position is None and offset == 0
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = not at_start
+            self.has_previous = has_following
+            self.next_position = position
+            self.previous_position = following
+        else:
+            self.has_next = has_following
+            self.has_previous = not at_start
+            self.next_position = following
+            self.previous_position = position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        """Return the ordering requested by the client (default `-id`)"""
+
+        self.ordering_key = request.query_params.get(
+            self.ordering_query_param, self.ordering
+        )
+        if self.ordering_key not in self.orderings:
+            raise NotFound("Invalid ordering")
+        return self.orderings[self.ordering_key]
+
+    def decode_cursor(self, request):
+        """Verify the signature and return a `Cursor` instance"""
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            tokens = signing.loads(encoded, salt=self.signing_salt)
+            if tokens.get("k") != self.ordering_key:
+                raise ValueError("cursor issued for another ordering")
+            offset = int(tokens.get("o", 0))
+            if offset < 0 or offset > self.offset_cutoff:
+                raise ValueError("cursor offset out of range")
+            reverse = bool(tokens.get("r", False))
+            position = tokens.get("p")
+        except (signing.BadSignature, AttributeError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return Cursor(offset=offset, reverse=reverse, position=position)
+
+    def encode_cursor(self, cursor):
+        """Return the url with a signed, opaque cursor"""
+
+        tokens = {"k": self.ordering_key}
+        if cursor.offset != 0:
+            tokens["o"] = cursor.offset
+        if cursor.reverse:
+            tokens["r"] = 1
+        if cursor.position is not None:
+            tokens["p"] = cursor.position
+
+        encoded = signing.dumps(tokens, salt=self.signing_salt, compress=True)
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters.append(
+            {
+                "name": self.ordering_query_param,
+                "required": False,
+                "in": "query",
+                "description": self.ordering_query_description,
+                "schema": {
+                    "type": "string",
+                    "enum": list(self.orderings),
+                },
+            }
+        )
+        return parameters
+
+
+class JobTitleSearchPagination(LimitOffsetPagination):
+    """Limit/offset pages of ranked search results
+
+    Ranked results have no stable key to seek on, so deep pages are capped
+    with `max_offset` instead, a deeper offset is a 404. The total `count`
+    is not computed, it would cost as much as the search itself; `next` is
+    known from fetching one row more than the page.
+    """
+
+    default_limit = 20
+    max_limit = 100
+    max_offset = 1000
+    # the browsable API page controls need `count`
+    template = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.offset = self.get_offset(request)
+        if self.offset > self.max_offset:
+            raise NotFound(f"Offset at most {self.max_offset}.")
+        rows = list(queryset[self.offset:self.offset + self.limit + 1])
+        self.has_next = (
+            len(rows) > self.limit
+            and self.offset + self.limit <= self.max_offset
+        )
+        return rows[:self.limit]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(
+            url, self.offset_query_param, self.offset + self.limit
+        )
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        del response_schema["properties"]["count"]
+        return response_schema
@@ -2,14 +2,65 @@
 Serializers for Job API
 """
 
+from datetime import timedelta
+
+from django.utils import timezone
 from rest_framework import serializers
-from core.models import JobTitle, Portal
+from core.fieldsets import SparseFieldsMixin
+from core.models import (
+    Application,
+    JobDescription,
+    JobTitle,
+    JobTitleSearchDocument,
+    Portal,
+)
+
+
+class PortalSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Portal
+        fields = ["id", "name", "description"]
+        read_only_fields = ["id"]
+
+
+class JobDescriptionSerializer(serializers.ModelSerializer):
+    """Serializer class for an expanded JobDescription"""
+
+    class Meta:
+        model = JobDescription
+        fields = ["id", "role", "description_text", "pub_date"]
+        read_only_fields = fields
+
+
+class ExpandableFieldsMixin:
+    """Serialize the related objects listed in the `expand` context entry
+
+    `expandable_fields` maps a field name to the serializer of the nested
+    object. The view must `select_related` the expanded relations, nesting
+    never queries per object.
+    """
+
+    expandable_fields = {}
 
+    def get_fields(self):
+        fields = super().get_fields()
+        for name in self.context.get("expand", ()):
+            fields[name] = self.expandable_fields[name](read_only=True)
+        return fields
 
-class JobTitleSerializer(serializers.ModelSerializer):
+
+class JobTitleSerializer(
+    SparseFieldsMixin, ExpandableFieldsMixin, serializers.ModelSerializer
+):
     """
     Serializer class for JobTitle list view
     """
+
+    expandable_fields = {
+        "job_description": JobDescriptionSerializer,
+        "portal": PortalSerializer,
+    }
+
     class Meta:
         model = JobTitle
         fields = ["id", "title"]
@@ -27,13 +78,183 @@ class JobTitleDetailSerializer(JobTitleSerializer):
 
     class Meta(JobTitleSerializer.Meta):
         fields = JobTitleSerializer.Meta.fields + [
-            "job_description", "portal"
+            "job_description", "portal", "applicant_count"
+        ]
+        read_only_fields = JobTitleSerializer.Meta.read_only_fields + [
+            "applicant_count"
         ]
 
 
-class PortalSerializer(serializers.ModelSerializer):
+class JobTitleBulkItemSerializer(serializers.Serializer):
+    """One item of a bulk create / upsert request
+
+    `portal` and `job_description` are plain integers here, their existence
+    is checked for the whole batch at once in `job.bulk`.
+    """
+
+    title = serializers.CharField(max_length=250)
+    portal = serializers.IntegerField(min_value=1)
+    job_description = serializers.IntegerField(min_value=1)
+
+
+class JobTitleBulkResultSerializer(serializers.Serializer):
+    """Outcome of one item of a bulk create / upsert request"""
+
+    index = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=["created", "updated", "error"])
+    id = serializers.IntegerField(required=False, allow_null=True)
+    errors = serializers.DictField(
+        child=serializers.ListField(child=serializers.CharField()),
+        required=False,
+    )
+
+
+class JobTitleSearchQuerySerializer(serializers.Serializer):
+    """Query parameters of the job title search"""
+
+    q = serializers.CharField(
+        max_length=250,
+        help_text='Words are AND-ed, "quoted words" match as a phrase, '
+                  "`word*` matches as a prefix.",
+    )
+    portal = serializers.IntegerField(required=False, min_value=1)
+    pub_date_after = serializers.DateTimeField(required=False)
+    pub_date_before = serializers.DateTimeField(required=False)
+
+
+class JobTitleListQuerySerializer(serializers.Serializer):
+    """Filters of the job title list, see `job.filters`"""
+
+    portal = serializers.CharField(
+        required=False,
+        max_length=250,
+        help_text="Portal id, or portal name.",
+    )
+    title_prefix = serializers.CharField(
+        required=False,
+        max_length=250,
+        help_text="Titles starting with this text, compared as the "
+                  "database collation compares them (case-insensitive on "
+                  "MySQL).",
+    )
+    last_updated_after = serializers.DateTimeField(required=False)
+    last_updated_before = serializers.DateTimeField(required=False)
+    pub_date_after = serializers.DateTimeField(
+        required=False, help_text="Of the job description."
+    )
+    pub_date_before = serializers.DateTimeField(
+        required=False, help_text="Of the job description."
+    )
+
+
+class JobTitleSearchResultSerializer(serializers.ModelSerializer):
+    """One ranked job title search hit"""
+
+    id = serializers.IntegerField(source="job_title_id", read_only=True)
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = JobTitleSearchDocument
+        fields = ["id", "title", "portal", "pub_date", "rank"]
+        read_only_fields = fields
+
+
+class JobTitleExportQuerySerializer(serializers.Serializer):
+    """Query parameters of the job title export"""
+
+    output = serializers.ChoiceField(
+        choices=["ndjson", "csv"],
+        default="ndjson",
+        help_text="One JSON object per line, or CSV with a header line.",
+    )
+    gzip = serializers.BooleanField(
+        default=False, help_text="Download a gzip compressed file."
+    )
+
+
+class ApplicationSerializer(serializers.ModelSerializer):
+    """A user's application for a job title"""
+
+    class Meta:
+        model = Application
+        fields = ["id", "job_title", "cover_letter", "applied_at"]
+        read_only_fields = ["id", "job_title", "applied_at"]
+
+
+class JobTitleTopSerializer(serializers.ModelSerializer):
+    """Job title ranked by its number of applicants"""
+
+    class Meta:
+        model = JobTitle
+        fields = ["id", "title", "applicant_count"]
+        read_only_fields = fields
+
+
+class PostingAnalyticsQuerySerializer(serializers.Serializer):
+    """Query parameters of the posting analytics"""
+
+    # longest range of one request, in days
+    max_days = 3660
+
+    start = serializers.DateField(
+        required=False, help_text="First day, 29 days before `end` if omitted."
+    )
+    end = serializers.DateField(
+        required=False, help_text="Last day, today if omitted."
+    )
+    bucket = serializers.ChoiceField(
+        choices=["day", "week", "month"],
+        default="day",
+        help_text="Weeks start on Monday.",
+    )
+    group_by = serializers.ChoiceField(
+        choices=["portal"],
+        required=False,
+        help_text="One job title series per portal instead of the totals.",
+    )
+
+    def validate(self, attrs):
+        end = attrs.get("end") or timezone.localdate()
+        start = attrs.get("start") or end - timedelta(days=29)
+        if start > end:
+            raise serializers.ValidationError(
+                {"start": ["Must not be after `end`."]}
+            )
+        if (end - start).days >= self.max_days:
+            raise serializers.ValidationError(
+                {"start": [f"At most {self.max_days} days per request."]}
+            )
+        return {**attrs, "start": start, "end": end}
+
+
+class PortalNameSerializer(serializers.ModelSerializer):
     class Meta:
         model = Portal
-        fields = ["name", "description"]
-        read_only_fields = ["id"]
+        fields = ["id", "name"]
+        read_only_fields = fields
+
+
+class PostingSeriesSerializer(serializers.Serializer):
+    """Counts of one series, one per bucket"""
+
+    portal = PortalNameSerializer(
+        allow_null=True, help_text="`null` for the user's totals."
+    )
+    job_titles = serializers.ListField(child=serializers.IntegerField())
+    job_descriptions = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        help_text="Totals only, descriptions belong to no portal.",
+    )
+
+
+class PostingAnalyticsSerializer(serializers.Serializer):
+    """New postings per bucket"""
 
+    start = serializers.DateField()
+    end = serializers.DateField()
+    bucket = serializers.CharField()
+    buckets = serializers.ListField(
+        child=serializers.DateField(), help_text="First day of each bucket."
+    )
+    series = PostingSeriesSerializer(many=True)
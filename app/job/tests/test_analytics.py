@@ -0,0 +1,163 @@
+"""Tests for the posting analytics endpoint"""
+
+from datetime import date, datetime, timezone as dt_timezone
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import JobDescription, JobTitle, Portal
+from job.analytics import bucket_starts, bucketize
+
+ANALYTICS_URL = reverse("jobtitle:analytics")
+
+
+def at(day):
+    return datetime(day.year, day.month, day.day, 10, tzinfo=dt_timezone.utc)
+
+
+class BucketTests(SimpleTestCase):
+    """Test summing daily counts into buckets"""
+
+    def test_weeks_start_on_monday(self):
+        # 2023-02-01 is a Wednesday
+        starts = bucket_starts(date(2023, 2, 1), date(2023, 2, 13), "week")
+
+        self.assertEqual(
+            starts.tolist(),
+            [date(2023, 1, 30), date(2023, 2, 6), date(2023, 2, 13)],
+        )
+
+    def test_bucketize(self):
+        days = np.array(
+            ["2023-01-31", "2023-02-01", "2023-02-01", "2023-03-05"],
+            dtype="datetime64[D]",
+        )
+        counts = np.array([1, 2, 3, 4])
+        start, end = date(2023, 1, 31), date(2023, 3, 5)
+
+        months = bucketize(days, counts, start, end, "month")
+        by_day = bucketize(days, counts, start, end, "day")
+        series = bucketize(
+            days, counts, start, end, "month",
+            series=[0, 1, 0, 1], num_series=2,
+        )
+
+        self.assertEqual(months.tolist(), [[1, 5, 4]])
+        self.assertEqual(by_day.shape, (1, 34))
+        self.assertEqual(by_day.sum(), 10)
+        self.assertEqual(series.tolist(), [[1, 3, 0], [0, 2, 4]])
+
+
+class PostingAnalyticsApiTests(TestCase):
+    """Test the posting analytics endpoint"""
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@example.com",
+            "password@321"
+        )
+        self.client.force_authenticate(self.user)
+        self.naukri, self.indeed = [
+            Portal.objects.create(
+                user=self.user, name=name, description="job portal"
+            )
+            for name in ("naukri.com", "indeed.com")
+        ]
+
+    def create_posting(self, day, portal, user=None):
+        user = user or self.user
+        description = JobDescription.objects.create(
+            user=user, role="role", description_text="git, Linux",
+            pub_date=at(day),
+        )
+        return JobTitle.objects.create(
+            user=user, title="title", portal=portal,
+            job_description=description,
+        )
+
+    def test_auth_required(self):
+        res = APIClient().get(ANALYTICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_totals(self):
+        self.create_posting(date(2023, 2, 1), self.naukri)
+        self.create_posting(date(2023, 2, 1), self.indeed)
+        self.create_posting(date(2023, 2, 7), self.naukri)
+        # outside the range
+        self.create_posting(date(2023, 3, 1), self.naukri)
+        JobDescription.objects.create(
+            user=self.user, role="role", description_text="text",
+            pub_date=at(date(2023, 2, 2)),
+        )
+
+        res = self.client.get(ANALYTICS_URL, {
+            "start": "2023-02-01", "end": "2023-02-14", "bucket": "week",
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data["buckets"], ["2023-01-30", "2023-02-06", "2023-02-13"]
+        )
+        self.assertEqual(res.data["series"], [{
+            "portal": None,
+            "job_titles": [2, 1, 0],
+            "job_descriptions": [3, 1, 0],
+        }])
+
+    def test_group_by_portal(self):
+        self.create_posting(date(2023, 2, 1), self.naukri)
+        self.create_posting(date(2023, 2, 2), self.indeed)
+        self.create_posting(date(2023, 2, 2), self.indeed)
+
+        res = self.client.get(ANALYTICS_URL, {
+            "start": "2023-02-01", "end": "2023-02-02",
+            "group_by": "portal",
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["series"], [
+            {"portal": {"id": self.indeed.id, "name": "indeed.com"},
+             "job_titles": [0, 2]},
+            {"portal": {"id": self.naukri.id, "name": "naukri.com"},
+             "job_titles": [1, 0]},
+        ])
+
+    def test_other_users_not_counted(self):
+        other = get_user_model().objects.create_user(
+            "other@example.com", "password@321"
+        )
+        self.create_posting(date(2023, 2, 1), self.naukri, user=other)
+
+        res = self.client.get(ANALYTICS_URL, {
+            "start": "2023-02-01", "end": "2023-02-01",
+        })
+
+        self.assertEqual(res.data["series"][0]["job_titles"], [0])
+
+    def test_one_query_whatever_the_posting_count(self):
+        for _ in range(5):
+            self.create_posting(date(2023, 2, 1), self.naukri)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(ANALYTICS_URL, {
+                "start": "2023-02-01", "end": "2023-02-28",
+                "group_by": "portal",
+            })
+
+        self.assertEqual(sum(res.data["series"][0]["job_titles"]), 5)
+
+    def test_invalid_range(self):
+        for params in (
+            {"start": "2023-02-02", "end": "2023-02-01"},
+            {"start": "2000-01-01", "end": "2023-02-01"},
+            {"bucket": "year"},
+        ):
+            res = self.client.get(ANALYTICS_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,158 @@
+"""Tests for job applications and applicant counters"""
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Application, JobTitle, Portal, JobDescription
+
+
+TOP_URL = reverse("jobtitle:jobtitle-top")
+
+
+def apply_url(job_title_id):
+    return reverse("jobtitle:jobtitle-apply", args=[job_title_id])
+
+
+def create_user(email):
+    return get_user_model().objects.create_user(email, "password@321")
+
+
+class ApplicationApiTests(TestCase):
+    """Test applying for job titles"""
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.owner = create_user("owner@example.com")
+        self.portal = Portal.objects.create(
+            user=self.owner, name="naukri.com", description="job portal"
+        )
+        self.job_titles = [
+            self.create_job_title(f"title {number}") for number in range(3)
+        ]
+        self.applicant = create_user("applicant@example.com")
+        self.client.force_authenticate(self.applicant)
+
+    def create_job_title(self, title):
+        description = JobDescription.objects.create(
+            user=self.owner, role=title, description_text="git, Linux"
+        )
+        return JobTitle.objects.create(
+            user=self.owner, title=title, portal=self.portal,
+            job_description=description,
+        )
+
+    def count_of(self, job_title):
+        job_title.refresh_from_db()
+        return job_title.applicant_count
+
+    def apply_as(self, user, job_title):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.post(apply_url(job_title.id))
+
+    def test_apply(self):
+        job_title = self.job_titles[0]
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(
+                apply_url(job_title.id), {"cover_letter": "Hire me"}
+            )
+        # one UPDATE and one INSERT, no SELECT (savepoints left out)
+        statements = [
+            query["sql"].split()[0] for query in queries
+            if "SAVEPOINT" not in query["sql"]
+        ]
+        self.assertEqual(statements, ["UPDATE", "INSERT"])
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["job_title"], job_title.id)
+        application = Application.objects.get()
+        self.assertEqual(application.user, self.applicant)
+        self.assertEqual(application.cover_letter, "Hire me")
+        self.assertEqual(self.count_of(job_title), 1)
+
+    def test_apply_twice(self):
+        job_title = self.job_titles[0]
+        self.client.post(apply_url(job_title.id))
+
+        res = self.client.post(apply_url(job_title.id))
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(self.count_of(job_title), 1)
+        self.assertEqual(Application.objects.count(), 1)
+
+    def test_apply_missing_job_title(self):
+        res = self.client.post(apply_url(999999))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Application.objects.exists())
+
+    def test_withdraw(self):
+        job_title = self.job_titles[0]
+        self.client.post(apply_url(job_title.id))
+
+        res = self.client.delete(apply_url(job_title.id))
+        again = self.client.delete(apply_url(job_title.id))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(again.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.count_of(job_title), 0)
+
+    def test_deleted_user_decrements(self):
+        job_title = self.job_titles[0]
+        other = create_user("other@example.com")
+        self.apply_as(self.applicant, job_title)
+        self.apply_as(other, job_title)
+
+        other.delete()
+
+        self.assertEqual(self.count_of(job_title), 1)
+
+    def test_apply_revalidates_detail(self):
+        """Test an application changes the owner's ETag, not the list"""
+
+        job_title = self.job_titles[0]
+        before = job_title.last_updated
+        owner = APIClient()
+        owner.force_authenticate(self.owner)
+        url = reverse("jobtitle:jobtitle-detail", args=[job_title.id])
+        res = owner.get(url)
+
+        self.client.post(apply_url(job_title.id))
+
+        again = owner.get(url, HTTP_IF_NONE_MATCH=res["ETag"])
+        self.assertEqual(again.status_code, status.HTTP_200_OK)
+        self.assertEqual(again.data["applicant_count"], 1)
+        # the owner's list order and filters are left alone
+        job_title.refresh_from_db()
+        self.assertEqual(job_title.last_updated, before)
+
+    def test_top(self):
+        users = [create_user(f"user{number}@example.com")
+                 for number in range(3)]
+        for job_title, applicants in zip(self.job_titles, [1, 3, 2]):
+            for user in users[:applicants]:
+                self.apply_as(user, job_title)
+        self.client.force_authenticate(self.owner)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(TOP_URL, {"limit": 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(item["id"], item["applicant_count"]) for item in res.data],
+            [(self.job_titles[1].id, 3), (self.job_titles[2].id, 2)],
+        )
+
+    def test_top_invalid_limit(self):
+        for limit in ("0", "101", "ten"):
+            with self.subTest(limit=limit):
+                res = self.client.get(TOP_URL, {"limit": limit})
+                self.assertEqual(
+                    res.status_code, status.HTTP_400_BAD_REQUEST
+                )
@@ -0,0 +1,181 @@
+"""Run the job title API tests against the async views"""
+
+import importlib
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.test import TestCase, override_settings
+from django.urls import clear_url_caches, reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from core.asgi import ASGIHandler
+from core.models import JobDescription, JobTitle, Portal
+from job.async_views import AsyncJobTitleViewSet
+from job.tests import (
+    test_conditional,
+    test_expand,
+    test_fieldsets,
+    test_job_api,
+    test_pagination,
+)
+from user.authentication import token_cache
+
+JOB_TITLE_URL = reverse("jobtitle:jobtitle-list")
+
+
+def auth_headers(key):
+    # `AsyncClient` (Django 4.1) sends extra keyword arguments as headers
+    return {"authorization": f"Token {key}"}
+
+
+async def asgi_get(path, headers):
+    """GET `path` through `core.asgi.ASGIHandler`, return the messages"""
+
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http", "method": "GET", "path": path, "query_string": b"",
+        "headers": [(b"host", b"testserver"), *headers],
+    }
+    # as the test client does, the test's transaction stays open
+    request_started.disconnect(close_old_connections)
+    request_finished.disconnect(close_old_connections)
+    try:
+        await ASGIHandler()(scope, receive, send)
+    finally:
+        request_started.connect(close_old_connections)
+        request_finished.connect(close_old_connections)
+    return messages
+
+
+def reload_urlconfs():
+    for name in ("job.urls", "user.urls", "app.urls"):
+        importlib.reload(importlib.import_module(name))
+    clear_url_caches()
+
+
+class AsyncViewsMixin:
+    """Route the API to the async views for the tests of the class"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls._async_views = override_settings(ASYNC_VIEWS=True)
+        cls._async_views.enable()
+        reload_urlconfs()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls._async_views.disable()
+        reload_urlconfs()
+
+
+class AsyncPublicJobTitleApiTests(
+    AsyncViewsMixin, test_job_api.PublicJobTitleApiTests
+):
+    pass
+
+
+class AsyncPrivateJobTitleApiTests(
+    AsyncViewsMixin, test_job_api.PrivateJobTitleApiTests
+):
+    pass
+
+
+class AsyncConditionalGetTests(
+    AsyncViewsMixin, test_conditional.ConditionalGetTests
+):
+    pass
+
+
+class AsyncJobTitleCursorPaginationTests(
+    AsyncViewsMixin, test_pagination.JobTitleCursorPaginationTests
+):
+    pass
+
+
+class AsyncExpandApiTests(AsyncViewsMixin, test_expand.ExpandApiTests):
+    pass
+
+
+class AsyncSparseFieldsApiTests(
+    AsyncViewsMixin, test_fieldsets.SparseFieldsApiTests
+):
+    pass
+
+
+class AsgiJobTitleApiTests(AsyncViewsMixin, TestCase):
+    """Test the async views through the ASGI handler with token auth"""
+
+    def setUp(self) -> None:
+        token_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            "test@example.com",
+            "password@321"
+        )
+        self.token = Token.objects.create(user=self.user)
+        portal = Portal.objects.create(
+            user=self.user, name="naukri.com", description="job portal"
+        )
+        self.job_title = JobTitle.objects.create(
+            user=self.user, title="Python Developer", portal=portal,
+            job_description=JobDescription.objects.create(
+                user=self.user, role="role", description_text="text"
+            ),
+        )
+
+    def test_routes_to_async_views(self):
+        from job import urls
+
+        self.assertIs(urls.router.registry[0][1], AsyncJobTitleViewSet)
+
+    async def test_list_and_retrieve(self):
+        res = await self.async_client.get(
+            JOB_TITLE_URL, **auth_headers(self.token.key)
+        )
+        detail = await self.async_client.get(
+            reverse("jobtitle:jobtitle-detail", args=[self.job_title.id]),
+            **auth_headers(self.token.key),
+        )
+        missing = await self.async_client.get(
+            reverse("jobtitle:jobtitle-detail", args=[0]),
+            **auth_headers(self.token.key),
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["id"] for item in res.json()["results"]],
+            [self.job_title.id],
+        )
+        self.assertEqual(detail.json()["title"], "Python Developer")
+        self.assertEqual(missing.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_export(self):
+        # `AsyncClient` does not send the body, the handler of `app.asgi`
+        # reads it while it is sent
+        messages = await asgi_get(
+            reverse("jobtitle:jobtitle-export"),
+            [(b"authorization", f"Token {self.token.key}".encode())],
+        )
+
+        self.assertEqual(messages[0]["status"], status.HTTP_200_OK)
+        body = b"".join(message.get("body", b"") for message in messages)
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row["id"] for row in rows], [self.job_title.id])
+
+    async def test_invalid_token(self):
+        res = await self.async_client.get(
+            JOB_TITLE_URL, **auth_headers("nope")
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
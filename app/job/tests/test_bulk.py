@@ -0,0 +1,165 @@
+"""Tests for the bulk job title endpoint"""
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import JobTitle, Portal, JobDescription
+
+
+BULK_URL = reverse("jobtitle:jobtitle-bulk")  # /api/jobtitle/jobtitles/bulk/
+
+
+def create_job_description(user, **params):
+    """create and return new job description"""
+
+    defaults = {
+        "user": user,
+        "role": "Simple Job Title",
+        "description_text": "should know git,CICD, Linux and must know Python",
+    }
+    defaults.update(params)
+    return JobDescription.objects.create(**defaults)
+
+
+class BulkJobTitleApiTests(TestCase):
+    """Test bulk create / upsert of job titles"""
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@example.com",
+            "password@321"
+        )
+        self.portal = Portal.objects.create(
+            user=self.user,
+            name="naukri.com",
+            description="famous job hunting website"
+        )
+        self.descriptions = [
+            create_job_description(self.user) for _ in range(5)
+        ]
+        self.client.force_authenticate(self.user)
+
+    def payload(self, *titles):
+        return [
+            {
+                "title": title,
+                "portal": self.portal.id,
+                "job_description": description.id,
+            }
+            for title, description in zip(titles, self.descriptions)
+        ]
+
+    def test_bulk_create(self):
+        """Test creating many titles in one request"""
+
+        payload = self.payload("a", "b", "c", "d", "e")
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["status"] for item in res.data], ["created"] * 5
+        )
+        for item, sent in zip(res.data, payload):
+            job_title = JobTitle.objects.get(id=item["id"])
+            self.assertEqual(job_title.title, sent["title"])
+            self.assertEqual(job_title.user, self.user)
+
+    def test_query_count_independent_of_item_count(self):
+        """Test a request costs the same number of queries at any size"""
+
+        self.descriptions += [
+            create_job_description(self.user) for _ in range(10)
+        ]
+        # sizes within one write batch: 15 titles have 240 LSH bucket rows,
+        # one INSERT even under SQLite's 999 parameter limit
+        counts = {}
+        for size in (1, 5, 15):
+            JobTitle.objects.all().delete()
+            titles = [f"title {number}" for number in range(size)]
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.post(
+                    BULK_URL, self.payload(*titles), format="json"
+                )
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(JobTitle.objects.count(), size)
+            counts[size] = len(queries)
+
+        self.assertEqual(counts[5], counts[1], counts)
+        self.assertEqual(counts[15], counts[1], counts)
+
+    def test_per_item_errors(self):
+        """Test invalid items are reported, valid items still written"""
+
+        other_user = get_user_model().objects.create_user(
+            "other@example.com",
+            "password@321"
+        )
+        foreign = create_job_description(other_user)
+        payload = self.payload("ok") + [
+            {"title": "", "portal": self.portal.id,
+             "job_description": self.descriptions[1].id},
+            {"title": "bad portal", "portal": 999999,
+             "job_description": self.descriptions[2].id},
+            {"title": "foreign", "portal": self.portal.id,
+             "job_description": foreign.id},
+            "not an object",
+        ]
+
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        statuses = [item["status"] for item in res.data]
+        self.assertEqual(statuses, ["created"] + ["error"] * 4)
+        self.assertIn("title", res.data[1]["errors"])
+        self.assertIn("portal", res.data[2]["errors"])
+        self.assertIn("job_description", res.data[3]["errors"])
+        self.assertEqual(JobTitle.objects.count(), 1)
+
+    def test_conflict_without_upsert(self):
+        """Test an existing job description is an error without upsert"""
+
+        self.client.post(BULK_URL, self.payload("a"), format="json")
+        res = self.client.post(BULK_URL, self.payload("b"), format="json")
+
+        self.assertEqual(res.data[0]["status"], "error")
+        self.assertEqual(JobTitle.objects.get().title, "a")
+
+    def test_upsert_updates_existing(self):
+        """Test upsert updates the title of an existing job description"""
+
+        first = self.client.post(BULK_URL, self.payload("a"), format="json")
+        res = self.client.post(
+            BULK_URL + "?upsert=true", self.payload("b", "c"), format="json"
+        )
+
+        self.assertEqual(
+            [item["status"] for item in res.data], ["updated", "created"]
+        )
+        self.assertEqual(res.data[0]["id"], first.data[0]["id"])
+        self.assertEqual(
+            JobTitle.objects.get(id=res.data[0]["id"]).title, "b"
+        )
+        self.assertEqual(JobTitle.objects.count(), 2)
+
+    def test_repeated_job_description_last_wins(self):
+        """Test the last of two items with one job description is kept"""
+
+        payload = self.payload("a") + self.payload("b")
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(
+            [item["status"] for item in res.data], ["error", "created"]
+        )
+        self.assertEqual(JobTitle.objects.get().title, "b")
+
+    def test_list_required(self):
+        """Test a non list body is rejected"""
+
+        res = self.client.post(BULK_URL, {"title": "a"}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
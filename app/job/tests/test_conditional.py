@@ -0,0 +1,174 @@
+"""Tests for conditional GET on the job title endpoints"""
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import JobTitle, Portal, JobDescription
+
+
+JOB_TITLE_URL = reverse("jobtitle:jobtitle-list")
+
+
+def detail_url(job_title_id):
+    return reverse("jobtitle:jobtitle-detail", args=[job_title_id])
+
+
+class ConditionalGetTests(TestCase):
+    """Test ETag / Last-Modified validation"""
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@example.com",
+            "password@321"
+        )
+        self.portal = Portal.objects.create(
+            user=self.user, name="naukri.com", description="job portal"
+        )
+        self.client.force_authenticate(self.user)
+        self.job_title = self.create_job_title("Python Developer")
+
+    def create_job_title(self, title, **params):
+        description = JobDescription.objects.create(
+            user=self.user, role=title, description_text="git, Linux"
+        )
+        return JobTitle.objects.create(
+            user=self.user, title=title, portal=self.portal,
+            job_description=description, **params
+        )
+
+    def revalidate(self, url, res, **params):
+        return self.client.get(
+            url, params, HTTP_IF_NONE_MATCH=res["ETag"]
+        )
+
+    def test_list_not_modified(self):
+        res = self.client.get(JOB_TITLE_URL)
+
+        self.assertTrue(res["ETag"].startswith('W/"'))
+        self.assertEqual(
+            res["Last-Modified"],
+            http_date(self.job_title.last_updated.timestamp()),
+        )
+        with self.assertNumQueries(1):
+            again = self.revalidate(JOB_TITLE_URL, res)
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(again["ETag"], res["ETag"])
+        self.assertEqual(again.content, b"")
+
+    def test_detail_not_modified(self):
+        url = detail_url(self.job_title.id)
+        res = self.client.get(url)
+
+        again = self.revalidate(url, res)
+
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_if_modified_since(self):
+        res = self.client.get(
+            JOB_TITLE_URL,
+            HTTP_IF_MODIFIED_SINCE=http_date(
+                (timezone.now() + timedelta(minutes=1)).timestamp()
+            ),
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_create_changes_list_etag(self):
+        res = self.client.get(JOB_TITLE_URL)
+        self.create_job_title("Django Developer")
+
+        again = self.revalidate(JOB_TITLE_URL, res)
+
+        self.assertEqual(again.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(again["ETag"], res["ETag"])
+
+    def test_delete_changes_list_etag(self):
+        older = self.create_job_title(
+            "Django Developer",
+            last_updated=timezone.now() - timedelta(days=1),
+        )
+        res = self.client.get(JOB_TITLE_URL)
+        self.client.delete(detail_url(older.id))
+
+        again = self.revalidate(JOB_TITLE_URL, res)
+
+        self.assertEqual(again.status_code, status.HTTP_200_OK)
+
+    def test_update_bumps_last_updated(self):
+        url = detail_url(self.job_title.id)
+        res = self.client.get(url)
+        later = timezone.now() + timedelta(seconds=5)
+
+        with patch("job.views.timezone.now", return_value=later):
+            self.client.patch(url, {"title": "Senior Python Developer"})
+
+        self.job_title.refresh_from_db()
+        self.assertEqual(self.job_title.last_updated, later)
+        again = self.revalidate(url, res)
+        self.assertEqual(again.status_code, status.HTTP_200_OK)
+        self.assertEqual(again.data["title"], "Senior Python Developer")
+
+    def test_description_change_bumps_last_updated(self):
+        before = self.job_title.last_updated
+        description = self.job_title.job_description
+        description.role = "Backend Developer"
+        description.save()
+
+        self.job_title.refresh_from_db()
+        self.assertGreater(self.job_title.last_updated, before)
+
+    def test_portal_change_revalidates_expanded(self):
+        url = detail_url(self.job_title.id)
+        responses = [
+            (JOB_TITLE_URL, {}, self.client.get(JOB_TITLE_URL)),
+            *(
+                (path, {"expand": "portal"},
+                 self.client.get(path, {"expand": "portal"}))
+                for path in (JOB_TITLE_URL, url)
+            ),
+        ]
+        before = self.job_title.last_updated
+
+        self.portal.description = "jobs in India"
+        self.portal.save()
+
+        statuses = [
+            self.revalidate(path, res, **params).status_code
+            for path, params, res in responses
+        ]
+        self.assertEqual(statuses, [
+            status.HTTP_304_NOT_MODIFIED,
+            status.HTTP_200_OK,
+            status.HTTP_200_OK,
+        ])
+        # the job titles of every user of the portal are left alone
+        self.job_title.refresh_from_db()
+        self.assertEqual(self.job_title.last_updated, before)
+
+    def test_etag_depends_on_query(self):
+        res = self.client.get(JOB_TITLE_URL)
+
+        again = self.revalidate(JOB_TITLE_URL, res, expand="portal")
+
+        self.assertEqual(again.status_code, status.HTTP_200_OK)
+
+    def test_etag_depends_on_user(self):
+        res = self.client.get(JOB_TITLE_URL)
+        other = get_user_model().objects.create_user(
+            "other@example.com",
+            "password@321"
+        )
+        self.client.force_authenticate(other)
+
+        again = self.revalidate(JOB_TITLE_URL, res)
+
+        self.assertEqual(again.status_code, status.HTTP_200_OK)
@@ -0,0 +1,213 @@
+"""Tests for near-duplicate detection of job titles"""
+
+from io import StringIO
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core import dedup
+from core.models import (
+    JobTitle,
+    JobTitleLSHBucket,
+    JobTitleSignature,
+    Portal,
+    JobDescription,
+)
+from job.bulk import bulk_upsert_job_titles
+
+
+JOB_TITLE_URL = reverse("jobtitle:jobtitle-list")
+
+DESCRIPTION = (
+    "We are looking for a backend engineer to build and operate the APIs "
+    "of our job aggregation platform. You should know Python, Django, "
+    "MySQL, git, CICD and Linux, and enjoy working in a small remote team."
+)
+
+
+def duplicates_url(job_title_id):
+    return reverse("jobtitle:jobtitle-duplicates", args=[job_title_id])
+
+
+class MinHashTests(SimpleTestCase):
+    """Test signatures estimate the similarity of texts"""
+
+    def test_batch_matches_single(self):
+        texts = [DESCRIPTION, "python developer", ""]
+        batch = dedup.minhash_batch(texts)
+
+        self.assertEqual(batch.shape, (3, dedup.NUM_PERM))
+        for text, signature in zip(texts, batch):
+            np.testing.assert_array_equal(
+                dedup.minhash_batch([text])[0], signature
+            )
+
+    def test_similarity(self):
+        same, near, other = dedup.minhash_batch([
+            DESCRIPTION,
+            DESCRIPTION.replace("small remote", "small, remote!"),
+            "Senior accountant for a chartered firm, tally and GST required",
+        ])
+
+        self.assertEqual(dedup.similarity(same, near), 1.0)
+        self.assertLess(dedup.similarity(same, other), 0.2)
+
+    def test_bytes_round_trip(self):
+        signature = dedup.minhash_batch([DESCRIPTION])[0]
+        data = dedup.to_bytes(signature)
+
+        self.assertEqual(len(data), dedup.NUM_PERM * 4)
+        np.testing.assert_array_equal(dedup.from_bytes(data), signature)
+
+
+class DedupApiTests(TestCase):
+    """Test clustering of postings seen on several portals"""
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@example.com",
+            "password@321"
+        )
+        self.portals = [
+            Portal.objects.create(
+                user=self.user, name=name, description="job portal"
+            )
+            for name in ("naukri.com", "indeed.com", "monster.com")
+        ]
+        self.client.force_authenticate(self.user)
+
+    def create_job_title(self, portal, title, text=DESCRIPTION, user=None):
+        user = user or self.user
+        description = JobDescription.objects.create(
+            user=user, role=title, description_text=text
+        )
+        return JobTitle.objects.create(
+            user=user, title=title, portal=portal,
+            job_description=description,
+        )
+
+    def cluster_of(self, job_title):
+        return JobTitleSignature.objects.get(job_title=job_title).cluster_id
+
+    def test_signature_written_on_save(self):
+        job_title = self.create_job_title(self.portals[0], "Python Developer")
+
+        self.assertEqual(self.cluster_of(job_title), job_title.id)
+        self.assertEqual(
+            JobTitleLSHBucket.objects.filter(job_title=job_title).count(),
+            dedup.BANDS,
+        )
+
+    def test_near_duplicates_share_cluster(self):
+        first = self.create_job_title(self.portals[0], "Python Developer")
+        second = self.create_job_title(
+            self.portals[1], "Python Developer.",
+            text=DESCRIPTION.replace("small remote", "small, remote!"),
+        )
+        other = self.create_job_title(
+            self.portals[2], "Accountant",
+            text="Senior accountant for a chartered firm, GST required",
+        )
+
+        self.assertEqual(self.cluster_of(second), first.id)
+        self.assertEqual(self.cluster_of(other), other.id)
+
+    def test_other_users_never_clustered(self):
+        other_user = get_user_model().objects.create_user(
+            "other@example.com",
+            "password@321"
+        )
+        portal = Portal.objects.create(
+            user=other_user, name="other.com", description="job portal"
+        )
+        self.create_job_title(self.portals[0], "Python Developer")
+        foreign = self.create_job_title(
+            portal, "Python Developer", user=other_user
+        )
+
+        self.assertEqual(self.cluster_of(foreign), foreign.id)
+
+    def test_bulk_create_clustered_in_order(self):
+        descriptions = [
+            JobDescription.objects.create(
+                user=self.user, role="Python Developer",
+                description_text=DESCRIPTION,
+            )
+            for _ in self.portals
+        ]
+        results = bulk_upsert_job_titles(self.user, [
+            {"title": "Python Developer", "portal": portal.id,
+             "job_description": description.id}
+            for portal, description in zip(self.portals, descriptions)
+        ])
+
+        ids = [result["id"] for result in results]
+        self.assertEqual(
+            [self.cluster_of(pk) for pk in ids], [ids[0]] * len(ids)
+        )
+
+    def test_collapse_duplicates(self):
+        first = self.create_job_title(self.portals[0], "Python Developer")
+        self.create_job_title(self.portals[1], "Python Developer")
+        other = self.create_job_title(
+            self.portals[2], "Accountant",
+            text="Senior accountant for a chartered firm, GST required",
+        )
+
+        res = self.client.get(JOB_TITLE_URL, {"collapse_duplicates": "true"})
+        full = self.client.get(JOB_TITLE_URL)
+
+        self.assertEqual(
+            [item["id"] for item in res.data["results"]], [other.id, first.id]
+        )
+        self.assertEqual(len(full.data["results"]), 3)
+
+    def test_collapse_after_root_deleted(self):
+        """Test the survivors of a deleted oldest member stay listed"""
+
+        first, second, third = [
+            self.create_job_title(portal, "Python Developer")
+            for portal in self.portals
+        ]
+
+        first.delete()
+        res = self.client.get(JOB_TITLE_URL, {"collapse_duplicates": "true"})
+
+        self.assertEqual(
+            [item["id"] for item in res.data["results"]], [second.id]
+        )
+        self.assertEqual(self.cluster_of(third), second.id)
+
+        JobTitle.objects.filter(pk__in=[second.pk, third.pk]).delete()
+        self.assertFalse(JobTitleSignature.objects.exists())
+
+    def test_duplicates_endpoint(self):
+        first = self.create_job_title(self.portals[0], "Python Developer")
+        second = self.create_job_title(self.portals[1], "Python Developer")
+        third = self.create_job_title(self.portals[2], "Python Developer")
+
+        res = self.client.get(duplicates_url(first.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["id"] for item in res.data["results"]],
+            [third.id, second.id],
+        )
+
+    def test_backfill_command(self):
+        first = self.create_job_title(self.portals[0], "Python Developer")
+        second = self.create_job_title(self.portals[1], "Python Developer")
+        JobTitleSignature.objects.all().delete()
+        JobTitleLSHBucket.objects.all().delete()
+
+        out = StringIO()
+        call_command("backfill_signatures", "--batch-size", "1", stdout=out)
+
+        self.assertIn("2 job titles", out.getvalue())
+        self.assertEqual(self.cluster_of(second), first.id)
@@ -0,0 +1,158 @@
+"""Tests for `?expand=` and the query budgets of the job title endpoints"""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import JobTitle, Portal, JobDescription
+
+
+JOB_TITLE_URL = reverse("jobtitle:jobtitle-list")
+
+# queries per request, whatever the page size; the user is authenticated
+# with `force_authenticate`, so authentication costs nothing here
+# list: ETag aggregate + page
+LIST_BUDGET = 2
+DETAIL_BUDGET = 1
+DUPLICATES_BUDGET = 3
+
+
+def detail_url(job_title_id):
+    return reverse("jobtitle:jobtitle-detail", args=[job_title_id])
+
+
+def duplicates_url(job_title_id):
+    return reverse("jobtitle:jobtitle-duplicates", args=[job_title_id])
+
+
+class ExpandApiTests(TestCase):
+    """Test nested related objects and query budgets"""
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@example.com",
+            "password@321"
+        )
+        self.client.force_authenticate(self.user)
+
+    def create_job_titles(self, count):
+        """Create `count` copies of one posting, each on its own portal"""
+
+        job_titles = []
+        for _ in range(count):
+            number = JobTitle.objects.count()
+            portal = Portal.objects.create(
+                user=self.user,
+                name=f"portal-{number}.com",
+                description="job portal",
+            )
+            description = JobDescription.objects.create(
+                user=self.user,
+                role="Python Developer",
+                description_text="should know git, CICD, Linux and Python",
+            )
+            job_titles.append(JobTitle.objects.create(
+                user=self.user,
+                title="Python Developer",
+                portal=portal,
+                job_description=description,
+            ))
+        return job_titles
+
+    def test_detail_expanded(self):
+        job_title, = self.create_job_titles(1)
+
+        res = self.client.get(
+            detail_url(job_title.id), {"expand": "job_description,portal"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["portal"], {
+            "id": job_title.portal.id,
+            "name": job_title.portal.name,
+            "description": "job portal",
+        })
+        self.assertEqual(
+            res.data["job_description"]["id"], job_title.job_description.id
+        )
+        self.assertEqual(
+            res.data["job_description"]["role"], "Python Developer"
+        )
+
+    def test_ids_without_expand(self):
+        job_title, = self.create_job_titles(1)
+
+        res = self.client.get(detail_url(job_title.id))
+
+        self.assertEqual(res.data["portal"], job_title.portal.id)
+        self.assertEqual(
+            res.data["job_description"], job_title.job_description.id
+        )
+
+    def test_list_expanded(self):
+        job_title, = self.create_job_titles(1)
+
+        res = self.client.get(JOB_TITLE_URL, {"expand": "portal"})
+
+        item, = res.data["results"]
+        self.assertEqual(item["portal"]["name"], job_title.portal.name)
+        self.assertNotIn("job_description", item)
+
+    def test_unknown_expansion(self):
+        self.create_job_titles(1)
+
+        res = self.client.get(JOB_TITLE_URL, {"expand": "portal,user"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("expand", res.data)
+
+    def test_expand_ignored_on_write(self):
+        """Test writes keep accepting and returning ids"""
+
+        job_title, = self.create_job_titles(1)
+
+        res = self.client.patch(
+            detail_url(job_title.id) + "?expand=portal",
+            {"title": "Django Developer"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["portal"], job_title.portal.id)
+
+    def test_list_query_budget(self):
+        for count in (2, 20):
+            self.create_job_titles(count)
+            for expand in ("", "portal", "job_description,portal"):
+                with self.subTest(count=count, expand=expand):
+                    with self.assertNumQueries(LIST_BUDGET):
+                        res = self.client.get(
+                            JOB_TITLE_URL, {"expand": expand}
+                        )
+                    self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_detail_query_budget(self):
+        job_title, = self.create_job_titles(1)
+
+        for expand in ("", "job_description,portal"):
+            with self.subTest(expand=expand):
+                with self.assertNumQueries(DETAIL_BUDGET):
+                    self.client.get(
+                        detail_url(job_title.id), {"expand": expand}
+                    )
+
+    def test_duplicates_query_budget(self):
+        for count in (2, 20):
+            job_titles = self.create_job_titles(count)
+            with self.subTest(count=count):
+                with self.assertNumQueries(DUPLICATES_BUDGET):
+                    res = self.client.get(
+                        duplicates_url(job_titles[0].id),
+                        {"expand": "job_description,portal"},
+                    )
+                # every copy so far is in the cluster
+                self.assertEqual(
+                    len(res.data["results"]), JobTitle.objects.count() - 1
+                )
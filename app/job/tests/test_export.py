@@ -0,0 +1,119 @@
+"""Tests for the streaming job title export"""
+
+import csv
+import gzip
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import JobTitle, Portal, JobDescription
+from job.export import COLUMNS, export_rows
+
+
+EXPORT_URL = reverse("jobtitle:jobtitle-export")
+
+
+class ExportApiTests(TestCase):
+    """Test exporting job titles as NDJSON / CSV"""
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@example.com",
+            "password@321"
+        )
+        self.portal = Portal.objects.create(
+            user=self.user, name="naukri.com", description="job portal"
+        )
+        self.job_titles = [
+            self.create_job_title(self.user, self.portal, f"title {number}")
+            for number in range(5)
+        ]
+        self.client.force_authenticate(self.user)
+
+    def create_job_title(self, user, portal, title):
+        description = JobDescription.objects.create(
+            user=user, role=f"{title} role", description_text="git, Linux"
+        )
+        return JobTitle.objects.create(
+            user=user, title=title, portal=portal, job_description=description
+        )
+
+    def export(self, **params):
+        res = self.client.get(EXPORT_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        return res, b"".join(res.streaming_content)
+
+    def test_ndjson(self):
+        res, content = self.export()
+
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(
+            [row["id"] for row in rows],
+            [job_title.id for job_title in self.job_titles],
+        )
+        first = self.job_titles[0]
+        self.assertEqual(rows[0], {
+            "id": first.id,
+            "title": "title 0",
+            "last_updated": first.last_updated.isoformat(),
+            "portal_id": self.portal.id,
+            "portal_name": "naukri.com",
+            "job_description_id": first.job_description.id,
+            "role": "title 0 role",
+            "description_text": "git, Linux",
+            "pub_date": first.job_description.pub_date.isoformat(),
+        })
+
+    def test_csv(self):
+        res, content = self.export(output="csv")
+
+        self.assertEqual(res["Content-Type"], "text/csv")
+        rows = list(csv.reader(io.StringIO(content.decode("utf-8"))))
+        self.assertEqual(rows[0], list(COLUMNS))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[1][1], "title 0")
+
+    def test_gzip(self):
+        res, content = self.export(output="csv", gzip="true")
+
+        self.assertEqual(res["Content-Type"], "application/gzip")
+        self.assertIn("jobtitles.csv.gz", res["Content-Disposition"])
+        _, plain = self.export(output="csv")
+        self.assertEqual(gzip.decompress(content), plain)
+
+    def test_other_users_excluded(self):
+        other = get_user_model().objects.create_user(
+            "other@example.com",
+            "password@321"
+        )
+        self.create_job_title(other, self.portal, "foreign")
+
+        _, content = self.export()
+
+        self.assertEqual(len(content.splitlines()), 5)
+
+    def test_invalid_output(self):
+        res = self.client.get(EXPORT_URL, {"output": "xml"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_chunks(self):
+        """Test rows are read in bounded keyset chunks"""
+
+        queryset = JobTitle.objects.filter(user=self.user)
+        with self.assertNumQueries(4):
+            chunks = list(export_rows(queryset, chunk_size=2))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEqual(
+            [row[0] for chunk in chunks for row in chunk],
+            [job_title.id for job_title in self.job_titles],
+        )
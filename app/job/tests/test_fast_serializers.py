@@ -0,0 +1,91 @@
+"""Tests for the values_list list serialization path"""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import serializers
+from rest_framework.test import APIClient
+
+from core.models import JobTitle, Portal, JobDescription
+from job.fast_serializers import compile_plan
+from job.serializers import JobTitleDetailSerializer, JobTitleSerializer
+
+
+JOB_TITLE_URL = reverse("jobtitle:jobtitle-list")
+
+
+class JobTitleDatesSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = JobTitle
+        fields = ["id", "title", "portal", "last_updated"]
+
+
+class NestedSerializer(serializers.ModelSerializer):
+    portal = serializers.StringRelatedField(source="portal.name")
+
+    class Meta:
+        model = JobTitle
+        fields = ["id", "portal"]
+
+
+class FastSerializerTests(TestCase):
+    """Test the fast path returns exactly what the serializer returns"""
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@example.com",
+            "password@321"
+        )
+        self.portal = Portal.objects.create(
+            user=self.user, name="naukri.com", description="job portal"
+        )
+        for number in range(3):
+            description = JobDescription.objects.create(
+                user=self.user, role="role", description_text="git, Linux"
+            )
+            JobTitle.objects.create(
+                user=self.user, title=f"title {number}", portal=self.portal,
+                job_description=description,
+            )
+        self.client.force_authenticate(self.user)
+
+    def assert_same_as_serializer(self, serializer_class):
+        queryset = JobTitle.objects.order_by("-id")
+        plan = compile_plan(serializer_class)
+
+        self.assertEqual(
+            plan.serialize(plan.values(queryset)),
+            serializer_class(queryset, many=True).data,
+        )
+
+    def test_plain_fields(self):
+        self.assert_same_as_serializer(JobTitleSerializer)
+        self.assert_same_as_serializer(JobTitleDetailSerializer)
+
+    def test_converted_fields(self):
+        self.assert_same_as_serializer(JobTitleDatesSerializer)
+
+    def test_extra_columns_left_out(self):
+        plan = compile_plan(JobTitleSerializer)
+        rows = plan.values(JobTitle.objects.all(), "id", "last_updated")
+
+        self.assertEqual(set(plan.serialize(rows)[0]), {"id", "title"})
+
+    def test_dotted_source_rejected(self):
+        with self.assertRaises(ValueError):
+            compile_plan(NestedSerializer)
+
+    def test_list_response_unchanged(self):
+        for ordering in ("-id", "-last_updated"):
+            with self.subTest(ordering=ordering):
+                res = self.client.get(
+                    JOB_TITLE_URL, {"ordering": ordering, "page_size": 2}
+                )
+                page = JobTitle.objects.order_by(ordering, "-id")[:2]
+
+                self.assertEqual(
+                    res.json()["results"],
+                    JobTitleSerializer(page, many=True).data,
+                )
+                self.assertIsNotNone(res.json()["next"])
@@ -0,0 +1,133 @@
+"""Tests for `?fields=` on the job title endpoints"""
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import JobDescription, JobTitle, Portal
+
+JOB_TITLE_URL = reverse("jobtitle:jobtitle-list")
+
+
+def detail_url(job_title_id):
+    return reverse("jobtitle:jobtitle-detail", args=[job_title_id])
+
+
+def duplicates_url(job_title_id):
+    return reverse("jobtitle:jobtitle-duplicates", args=[job_title_id])
+
+
+def selected(sql):
+    """Return the SELECT clause of `sql`"""
+
+    return sql.split(" FROM ")[0]
+
+
+class SparseFieldsApiTests(TestCase):
+    """Test pruning the job title responses and their queries"""
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@example.com",
+            "password@321"
+        )
+        self.portal = Portal.objects.create(
+            user=self.user, name="naukri.com", description="job portal"
+        )
+        self.job_title = JobTitle.objects.create(
+            user=self.user,
+            title="Python Developer",
+            portal=self.portal,
+            job_description=JobDescription.objects.create(
+                user=self.user,
+                role="Python Developer",
+                description_text="should know git, CICD, Linux and Python",
+            ),
+        )
+        self.client.force_authenticate(self.user)
+
+    def get(self, url, params):
+        """GET `url`, return the response and its last query"""
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK, res.data)
+        return res, queries[-1]["sql"]
+
+    def test_list_fields(self):
+        res, sql = self.get(JOB_TITLE_URL, {"fields": "title"})
+
+        self.assertEqual(res.data["results"], [{"title": "Python Developer"}])
+        self.assertNotIn("applicant_count", selected(sql))
+        self.assertNotIn("portal_id", selected(sql))
+
+    def test_detail_fields(self):
+        res, sql = self.get(
+            detail_url(self.job_title.id), {"fields": "title, id"}
+        )
+
+        self.assertEqual(res.data, {
+            "id": self.job_title.id, "title": "Python Developer",
+        })
+        for column in ("applicant_count", "portal_id", "job_description_id"):
+            self.assertNotIn(column, selected(sql))
+
+    def test_detail_fields_expanded(self):
+        res, sql = self.get(
+            detail_url(self.job_title.id),
+            {"fields": "portal", "expand": "job_description,portal"},
+        )
+
+        self.assertEqual(res.data, {"portal": {
+            "id": self.portal.id,
+            "name": "naukri.com",
+            "description": "job portal",
+        }})
+        # the left out expansion is not joined
+        self.assertNotIn("core_jobdescription", sql)
+
+    def test_duplicates_fields(self):
+        copy = JobTitle.objects.create(
+            user=self.user,
+            title="Python Developer",
+            portal=Portal.objects.create(
+                user=self.user, name="indeed.com", description="job portal"
+            ),
+            job_description=JobDescription.objects.create(
+                user=self.user,
+                role="Python Developer",
+                description_text="should know git, CICD, Linux and Python",
+            ),
+        )
+
+        res, sql = self.get(duplicates_url(copy.id), {"fields": "id"})
+
+        self.assertEqual(res.data["results"], [{"id": self.job_title.id}])
+        self.assertNotIn("title", selected(sql).replace("jobtitle", ""))
+
+    def test_unknown_field(self):
+        for url, fields in [
+            (JOB_TITLE_URL, "id,applicant_count"),
+            (JOB_TITLE_URL, "portal"),
+            (detail_url(self.job_title.id), "user"),
+        ]:
+            with self.subTest(url=url, fields=fields):
+                res = self.client.get(url, {"fields": fields})
+
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn("fields", res.data)
+
+    def test_fields_ignored_on_write(self):
+        res = self.client.patch(
+            detail_url(self.job_title.id) + "?fields=id",
+            {"title": "Django Developer"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["title"], "Django Developer")
+        self.assertEqual(res.data["portal"], self.portal.id)
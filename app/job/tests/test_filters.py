@@ -0,0 +1,256 @@
+"""Tests for the job title list filters"""
+
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import JobDescription, JobTitle, Portal
+from job.filters import filter_job_titles, prefix_range
+
+JOB_TITLE_URL = reverse("jobtitle:jobtitle-list")
+
+
+def explain(sql):
+    """Return the plan of `sql`: one `(table, index, detail)` per step"""
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute("EXPLAIN QUERY PLAN " + sql)
+            steps = []
+            for *_, detail in cursor.fetchall():
+                words = detail.split()
+                index = None
+                if "INDEX" in words:
+                    index = words[words.index("INDEX") + 1]
+                elif "PRIMARY" in words:
+                    index = "PRIMARY"
+                table = words[1] if words[0] in ("SCAN", "SEARCH") else None
+                steps.append((table, index, detail))
+            return steps
+        cursor.execute("EXPLAIN " + sql)
+        names = [column[0].lower() for column in cursor.description]
+        return [
+            (row["table"], row["key"],
+             f"type={row['type']} extra={row['extra']}")
+            for row in (dict(zip(names, values)) for values in cursor)
+        ]
+
+
+class PrefixRangeTests(SimpleTestCase):
+    """Test the title prefix bounds"""
+
+    def test_next_prefix(self):
+        self.assertEqual(prefix_range("Dev"), ("Dev", "Dew"))
+        self.assertEqual(prefix_range("a\U0010ffff"), ("a\U0010ffff", "b"))
+        self.assertEqual(prefix_range("\U0010ffff"), ("\U0010ffff", None))
+        self.assertEqual(prefix_range("a퟿"), ("a퟿", "a"))
+
+
+class JobTitleFilterTests(TestCase):
+    """Test filtering the job title list"""
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@example.com",
+            "password@321"
+        )
+        self.other = get_user_model().objects.create_user(
+            "other@example.com",
+            "password@321"
+        )
+        self.naukri = Portal.objects.create(
+            user=self.user, name="naukri.com", description="job portal"
+        )
+        self.indeed = Portal.objects.create(
+            user=self.user, name="indeed.com", description="job portal"
+        )
+        self.now = timezone.now()
+        self.titles = {}
+        for days, title, portal in [
+            (0, "Developer", self.naukri),
+            (1, "Devops engineer", self.indeed),
+            (2, "Designer", self.naukri),
+            (3, "Tester", self.indeed),
+        ]:
+            description = JobDescription.objects.create(
+                user=self.user,
+                role=title,
+                description_text="git, Linux",
+                pub_date=self.now - timedelta(days=days + 10),
+            )
+            self.titles[title] = JobTitle.objects.create(
+                user=self.user,
+                title=title,
+                portal=portal,
+                job_description=description,
+                last_updated=self.now - timedelta(days=days),
+            ).id
+        # same title and portal, another user
+        JobTitle.objects.create(
+            user=self.other,
+            title="Developer",
+            portal=self.naukri,
+            job_description=JobDescription.objects.create(
+                user=self.other, role="role", description_text="git"
+            ),
+        )
+        self.client.force_authenticate(self.user)
+
+    def ids(self, **params):
+        res = self.client.get(JOB_TITLE_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK, res.data)
+        return [item["id"] for item in res.data["results"]]
+
+    def expected(self, *titles):
+        return sorted((self.titles[title] for title in titles), reverse=True)
+
+    def test_portal_by_id_or_name(self):
+        by_id = self.ids(portal=self.naukri.id)
+        by_name = self.ids(portal="naukri.com")
+
+        self.assertEqual(by_id, self.expected("Developer", "Designer"))
+        self.assertEqual(by_name, by_id)
+        self.assertEqual(self.ids(portal="monster.com"), [])
+
+    def test_title_prefix(self):
+        self.assertEqual(
+            self.ids(title_prefix="Dev"),
+            self.expected("Developer", "Devops engineer"),
+        )
+        self.assertEqual(self.ids(title_prefix="Developer"),
+                         self.expected("Developer"))
+        self.assertEqual(self.ids(title_prefix="Developers"), [])
+
+    def test_title_prefix_last_character(self):
+        """Test prefixes ending in the last letters and digits"""
+
+        titles = ["Azure engineer", "AZ-900 trainer", "Level 9 support"]
+        for title in titles:
+            self.titles[title] = JobTitle.objects.create(
+                user=self.user,
+                title=title,
+                portal=self.naukri,
+                job_description=JobDescription.objects.create(
+                    user=self.user, role="role", description_text="git"
+                ),
+            ).id
+
+        self.assertEqual(
+            self.ids(title_prefix="Az"), self.expected("Azure engineer")
+        )
+        self.assertEqual(
+            self.ids(title_prefix="AZ"), self.expected("AZ-900 trainer")
+        )
+        self.assertEqual(
+            self.ids(title_prefix="Level 9"),
+            self.expected("Level 9 support"),
+        )
+
+    def test_title_prefix_mysql(self):
+        """Test MySQL matches the prefix with its collation"""
+
+        with mock.patch.object(connection, "vendor", "mysql"):
+            queryset = filter_job_titles(
+                JobTitle.objects.all(), {"title_prefix": "Dez"}
+            )
+
+        sql = str(queryset.query)
+        self.assertIn("LIKE", sql)
+        self.assertNotIn("<", sql)
+
+    def test_last_updated_range(self):
+        ids = self.ids(
+            last_updated_after=(self.now - timedelta(days=2)).isoformat(),
+            last_updated_before=(self.now - timedelta(days=1)).isoformat(),
+        )
+
+        self.assertEqual(ids, self.expected("Devops engineer", "Designer"))
+
+    def test_pub_date_range(self):
+        ids = self.ids(
+            pub_date_before=(self.now - timedelta(days=11)).isoformat(),
+        )
+
+        self.assertEqual(
+            ids, self.expected("Devops engineer", "Designer", "Tester")
+        )
+
+    def test_filters_combine(self):
+        ids = self.ids(
+            portal=self.naukri.id,
+            title_prefix="De",
+            last_updated_after=(self.now - timedelta(days=1)).isoformat(),
+        )
+
+        self.assertEqual(ids, self.expected("Developer"))
+
+    def test_filters_page_with_the_cursor(self):
+        res = self.client.get(
+            JOB_TITLE_URL, {"title_prefix": "De", "page_size": 2}
+        )
+        following = self.client.get(res.data["next"])
+
+        self.assertEqual(
+            [item["id"] for item in res.data["results"]]
+            + [item["id"] for item in following.data["results"]],
+            self.expected("Developer", "Devops engineer", "Designer"),
+        )
+        self.assertIsNone(following.data["next"])
+
+    def test_invalid_filter(self):
+        res = self.client.get(JOB_TITLE_URL, {"last_updated_after": "soon"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("last_updated_after", res.data)
+
+    def test_every_combination_served_by_an_index(self):
+        """EXPLAIN every query of a filtered list page
+
+        Each step must read an index, no full table scan. Without a range
+        filter the page comes in index order, no sort, as the unfiltered
+        list does; a range may have its matches sorted instead of walking
+        `(user, id)`, as the planner prefers.
+        """
+
+        after = (self.now - timedelta(days=5)).isoformat()
+        published_after = (self.now - timedelta(days=15)).isoformat()
+        combinations = [
+            {},
+            {"portal": self.naukri.id},
+            {"portal": "naukri.com"},
+            {"title_prefix": "Dev"},
+            {"last_updated_after": after},
+            {"pub_date_after": published_after},
+            {"portal": self.naukri.id, "title_prefix": "De"},
+            {"portal": "naukri.com", "last_updated_after": after},
+            {"title_prefix": "Dev", "pub_date_after": published_after,
+             "last_updated_after": after},
+        ]
+        for params in combinations:
+            # the second page, through the cursor
+            first = self.client.get(JOB_TITLE_URL, {**params, "page_size": 1})
+            self.assertIsNotNone(first.data["next"], params)
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.get(first.data["next"])
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(res.data["results"]), 1)
+
+            ranged = set(params) - {"portal"}
+            for query in queries:
+                plan = explain(query["sql"])
+                with self.subTest(params=params, sql=query["sql"]):
+                    for table, index, detail in plan:
+                        if table is not None:
+                            self.assertIsNotNone(index, detail)
+                        if not ranged:
+                            self.assertNotIn("TEMP B-TREE", detail)
+                            self.assertNotIn("filesort", detail)
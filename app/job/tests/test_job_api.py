@@ -234,7 +234,6 @@ class PrivateJobTitleApiTests(TestCase):
             "portal": self.portal.id,
             "job_description": self.job_description.id
         }
-        breakpoint()
         url = detail_url(job_title.id)
         res = self.client.put(url, payload)
 
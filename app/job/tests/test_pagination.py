@@ -0,0 +1,118 @@
+"""Tests for job title cursor pagination"""
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import JobTitle, Portal, JobDescription
+from job.pagination import JobTitleCursorPagination
+
+
+JOB_TITLE_URL = reverse("jobtitle:jobtitle-list")
+
+
+class JobTitleCursorPaginationTests(TestCase):
+    """Test paging through the job title list"""
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@example.com",
+            "password@321"
+        )
+        self.portal = Portal.objects.create(
+            user=self.user,
+            name="naukri.com",
+            description="famous job hunting website"
+        )
+        now = timezone.now()
+        self.job_titles = []
+        for i in range(7):
+            job_description = JobDescription.objects.create(
+                user=self.user,
+                role=f"role {i}",
+                description_text="should know git, CICD and linux",
+            )
+            self.job_titles.append(JobTitle.objects.create(
+                user=self.user,
+                title=f"title {i}",
+                portal=self.portal,
+                job_description=job_description,
+                # reverse of insertion order, to tell orderings apart
+                last_updated=now - timedelta(minutes=i),
+            ))
+        self.client.force_authenticate(self.user)
+
+    def collect(self, url):
+        """Follow `next` links and return all ids in order"""
+
+        ids = []
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            ids.extend(item["id"] for item in res.data["results"])
+            url = res.data["next"]
+        return ids
+
+    def test_pages_ordered_by_id_desc(self):
+        """Test default ordering walks every title once by `-id`"""
+
+        ids = self.collect(JOB_TITLE_URL + "?page_size=3")
+        expected = sorted((jt.id for jt in self.job_titles), reverse=True)
+        self.assertEqual(ids, expected)
+
+    def test_pages_ordered_by_last_updated(self):
+        """Test `-last_updated` ordering walks every title once"""
+
+        ids = self.collect(
+            JOB_TITLE_URL + "?page_size=2&ordering=-last_updated"
+        )
+        self.assertEqual(ids, [jt.id for jt in self.job_titles])
+
+    def test_previous_link(self):
+        """Test following `previous` returns the earlier page"""
+
+        first = self.client.get(JOB_TITLE_URL + "?page_size=3")
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+
+        self.assertEqual(back.data["results"], first.data["results"])
+
+    def test_page_size_capped(self):
+        """Test client page size cannot exceed the server side cap"""
+
+        with patch.object(JobTitleCursorPagination, "max_page_size", 4):
+            res = self.client.get(JOB_TITLE_URL + "?page_size=100")
+
+        self.assertEqual(len(res.data["results"]), 4)
+
+    def test_tampered_cursor_rejected(self):
+        """Test a modified cursor returns 404"""
+
+        res = self.client.get(JOB_TITLE_URL + "?page_size=3")
+        cursor = res.data["next"].split("cursor=")[1].split("&")[0]
+        tampered = cursor[:-2] + ("AA" if cursor[-2:] != "AA" else "BB")
+
+        res = self.client.get(JOB_TITLE_URL, {"cursor": tampered})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_bound_to_ordering(self):
+        """Test a cursor cannot be replayed against another ordering"""
+
+        res = self.client.get(JOB_TITLE_URL + "?page_size=3")
+        next_url = res.data["next"] + "&ordering=-last_updated"
+
+        res = self.client.get(next_url)
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalid_ordering_rejected(self):
+        """Test unknown ordering is rejected"""
+
+        res = self.client.get(JOB_TITLE_URL, {"ordering": "title"})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,261 @@
+"""Tests for the job title search endpoint"""
+
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import (
+    JobTitle,
+    JobTitleSearchDocument,
+    Portal,
+    JobDescription,
+)
+from core.search import parse_query, search_job_titles, Term
+
+
+SEARCH_URL = reverse("jobtitle:jobtitle-search")
+
+
+class ParseQueryTests(SimpleTestCase):
+    """Test turning user input into search terms"""
+
+    def test_words_phrases_and_prefixes(self):
+        terms = parse_query('python "remote work" djan* c++')
+
+        self.assertEqual(terms, [
+            Term(("python",)),
+            Term(("remote", "work")),
+            Term(("djan",), prefix=True),
+            Term(("c",)),
+        ])
+
+    def test_syntax_characters_dropped(self):
+        """Test full-text operators in user input are not passed through"""
+
+        terms = parse_query('+python -"java" (NEAR)')
+        self.assertEqual(
+            terms, [Term(("python",)), Term(("java",)), Term(("near",))]
+        )
+
+    def test_no_words(self):
+        with self.assertRaises(ValueError):
+            parse_query('" * -')
+
+
+# InnoDB full-text indexes only see committed rows, hence TransactionTestCase
+class MySQLSearchQueryTests(SimpleTestCase):
+    """Test the SQL of the MySQL search"""
+
+    def test_fulltext_index_filters(self):
+        """Test the WHERE clause has a bare MATCH, the FULLTEXT index form"""
+
+        with mock.patch.object(connection, "vendor", "mysql"):
+            sql = str(search_job_titles(1, "python dev*").query)
+        where = sql.split(" WHERE ")[1].split(" ORDER BY ")[0]
+
+        self.assertIn(
+            "(MATCH (core_jobtitlesearchdocument.title, "
+            "core_jobtitlesearchdocument.document) AGAINST "
+            "(+python +dev* IN BOOLEAN MODE))",
+            where,
+        )
+        self.assertNotIn("rank", where)
+        self.assertEqual(where.count("MATCH"), 1)
+
+
+class JobTitleSearchApiTests(TransactionTestCase):
+    """Test searching job titles"""
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@example.com",
+            "password@321"
+        )
+        self.naukri = Portal.objects.create(
+            user=self.user, name="naukri.com", description="job portal"
+        )
+        self.indeed = Portal.objects.create(
+            user=self.user, name="indeed.com", description="job portal"
+        )
+        self.client.force_authenticate(self.user)
+
+    def create_job_title(self, title, description_text, portal=None,
+                         user=None, pub_date=None):
+        user = user or self.user
+        job_description = JobDescription.objects.create(
+            user=user,
+            role="Backend engineering",
+            description_text=description_text,
+            pub_date=pub_date or timezone.now(),
+        )
+        return JobTitle.objects.create(
+            user=user,
+            title=title,
+            portal=portal or self.naukri,
+            job_description=job_description,
+        )
+
+    def search(self, **params):
+        res = self.client.get(SEARCH_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK, res.data)
+        return [item["id"] for item in res.data["results"]]
+
+    def test_search_title_and_description(self):
+        """Test all words must match, in the title or the description"""
+
+        python = self.create_job_title(
+            "Python Developer", "Django services with remote teams"
+        )
+        self.create_job_title("Java Developer", "Spring services onsite")
+
+        self.assertEqual(self.search(q="python remote"), [python.id])
+        self.assertEqual(self.search(q="developer django"), [python.id])
+        self.assertEqual(self.search(q="python spring"), [])
+
+    def test_title_match_ranked_first(self):
+        """Test a hit in the title outranks a hit in the description"""
+
+        in_description = self.create_job_title(
+            "Backend Developer", "mostly kubernetes operations"
+        )
+        in_title = self.create_job_title(
+            "Kubernetes Administrator", "cluster operations"
+        )
+
+        self.assertEqual(
+            self.search(q="kubernetes"), [in_title.id, in_description.id]
+        )
+
+    def test_phrase_and_prefix(self):
+        """Test quoted phrases and trailing `*` prefixes"""
+
+        remote = self.create_job_title(
+            "Python Developer", "fully remote position"
+        )
+        later = self.create_job_title(
+            "Python Developer", "position remote later"
+        )
+
+        self.assertEqual(
+            self.search(q="remote position"), [later.id, remote.id]
+        )
+        self.assertEqual(self.search(q='"remote position"'), [remote.id])
+        self.assertEqual(self.search(q='"fully position"'), [])
+        self.assertEqual(self.search(q="fully posit*"), [remote.id])
+
+    def test_filters(self):
+        """Test portal and pub_date filters narrow the results"""
+
+        now = timezone.now()
+        old = self.create_job_title(
+            "Python Developer", "legacy systems",
+            pub_date=now - timedelta(days=30),
+        )
+        new = self.create_job_title(
+            "Python Developer", "greenfield systems", portal=self.indeed,
+            pub_date=now,
+        )
+
+        self.assertEqual(
+            self.search(q="python", portal=self.indeed.id), [new.id]
+        )
+        self.assertEqual(
+            self.search(
+                q="python",
+                pub_date_before=(now - timedelta(days=1)).isoformat(),
+            ),
+            [old.id],
+        )
+        self.assertEqual(
+            self.search(
+                q="python",
+                pub_date_after=(now - timedelta(days=1)).isoformat(),
+            ),
+            [new.id],
+        )
+
+    def test_limited_to_user(self):
+        """Test other users' job titles are never returned"""
+
+        other = get_user_model().objects.create_user(
+            "other@example.com", "password@321"
+        )
+        self.create_job_title("Python Developer", "remote", user=other)
+
+        self.assertEqual(self.search(q="python"), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        """Test saves and deletes are reflected in the results"""
+
+        job_title = self.create_job_title("Python Developer", "remote")
+        job_title.title = "Golang Developer"
+        job_title.save()
+
+        self.assertEqual(self.search(q="python"), [])
+        self.assertEqual(self.search(q="golang"), [job_title.id])
+
+        job_title.job_description.description_text = "hybrid office"
+        job_title.job_description.save()
+        self.assertEqual(self.search(q="hybrid"), [job_title.id])
+
+        job_title.delete()
+        self.assertEqual(self.search(q="golang"), [])
+
+    def test_pagination(self):
+        """Test results are paged with limit / offset"""
+
+        ids = [
+            self.create_job_title(f"Python Developer {i}", "remote").id
+            for i in range(5)
+        ]
+
+        res = self.client.get(SEARCH_URL, {"q": "python", "limit": 2})
+        first = [item["id"] for item in res.data["results"]]
+        res = self.client.get(res.data["next"])
+        second = [item["id"] for item in res.data["results"]]
+
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(second), 2)
+        self.assertFalse(set(first) & set(second))
+        self.assertTrue(set(first + second) <= set(ids))
+
+    def test_offset_beyond_max_rejected(self):
+        """Test a deeper page than `max_offset` is refused, not clamped"""
+
+        self.create_job_title("Python Developer", "remote")
+
+        at_max = self.client.get(SEARCH_URL, {"q": "python", "offset": 1000})
+        beyond = self.client.get(SEARCH_URL, {"q": "python", "offset": 5000})
+
+        self.assertEqual(at_max.status_code, status.HTTP_200_OK)
+        self.assertEqual(at_max.data["results"], [])
+        self.assertEqual(beyond.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_query_required(self):
+        """Test a missing or empty query is rejected"""
+
+        res = self.client.get(SEARCH_URL)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.get(SEARCH_URL, {"q": "*"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rebuild_command(self):
+        """Test the rebuild command indexes rows written without signals"""
+
+        job_title = self.create_job_title("Python Developer", "remote")
+        JobTitleSearchDocument.objects.all().delete()
+        self.assertEqual(self.search(q="python"), [])
+
+        call_command("rebuild_search_index", stdout=StringIO())
+
+        self.assertEqual(self.search(q="python"), [job_title.id])
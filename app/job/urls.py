@@ -1,21 +1,29 @@
 """URLs for job API"""
 
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from job import views
+from job import async_views, views
 
 # `DefaultRouter` provided by DRF automatically creates URL routing for us
 # TODO - Refer
 # https://www.django-rest-framework.org/api-guide/routers/#defaultrouter
 
-router = DefauJobTitleViewSetltRouter()
+router = DefaultRouter()
 
 # this app name will be utilized in reverse function
 app_name = "jobtitle"
-router.register("jobtitles", views.)
+router.register(
+    "jobtitles",
+    async_views.AsyncJobTitleViewSet
+    if settings.ASYNC_VIEWS else views.JobTitleViewSet,
+)
 
 
 urlpatterns = [
+    path(
+        "analytics/", views.PostingAnalyticsView.as_view(), name="analytics"
+    ),
     path("", include(router.urls))
-]
\ No newline at end of file
+]
@@ -9,16 +9,78 @@ TODO EXERCISE
 
 """
 
-from rest_framework import viewsets
-from rest_framework.authentication import TokenAuthentication
+from django.db import IntegrityError
+from django.db.models import F, Q
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import (
+    extend_schema,
+    extend_schema_view,
+    OpenApiParameter,
+)
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
 ## import models
-from core.models import JobTitle
+from core.models import JobTitle, JobTitleSignature
 from job import serializers
+from job.bulk import bulk_upsert_job_titles
+from core.fieldsets import SparseFieldsViewMixin, fields_parameter
+from job.conditional import ConditionalGetMixin
+from job.export import FORMATS, export_stream
+from job.filters import FILTERS, filter_job_titles
+from job.fast_serializers import FastListMixin
+from core import applications
+from job.analytics import posting_series
+from core.search import search_job_titles
+from core.throttling import BUCKET_THROTTLES, DEFAULT_COSTS
+from job.pagination import JobTitleCursorPagination, JobTitleSearchPagination
+from user.authentication import CachedTokenAuthentication
 
 
-class JobTitleViewSet(viewsets.ModelViewSet):
+EXPAND_PARAMETER = OpenApiParameter(
+    "expand",
+    OpenApiTypes.STR,
+    description="Comma separated related objects to serialize nested "
+                "instead of as ids: `job_description`, `portal`.",
+)
+
+
+# also applied to `job.async_views.AsyncJobTitleViewSet`, whose `list` and
+# `retrieve` replace the decorated ones
+job_title_schema = extend_schema_view(
+    list=extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "collapse_duplicates",
+                OpenApiTypes.BOOL,
+                description="Return one job title (the oldest) per "
+                            "cluster of near-duplicate postings.",
+            ),
+            EXPAND_PARAMETER,
+            fields_parameter(serializers.JobTitleSerializer),
+            serializers.JobTitleListQuerySerializer,
+        ],
+    ),
+    retrieve=extend_schema(parameters=[
+        EXPAND_PARAMETER,
+        fields_parameter(serializers.JobTitleDetailSerializer),
+    ]),
+)
+
+
+@job_title_schema
+class JobTitleViewSet(
+    ConditionalGetMixin,
+    SparseFieldsViewMixin,
+    FastListMixin,
+    viewsets.ModelViewSet,
+):
     serializer_class = serializers.JobTitleDetailSerializer
 
     # represents objects that are available for this viewset.
@@ -27,20 +89,116 @@ class JobTitleViewSet(viewsets.ModelViewSet):
 
     # In order to use endpoint provided by this viewset, we will need ]
     # authentication
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    # keyset pagination, every page costs the same however deep we go
+    pagination_class = JobTitleCursorPagination
+
+    # writes take tokens from the user's bucket, see `get_throttle_cost`
+    throttle_classes = BUCKET_THROTTLES
+    throttle_scope = "writes"
+
+    # `?expand=` value -> relations loaded along with the job titles, one
+    # JOIN each, so a page costs the same number of queries at any size
+    expand_related = {
+        "job_description": ["job_description"],
+        "portal": ["portal"],
+    }
+    # read only actions accepting `?expand=` and `?fields=`
+    expand_actions = ("list", "retrieve", "duplicates")
+    sparse_actions = expand_actions
+    # read by the validators of `ConditionalGetMixin.retrieve`
+    sparse_always_load = ("last_updated",)
+
     def get_queryset(self):
         """
         We want to filter out jobtitles for authenticated users
         """
 
-        return self.queryset.filter(user=self.request.user).order_by("-id")
+        queryset = self.queryset.filter(user=self.request.user)
+        if self.action == "list":
+            queryset = filter_job_titles(queryset, self.get_list_filters())
+        fields = self.get_sparse_fields()
+        for name in self.get_expand():
+            # an expansion left out of `?fields=` is not loaded
+            if fields is None or name in fields:
+                queryset = queryset.select_related(
+                    *self.expand_related[name]
+                )
+        if self.action == "list" and self._flag("collapse_duplicates"):
+            # a cluster is identified by its oldest member's id, titles
+            # without a signature yet are their own cluster
+            queryset = queryset.filter(
+                Q(signature__isnull=True) | Q(signature__cluster_id=F("id"))
+            )
+        return self.narrow_queryset(queryset).order_by("-id")
+
+    def get_expand(self):
+        """Return the validated `?expand=` names of this request
+
+        Raises:
+            ValidationError: an unknown name was requested
+        """
+
+        if self.action not in self.expand_actions:
+            return []
+        if not hasattr(self, "_expand"):
+            names = self.request.query_params.get("expand", "").split(",")
+            names = list(dict.fromkeys(
+                name.strip() for name in names if name.strip()
+            ))
+            unknown = [
+                name for name in names if name not in self.expand_related
+            ]
+            if unknown:
+                raise ValidationError({
+                    "expand": [
+                        f"Unknown expansion: {', '.join(unknown)}. Choose "
+                        f"from {', '.join(self.expand_related)}."
+                    ]
+                })
+            self._expand = names
+        return self._expand
+
+    def get_list_filters(self):
+        """Return the validated list filters of this request
+
+        Raises:
+            ValidationError: a filter value is invalid
+        """
+
+        if not hasattr(self, "_list_filters"):
+            params = self.request.query_params
+            self._list_filters = {}
+            if any(name in params for name in FILTERS):
+                query = serializers.JobTitleListQuerySerializer(data=params)
+                query.is_valid(raise_exception=True)
+                self._list_filters = query.validated_data
+        return self._list_filters
+
+    def get_list_plan(self):
+        # nested objects need the serializer
+        if self.get_expand():
+            return None
+        return super().get_list_plan(self.get_sparse_fields())
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["expand"] = self.get_expand()
+        return context
+
+    def _flag(self, name):
+        """Return the boolean query parameter `name`"""
+
+        return self.request.query_params.get(name, "").lower() in (
+            "1", "true"
+        )
 
     def get_serializer_class(self):
         """Returns the serializer class to be used for the request"""
 
-        if self.action == "list":
+        if self.action in ("list", "duplicates"):
             return serializers.JobTitleSerializer
         return self.serializer_class
 
@@ -53,5 +211,277 @@ class JobTitleViewSet(viewsets.ModelViewSet):
         Returns:
         """
 
-        serializer.save(user=self.request.user)
+        serializer.save(user=self.request.user, last_updated=timezone.now())
+
+    def perform_update(self, serializer):
+        """Update a job title, bumping `last_updated` for conditional GETs"""
+
+        serializer.save(last_updated=timezone.now())
+
+    # largest list accepted by the `bulk` action
+    bulk_max_items = 10000
+
+    def get_throttle_cost(self, request):
+        """A token per write, a `bulk` request one per 100 items"""
+
+        cost = DEFAULT_COSTS.get(request.method)
+        if cost and self.action == "bulk" and isinstance(request.data, list):
+            return max(1, -(-len(request.data) // 100))
+        return cost
+
+    @extend_schema(
+        request=serializers.JobTitleBulkItemSerializer(many=True),
+        responses=serializers.JobTitleBulkResultSerializer(many=True),
+        parameters=[
+            OpenApiParameter(
+                "upsert",
+                OpenApiTypes.BOOL,
+                description="Update the existing job title of a "
+                            "job description instead of failing.",
+            ),
+        ],
+    )
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        """Create (or upsert) a list of job titles in one request
+
+        Returns one result per item, in request order. Valid items are
+        written even if others fail.
+        # TODO - refer
+        https://www.django-rest-framework.org/api-guide/viewsets/#marking-extra-actions-for-routing
+        """
+
+        if not isinstance(request.data, list):
+            return Response(
+                {"detail": "Expected a list of job titles."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(request.data) > self.bulk_max_items:
+            return Response(
+                {"detail": f"At most {self.bulk_max_items} items allowed."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            results = bulk_upsert_job_titles(
+                request.user, request.data, upsert=self._flag("upsert")
+            )
+        except IntegrityError:
+            # a concurrent request wrote one of the job descriptions
+            return Response(
+                {"detail": "Conflicting concurrent write, retry the batch."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response(results, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        parameters=[serializers.JobTitleSearchQuerySerializer],
+        responses=serializers.JobTitleSearchResultSerializer(many=True),
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        pagination_class=JobTitleSearchPagination,
+    )
+    def search(self, request):
+        """Ranked full-text search over the user's job titles
+
+        Matches the title and the role / text of the job description.
+        """
+
+        query = serializers.JobTitleSearchQuerySerializer(
+            data=request.query_params
+        )
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        try:
+            documents = search_job_titles(
+                request.user,
+                params["q"],
+                portal=params.get("portal"),
+                pub_date_after=params.get("pub_date_after"),
+                pub_date_before=params.get("pub_date_before"),
+            )
+        except ValueError as exc:
+            return Response(
+                {"q": [str(exc)]}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        page = self.paginate_queryset(documents)
+        serializer = serializers.JobTitleSearchResultSerializer(
+            page, many=True
+        )
+        return self.get_paginated_response(serializer.data)
+
+    @extend_schema(
+        parameters=[
+            EXPAND_PARAMETER,
+            fields_parameter(serializers.JobTitleSerializer),
+        ],
+        responses=serializers.JobTitleSerializer(many=True),
+    )
+    @action(detail=True, methods=["get"])
+    def duplicates(self, request, pk=None):
+        """Other job titles of the same near-duplicate cluster
+
+        Usually the same posting seen on other portals.
+        """
+
+        job_title = self.get_object()
+        cluster_id = (
+            JobTitleSignature.objects.filter(job_title=job_title)
+            .values_list("cluster_id", flat=True)
+            .first()
+        )
+        queryset = self.get_queryset().filter(
+            signature__cluster_id=cluster_id
+        ).exclude(pk=job_title.pk)
+        if cluster_id is None:
+            queryset = queryset.none()
+
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @extend_schema(
+        parameters=[serializers.JobTitleExportQuerySerializer],
+        responses={
+            (200, media_type): OpenApiTypes.BINARY
+            for media_type in [*FORMATS.values(), "application/gzip"]
+        },
+    )
+    @action(detail=False, methods=["get"], pagination_class=None)
+    def export(self, request):
+        """Download all job titles with their description and portal
+
+        The file is streamed while it is read from the database, memory
+        use does not grow with the number of rows.
+        """
+
+        query = serializers.JobTitleExportQuerySerializer(
+            data=request.query_params
+        )
+        query.is_valid(raise_exception=True)
+        output = query.validated_data["output"]
+        gzip = query.validated_data["gzip"]
+
+        filename = f"jobtitles.{output}"
+        content_type = FORMATS[output]
+        if gzip:
+            filename += ".gz"
+            content_type = "application/gzip"
+        response = StreamingHttpResponse(
+            export_stream(
+                self.queryset.filter(user=request.user), output, gzip=gzip
+            ),
+            content_type=content_type,
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    @extend_schema(
+        methods=["POST"],
+        request=serializers.ApplicationSerializer,
+        responses={201: serializers.ApplicationSerializer},
+    )
+    @extend_schema(methods=["DELETE"], request=None, responses={204: None})
+    @action(detail=True, methods=["post", "delete"])
+    def apply(self, request, pk=None):
+        """Apply for a job title (POST) or withdraw the application (DELETE)
+
+        Any job title can be applied for, not only the user's own.
+        """
+
+        try:
+            pk = int(pk)
+        except ValueError:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        if request.method == "DELETE":
+            if not applications.withdraw(request.user, pk):
+                return Response(status=status.HTTP_404_NOT_FOUND)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        serializer = serializers.ApplicationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            application = applications.apply(
+                request.user, pk, **serializer.validated_data
+            )
+        except JobTitle.DoesNotExist:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        except applications.AlreadyApplied:
+            return Response(
+                {"detail": "Already applied for this job title."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response(
+            serializers.ApplicationSerializer(application).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+    # largest `?limit=` of the `top` action
+    top_max_limit = 100
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "limit",
+                OpenApiTypes.INT,
+                description=f"Number of job titles, at most {top_max_limit}.",
+            ),
+        ],
+        responses=serializers.JobTitleTopSerializer(many=True),
+    )
+    @action(detail=False, methods=["get"], pagination_class=None)
+    def top(self, request):
+        """The user's job titles with the most applicants
+
+        Reads the denormalized counters, no applications are counted.
+        """
+
+        try:
+            limit = int(request.query_params.get("limit", 10))
+        except ValueError:
+            limit = 0
+        if not 0 < limit <= self.top_max_limit:
+            return Response(
+                {"limit": [f"Must be 1 to {self.top_max_limit}."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        job_titles = self.queryset.filter(user=request.user).order_by(
+            "-applicant_count", "-id"
+        )[:limit]
+        return Response(
+            serializers.JobTitleTopSerializer(job_titles, many=True).data
+        )
+
+
+class PostingAnalyticsView(APIView):
+    """New job titles and job descriptions of the user over time
+
+    Served from the daily rollups, response time depends on the length of
+    the range only, not on the number of postings.
+    """
+
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
 
+    @extend_schema(
+        parameters=[serializers.PostingAnalyticsQuerySerializer],
+        responses=serializers.PostingAnalyticsSerializer,
+    )
+    def get(self, request):
+        query = serializers.PostingAnalyticsQuerySerializer(
+            data=request.query_params
+        )
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        data = posting_series(
+            request.user,
+            params["start"],
+            params["end"],
+            bucket=params["bucket"],
+            group_by=params.get("group_by"),
+        )
+        return Response(serializers.PostingAnalyticsSerializer(data).data)
@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class UserConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "user"
+
+    def ready(self):
+        # register signal handlers
+        from user import signals  # noqa
+
+        if settings.METRICS_ENABLED:
+            from core import metrics
+            from user.authentication import token_cache_samples
+
+            metrics.registry.add_collector(token_cache_samples)
@@ -0,0 +1,38 @@
+"""
+Async user views, routed instead of `user.views` under ASGI
+
+See `core/async_views.py`. Sign up and profile updates validate through
+serializers and hash passwords, both sync: they run in a thread.
+"""
+
+from asgiref.sync import sync_to_async
+from rest_framework.authtoken.models import Token
+from rest_framework.response import Response
+
+from core.async_views import AsyncDispatchMixin
+from .views import CreateTokenView, CreateUserView, ManageUserView
+
+
+class AsyncCreateUserView(AsyncDispatchMixin, CreateUserView):
+    """Create a new user in the system"""
+
+
+class AsyncCreateTokenView(AsyncDispatchMixin, CreateTokenView):
+    """Create a new authentication token for a user"""
+
+    async def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        # `authenticate` reads the user and checks the password
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        token, _ = await Token.objects.aget_or_create(
+            user=serializer.validated_data["user"]
+        )
+        return Response({"token": token.key})
+
+
+class AsyncManageUserView(AsyncDispatchMixin, ManageUserView):
+    """Retrieve (async) or update the authenticated user"""
+
+    async def get(self, request, *args, **kwargs):
+        # `request.user` was loaded by the async token authentication
+        return Response(self.get_serializer(request.user).data)
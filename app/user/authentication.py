@@ -0,0 +1,207 @@
+"""
+Authentication classes for the user and job APIs.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import (
+    TokenAuthentication,
+    get_authorization_header,
+)
+
+# TODO - refer
+# https://www.django-rest-framework.org/api-guide/authentication/#custom-authentication
+
+
+class TokenCache:
+    """Bounded, thread safe token key -> (user, token) cache
+
+    Entries expire `ttl` seconds after they were stored and the least
+    recently used entry is dropped once `max_size` is reached.
+
+    NOTE :: the cache lives in one process. Signals (see `user/signals.py`)
+    evict entries in the process that made the change; other worker
+    processes keep a stale entry for at most `ttl` seconds.
+    """
+
+    def __init__(self, max_size, ttl, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # bumped on every explicit eviction, see `set`
+        self.generation = 0
+
+    def get(self, key):
+        """Return cached `(user, token)` or None"""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            user, token, expires_at = entry
+            if expires_at <= self.clock():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # every request gets its own instance, views may modify it
+        return copy.copy(user), token
+
+    def set(self, key, user, token, generation):
+        """Store an entry looked up while `self.generation == generation`
+
+        If anything was evicted since the lookup started, the row we read
+        may already be stale, so it is not cached.
+        """
+
+        with self._lock:
+            if generation != self.generation or self.max_size <= 0:
+                return
+            self._remove(key)
+            self._entries[key] = (
+                copy.copy(user), token, self.clock() + self.ttl
+            )
+            self._keys_by_user.setdefault(user.pk, set()).add(key)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def evict(self, key):
+        """Drop one token key"""
+
+        with self._lock:
+            self.generation += 1
+            if self._remove(key):
+                self.evictions += 1
+
+    def evict_user(self, user_id):
+        """Drop every token key belonging to `user_id`"""
+
+        with self._lock:
+            self.generation += 1
+            for key in list(self._keys_by_user.get(user_id, ())):
+                if self._remove(key):
+                    self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def stats(self):
+        """Return hit/miss counters and current size"""
+
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
+
+    def _remove(self, key):
+        """Remove `key`, caller must hold the lock"""
+
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        user_keys = self._keys_by_user.get(entry[0].pk)
+        if user_keys is not None:
+            user_keys.discard(key)
+            if not user_keys:
+                del self._keys_by_user[entry[0].pk]
+        return True
+
+
+token_cache = TokenCache(
+    max_size=getattr(settings, "TOKEN_CACHE_MAX_SIZE", 10000),
+    ttl=getattr(settings, "TOKEN_CACHE_TTL", 60),
+)
+
+
+def token_cache_samples():
+    """`token_cache` counters, a collector of `core.metrics`"""
+
+    stats = token_cache.stats()
+    return {
+        "token_cache_hits_total": stats["hits"],
+        "token_cache_misses_total": stats["misses"],
+        "token_cache_evictions_total": stats["evictions"],
+        "token_cache_entries": stats["size"],
+    }
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Drop-in replacement for DRF `TokenAuthentication`
+
+    Saves the `authtoken_token` JOIN `core_user` query on every request
+    by keeping successful lookups in `token_cache`.
+    """
+
+    cache = token_cache
+
+    def authenticate_credentials(self, key):
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        generation = self.cache.generation
+        user, token = super().authenticate_credentials(key)
+        self.cache.set(key, user, token, generation)
+        return user, token
+
+    async def aauthenticate(self, request):
+        """`authenticate` for async views, see `core/async_views.py`"""
+
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed(
+                _("Invalid token header. No credentials provided.")
+                if len(auth) == 1 else
+                _("Invalid token header. Token string should not contain "
+                  "spaces.")
+            )
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(_(
+                "Invalid token header. Token string should not contain "
+                "invalid characters."
+            ))
+        return await self.aauthenticate_credentials(key)
+
+    async def aauthenticate_credentials(self, key):
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        generation = self.cache.generation
+        model = self.get_model()
+        try:
+            token = await model.objects.select_related("user").aget(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _("User inactive or deleted.")
+            )
+        self.cache.set(key, token.user, token, generation)
+        return token.user, token
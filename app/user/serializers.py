@@ -8,12 +8,14 @@ from django.contrib.auth import (
 
 from rest_framework import serializers
 
+from core.fieldsets import SparseFieldsMixin
+
 
 # TODO - TOPIC - (DRF ModelSerializers), refer
 # https://www.django-rest-framework.org/tutorial/1-serialization/#using-modelserializers
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for the user object."""
 
     class Meta:
@@ -0,0 +1,28 @@
+"""
+Signal handlers keeping `user.authentication.token_cache` consistent.
+"""
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from user.authentication import token_cache
+
+
+@receiver([post_save, post_delete], sender=Token)
+def evict_token(sender, instance, **kwargs):
+    """Token deleted (logout) or regenerated"""
+
+    token_cache.evict(instance.key)
+
+
+@receiver([post_save, post_delete], sender=settings.AUTH_USER_MODEL)
+def evict_user_tokens(sender, instance, **kwargs):
+    """User deactivated, password changed or deleted
+
+    Saves of users are rare compared to authenticated reads, so instead of
+    diffing `is_active` / `password` we evict on every save.
+    """
+
+    token_cache.evict_user(instance.pk)
@@ -0,0 +1,51 @@
+"""Run the user API tests against the async views"""
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from job.tests.test_async_views import AsyncViewsMixin, auth_headers
+from user.tests import test_authentication, test_user_api
+
+
+class AsyncPublicUserApiTests(
+    AsyncViewsMixin, test_user_api.PublicUserApiTests
+):
+    pass
+
+
+class AsyncPrivateUserApiTests(
+    AsyncViewsMixin, test_user_api.PrivateUserApiTests
+):
+    pass
+
+
+class AsyncCachedTokenAuthenticationTests(
+    AsyncViewsMixin, test_authentication.CachedTokenAuthenticationTests
+):
+    pass
+
+
+class AsgiUserApiTests(AsyncViewsMixin, TestCase):
+    """Test the async user views through the ASGI handler"""
+
+    async def test_token_and_me(self):
+        payload = {"email": "test@example.com", "password": "password@321"}
+        created = await self.async_client.post(
+            reverse("user:create"), {**payload, "name": "Test Name"},
+            content_type="application/json",
+        )
+
+        res = await self.async_client.post(
+            reverse("user:token"), payload, content_type="application/json"
+        )
+        self.assertEqual(created.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        key = res.json()["token"]
+        me = await self.async_client.get(
+            reverse("user:me"), **auth_headers(key)
+        )
+
+        self.assertTrue(await Token.objects.filter(key=key).aexists())
+        self.assertEqual(me.json()["email"], "test@example.com")
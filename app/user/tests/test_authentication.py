@@ -0,0 +1,183 @@
+"""Tests for cached token authentication"""
+
+from django.test import TestCase, SimpleTestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from user.authentication import TokenCache, token_cache
+
+
+ME_URL = reverse("user:me")
+
+
+class FakeClock:
+    """Manually advanced clock"""
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeUser:
+    def __init__(self, pk):
+        self.pk = pk
+
+
+class TokenCacheTests(SimpleTestCase):
+    """Test the bounded TTL/LRU cache on its own"""
+
+    def setUp(self) -> None:
+        self.clock = FakeClock()
+        self.cache = TokenCache(max_size=2, ttl=10, clock=self.clock)
+
+    def test_hit_and_miss_counted(self):
+        """Test counters reflect lookups"""
+
+        self.assertIsNone(self.cache.get("a"))
+        self.cache.set("a", FakeUser(1), "token", self.cache.generation)
+        user, token = self.cache.get("a")
+
+        self.assertEqual(user.pk, 1)
+        self.assertEqual(token, "token")
+        stats = self.cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_entry_expires(self):
+        """Test entries are dropped after the TTL"""
+
+        self.cache.set("a", FakeUser(1), "token", self.cache.generation)
+        self.clock.now = 10
+
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(self.cache.stats()["size"], 0)
+
+    def test_least_recently_used_dropped(self):
+        """Test the LRU entry is dropped when the cache is full"""
+
+        for key, pk in [("a", 1), ("b", 2)]:
+            self.cache.set(key, FakeUser(pk), key, self.cache.generation)
+        self.cache.get("a")
+        self.cache.set("c", FakeUser(3), "c", self.cache.generation)
+
+        self.assertIsNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("a"))
+        self.assertIsNotNone(self.cache.get("c"))
+
+    def test_stale_lookup_not_stored(self):
+        """Test a lookup racing with an eviction is not cached"""
+
+        generation = self.cache.generation
+        self.cache.evict_user(1)
+        self.cache.set("a", FakeUser(1), "token", generation)
+
+        self.assertIsNone(self.cache.get("a"))
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test authenticating real requests through the cache"""
+
+    def setUp(self) -> None:
+        token_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="password@321",
+            name="Test name"
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def tearDown(self) -> None:
+        token_cache.clear()
+
+    def test_second_request_skips_token_query(self):
+        """Test a cached token costs no query"""
+
+        with self.assertNumQueries(1):
+            self.client.get(ME_URL)
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["email"], self.user.email)
+
+    def test_deleted_token_evicted(self):
+        """Test deleting the token rejects the next request"""
+
+        self.client.get(ME_URL)
+        self.token.delete()
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_evicted(self):
+        """Test deactivating the user rejects the next request"""
+
+        self.client.get(ME_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_evicts(self):
+        """Test changing the password drops the cached entry"""
+
+        self.client.get(ME_URL)
+        self.user.set_password("new-password@321")
+        self.user.save()
+
+        self.assertEqual(token_cache.stats()["size"], 0)
+
+    def test_update_reloads_changed_user(self):
+        """Test an update does not write back a stale cached user"""
+
+        self.client.get(ME_URL)
+        # changed by another process, whose signals do not reach this one
+        users = get_user_model().objects.filter(pk=self.user.pk)
+        users.update(password="changed")
+
+        res = self.client.patch(ME_URL, {"name": "updated name"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password, "changed")
+        self.assertEqual(self.user.name, "updated name")
+
+        self.client.get(ME_URL)
+        users.update(is_active=False)
+        res = self.client.patch(ME_URL, {"name": "other name"})
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertEqual(self.user.name, "updated name")
+
+    def test_counters_in_metrics(self):
+        """Test the cache counters are published on /metrics"""
+
+        hits = token_cache.stats()["hits"]
+        self.client.get(ME_URL)
+        self.client.get(ME_URL)
+
+        res = APIClient().get(reverse("metrics"))
+
+        text = res.content.decode()
+        self.assertIn(f"token_cache_hits_total {hits + 1}\n", text)
+        self.assertIn("# TYPE token_cache_entries gauge", text)
+        self.assertIn("token_cache_entries 1\n", text)
+
+    def test_profile_update_not_leaked_into_cache(self):
+        """Test an update through the API is visible on the next read"""
+
+        self.client.get(ME_URL)
+        self.client.patch(ME_URL, {"name": "updated name"})
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.data["name"], "updated name")
@@ -175,6 +175,16 @@ class PrivateUserApiTests(TestCase):
             'email': self.user.email,
         })
 
+    def test_retrieve_user_profile_fields(self):
+        """Test `?fields=` prunes the profile"""
+
+        res = self.client.get(ME_URL, {"fields": "name"})
+        unknown = self.client.get(ME_URL, {"fields": "name,password"})
+
+        self.assertEqual(res.data, {"name": self.user.name})
+        self.assertEqual(unknown.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("fields", unknown.data)
+
     def test_update_user_profile(self):
         """Test updating the user profile for an authenticate user"""
 
@@ -3,15 +3,25 @@
 /api/user/create
 """
 
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
 
 app_name = "user"
 
+if settings.ASYNC_VIEWS:
+    create_view = async_views.AsyncCreateUserView
+    token_view = async_views.AsyncCreateTokenView
+    me_view = async_views.AsyncManageUserView
+else:
+    create_view = views.CreateUserView
+    token_view = views.CreateTokenView
+    me_view = views.ManageUserView
+
 urlpatterns = [
     # named-urls
-    path("create/", views.CreateUserView.as_view(), name="create"),
-    path("token/", views.CreateTokenView.as_view(), name="token"),
-    path("me/", views.ManageUserView.as_view(), name="me")
+    path("create/", create_view.as_view(), name="create"),
+    path("token/", token_view.as_view(), name="token"),
+    path("me/", me_view.as_view(), name="me")
 ]
 
@@ -2,9 +2,16 @@
 Views for the user API
 """
 
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.utils import extend_schema, extend_schema_view
+from rest_framework import exceptions
 from rest_framework import generics
-from rest_framework import authentication, permissions
+from rest_framework import permissions
 from rest_framework.generics import CreateAPIView, RetrieveUpdateAPIView
+from core.fieldsets import SparseFieldsViewMixin, fields_parameter
+from core.throttling import BUCKET_THROTTLES
+from .authentication import CachedTokenAuthentication
 from .serializers import UserSerializer, AuthTokenSerializer
 
 
@@ -21,14 +28,27 @@ class CreateUserView(CreateAPIView):
 
     serializer_class = UserSerializer
 
+    # password hash and insert
+    throttle_classes = BUCKET_THROTTLES
+    throttle_scope = "auth"
+    throttle_costs = {"POST": 2}
+
 
 class CreateTokenView(ObtainAuthToken):
     """create a new authentication token for new user"""
 
     serializer_class = AuthTokenSerializer
 
+    # password check
+    throttle_classes = BUCKET_THROTTLES
+    throttle_scope = "auth"
+    throttle_costs = {"POST": 1}
+
 
-class ManageUserView(RetrieveUpdateAPIView):
+@extend_schema_view(
+    get=extend_schema(parameters=[fields_parameter(UserSerializer)]),
+)
+class ManageUserView(SparseFieldsViewMixin, RetrieveUpdateAPIView):
     """
     get
     patch
@@ -41,15 +61,33 @@ class ManageUserView(RetrieveUpdateAPIView):
     serializer_class = UserSerializer
 
     # checking http header for authentication token  (authentication)
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
 
     # allow users only when token is valid   (authorized)
     permission_classes = [permissions.IsAuthenticated]
 
+    # updates may hash a new password
+    throttle_classes = BUCKET_THROTTLES
+    throttle_scope = "auth"
+    throttle_costs = {"PUT": 1, "PATCH": 1}
+
     def get_object(self):
         """retrive user and return authenticated user information"""
 
-        return self.request.user
+        if self.request.method in permissions.SAFE_METHODS:
+            # loaded (or read from the cache) by the authentication,
+            # `?fields=` only prunes the response
+            return self.request.user
+        # the cached copy may predate a change made by another process, a
+        # save of it would write back its password and `is_active`
+        user = get_user_model().objects.filter(
+            pk=self.request.user.pk, is_active=True
+        ).first()
+        if user is None:
+            raise exceptions.AuthenticationFailed(
+                _("User inactive or deleted.")
+            )
+        return user
 
 
 